@@ -0,0 +1,49 @@
+# backend/admission.py
+import threading
+import time
+
+
+class TokenBucket:
+    """Per-process admission limiter for burst-prone endpoints (exam start, selfie upload).
+
+    Tokens refill at ``rate`` per second up to ``burst``. A caller that finds
+    the bucket empty is not queued server-side; it is told how long to wait.
+    Rejected callers are spread out: each one is given the next free slot
+    behind those already told to retry (a virtual queue that drains at
+    ``rate``), so retries arrive paced instead of as a second herd.
+    ``rate`` <= 0 disables the limiter.
+    """
+
+    def __init__(self, rate, burst, max_wait=30.0):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.max_wait = max_wait
+        self._tokens = self.burst
+        self._queued = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.admitted = 0
+        self.rejected = 0
+
+    def acquire(self):
+        """0.0 if admitted, otherwise the number of seconds the caller should wait before retrying."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            refill = (now - self._updated) * self.rate
+            self._updated = now
+            self._tokens = min(self.burst, self._tokens + refill)
+            self._queued = max(0.0, self._queued - refill)
+            if self._tokens >= 1:
+                self._tokens -= 1
+                self.admitted += 1
+                return 0.0
+            self._queued += 1
+            self.rejected += 1
+            return min(self.max_wait, (self._queued - self._tokens) / self.rate)
+
+    def stats(self):
+        with self._lock:
+            return {"rate": self.rate, "burst": self.burst, "tokens": round(self._tokens, 2), "queued": round(self._queued, 2),
+                    "admitted": self.admitted, "rejected": self.rejected}
@@ -0,0 +1,379 @@
+# backend/analytics.py
+import csv
+import datetime
+import heapq
+import json
+import math
+import os
+import re
+import numpy as np
+from pymongo import ReplaceOne
+
+# Event kinds, stored as int8 in the columnar chunks.
+OTHER, TAB_SWITCH, FACE_MISSING, FACE_PRESENT, MULTI_FACE, LOCK = range(6)
+KIND_PATTERNS = [
+    (LOCK, re.compile(r"exam locked|locked due to|exam[_ ]violation", re.I)),
+    (TAB_SWITCH, re.compile(r"tab[- _]?switch|window minimi[sz]ed|switched tabs?", re.I)),
+    (FACE_MISSING, re.compile(r"no face|face[- _]not[- _]detected|face[- _]missing|\b0 face", re.I)),
+    (MULTI_FACE, re.compile(r"multiple faces|multi[- _]face", re.I)),
+]
+WARNING_TYPES = {"warning", "error"}
+
+# Weights of the features in the risk score (see risk_score).
+RISK_WEIGHTS = {
+    "tab_switches_per_10min": 0.35,
+    "face_missing_fraction": 3.0,
+    "face_missing_episodes": 0.05,
+    "multi_face_events": 0.4,
+    "violation_bursts": 0.3,
+    "locked": 1.0,
+    "early_lock": 1.0,
+}
+EARLY_LOCK_SECONDS = 600
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def to_seconds(value):
+    """Epoch seconds (UTC) from a datetime, ISO/"YYYY-MM-DD HH:MM:SS" string or number; None if unparsable."""
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+        return (value - _EPOCH).total_seconds()
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value) / 1000.0 if value > 1e11 else float(value)  # client timestamps may be in ms
+    if isinstance(value, str) and value:
+        try:
+            return to_seconds(datetime.datetime.fromisoformat(value.strip().replace("Z", "+00:00")))
+        except ValueError:
+            return None
+    return None
+
+
+def classify(label, level=None, event_type=None, faces=None):
+    """(kind, is_warning) for one event from its message or event name, level (info/warning/error),
+    server ``event_type`` and face count."""
+    if event_type == "exam_violation":
+        kind = LOCK
+    elif event_type == "face_check" and isinstance(faces, int):
+        kind = FACE_MISSING if faces == 0 else FACE_PRESENT if faces == 1 else MULTI_FACE
+    else:
+        kind = OTHER
+        for candidate, pattern in KIND_PATTERNS:
+            if label and pattern.search(label):
+                kind = candidate
+                break
+    return kind, kind in (TAB_SWITCH, FACE_MISSING, MULTI_FACE, LOCK) or str(level or "").lower() in WARNING_TYPES
+
+
+def classify_stored(event):
+    """classify() for a stored event document (proctoring_events or a legacy ``logs`` entry)."""
+    return classify(event.get("message") or "", event.get("type"), event.get("event_type"), event.get("faces"))
+
+
+# --- Sources: each yields (session_key, epoch_seconds, kind, is_warning) records ---
+
+def iter_mongo(submissions_collection, event_store, query, batch_size=500, on_session=None):
+    """Stream events for the submissions matching ``query``.
+
+    Submissions are read in cursor batches; each batch's events come from one
+    ``$in`` query sorted by (session_id, timestamp), so a session's events are
+    contiguous and in time order. ``on_session(submission)`` is called once per
+    submission (start/end times, student and test for the report).
+    """
+    cursor = submissions_collection.find(query, {"_id": 0, "session_id": 1, "student_id": 1, "test_id": 1, "start_time": 1,
+                                                 "end_time": 1, "status": 1, "logs": 1}).batch_size(batch_size)
+    batch = []
+
+    def drain(batch):
+        for sub in batch:
+            if on_session:
+                on_session(sub)
+            for event in sub.get("logs") or []:
+                t = to_seconds(event.get("timestamp"))
+                if t is not None:
+                    yield (sub["session_id"], t, *classify_stored(event))
+        events = event_store.collection.find({"session_id": {"$in": [sub["session_id"] for sub in batch]}},
+                                             {"_id": 0, "session_id": 1, "timestamp": 1, "message": 1, "type": 1, "event_type": 1, "faces": 1})
+        for event in events.sort([("session_id", 1), ("timestamp", 1)]).batch_size(5000):
+            t = to_seconds(event.get("timestamp"))
+            if t is not None:
+                yield (event["session_id"], t, *classify_stored(event))
+
+    for sub in cursor:
+        batch.append(sub)
+        if len(batch) >= batch_size:
+            yield from drain(batch)
+            batch = []
+    if batch:
+        yield from drain(batch)
+
+
+def iter_jsonl_dir(folder):
+    """Events from ``<folder>/<student>_events.jsonl`` files ({"event", "timestamp"} per line).
+
+    These archives predate sessions, so events are keyed by ``session_id`` when
+    present and by the student otherwise.
+    """
+    for name in sorted(os.listdir(folder)):
+        if not name.endswith("_events.jsonl"):
+            continue
+        student = name[:-len("_events.jsonl")]
+        with open(os.path.join(folder, name), encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(record, dict):
+                    continue
+                t = to_seconds(record.get("timestamp"))
+                if t is None:
+                    continue
+                label = record.get("event") or record.get("message") or ""
+                kind, warning = classify(label, record.get("type"))
+                yield record.get("session_id") or student, t, kind, warning
+
+
+def iter_event_csv(path):
+    """Events from a flat CSV with ``session_id, timestamp, type, message`` columns (e.g. all_proctoring_logs.csv)."""
+    with open(path, newline="", encoding="utf-8") as handle:
+        for row in csv.DictReader(handle):
+            t = to_seconds(row.get("timestamp"))
+            session = row.get("session_id") or row.get("student_id")
+            if t is None or not session:
+                continue
+            kind, warning = classify(row.get("message") or "", row.get("type"))
+            yield session, t, kind, warning
+
+
+def chunks(records, size=100000):
+    """Group records into columnar chunks: (sessions object array, times float64, kinds int8, warnings bool)."""
+    sessions, times, kinds, warnings = [], [], [], []
+    for session, t, kind, warning in records:
+        sessions.append(session)
+        times.append(t)
+        kinds.append(kind)
+        warnings.append(warning)
+        if len(times) >= size:
+            yield np.array(sessions, dtype=object), np.array(times, dtype=np.float64), np.array(kinds, dtype=np.int8), np.array(warnings, dtype=bool)
+            sessions, times, kinds, warnings = [], [], [], []
+    if times:
+        yield np.array(sessions, dtype=object), np.array(times, dtype=np.float64), np.array(kinds, dtype=np.int8), np.array(warnings, dtype=bool)
+
+
+# --- Per-session accumulation ---
+
+class _SessionState:
+    """Running features of one session; constant size apart from the short burst-window tail."""
+
+    __slots__ = ("first", "last", "events", "warnings", "tab_switches", "multi_face", "missing_seconds", "missing_episodes",
+                 "longest_missing", "open_missing", "lock_time", "bursts", "max_burst", "burst_tail", "burst_until", "meta")
+
+    def __init__(self):
+        self.first = math.inf
+        self.last = -math.inf
+        self.events = self.warnings = self.tab_switches = self.multi_face = 0
+        self.missing_seconds = self.longest_missing = 0.0
+        self.missing_episodes = 0
+        self.open_missing = None  # (start, last) of a face-missing episode that may continue in the next chunk
+        self.lock_time = None
+        self.bursts = self.max_burst = 0
+        self.burst_tail = np.empty(0)
+        self.burst_until = -math.inf
+        self.meta = None
+
+
+class RiskAnalyzer:
+    """Per-session proctoring features and risk scores from a stream of event chunks.
+
+    Memory is one chunk plus a small fixed record per session, so millions of
+    events can be processed as long as each session's events arrive in time
+    order (the Mongo source sorts them; archives are written chronologically).
+    Within a chunk, events are grouped with a stable sort and each session's
+    slice is reduced with array operations:
+
+    - tab-switch rate: tab switches per 10 minutes of session time;
+    - face-missing time: missing-face reports closer than ``face_gap`` seconds,
+      and not interrupted by a face-present check, form one episode;
+    - violation bursts: non-overlapping windows of ``burst_window`` seconds
+      holding at least ``burst_threshold`` warnings (face-missing reports excluded);
+    - time to lock: first lock/violation event relative to the session start.
+    """
+
+    def __init__(self, face_gap=10.0, face_sample_seconds=1.0, burst_window=60.0, burst_threshold=3, weights=RISK_WEIGHTS):
+        self.face_gap = face_gap
+        self.face_sample_seconds = face_sample_seconds
+        self.burst_window = burst_window
+        self.burst_threshold = burst_threshold
+        self.weights = weights
+        self.sessions = {}
+        self.events = 0
+
+    def state(self, session):
+        state = self.sessions.get(session)
+        if state is None:
+            state = self.sessions[session] = _SessionState()
+        return state
+
+    def set_meta(self, session, **meta):
+        self.state(session).meta = meta
+
+    def feed(self, records, chunk_size=100000):
+        for chunk in chunks(records, chunk_size):
+            self.add_chunk(*chunk)
+        return self
+
+    def add_chunk(self, sessions, times, kinds, warnings):
+        if not len(times):
+            return
+        self.events += len(times)
+        keys, codes = np.unique(sessions, return_inverse=True)
+        order = np.lexsort((times, codes))
+        codes, times, kinds, warnings = codes[order], times[order], kinds[order], warnings[order]
+        bounds = np.flatnonzero(np.diff(codes)) + 1
+        starts = np.concatenate(([0], bounds))
+        ends = np.concatenate((bounds, [len(codes)]))
+        for code, start, end in zip(codes[starts], starts, ends):
+            self._add_session(self.state(keys[code]), times[start:end], kinds[start:end], warnings[start:end])
+
+    def _add_session(self, state, t, kinds, warnings):
+        state.first = min(state.first, float(t[0]))
+        state.last = max(state.last, float(t[-1]))
+        state.events += len(t)
+        state.warnings += int(warnings.sum())
+        state.tab_switches += int(np.count_nonzero(kinds == TAB_SWITCH))
+        state.multi_face += int(np.count_nonzero(kinds == MULTI_FACE))
+        if state.lock_time is None:
+            locks = np.flatnonzero(kinds == LOCK)
+            if len(locks):
+                state.lock_time = float(t[locks[0]])
+        self._face_missing(state, t, kinds)
+        self._bursts(state, t[warnings & (kinds != FACE_MISSING)])  # face-missing reports repeat per frame; timed separately
+
+    def _face_missing(self, state, t, kinds):
+        face = (kinds == FACE_MISSING) | (kinds == FACE_PRESENT)
+        if not face.any():
+            return
+        ft, missing = t[face], kinds[face] == FACE_MISSING
+        presents_before = np.cumsum(~missing)  # a present check between two missing reports ends the episode
+        mt, mp = ft[missing], presents_before[missing]
+        if not len(mt):
+            self._close_missing(state)
+            return
+        breaks = np.flatnonzero((np.diff(mt) > self.face_gap) | (np.diff(mp) > 0)) + 1
+        episode_starts = np.concatenate(([0], breaks))
+        episode_ends = np.concatenate((breaks - 1, [len(mt) - 1]))
+        begin = mt[episode_starts]
+        if state.open_missing is not None:
+            open_start, open_last = state.open_missing
+            if mp[0] == 0 and mt[0] - open_last <= self.face_gap:
+                begin[0] = open_start
+            else:
+                self._close_missing(state)
+        durations = mt[episode_ends] - begin + self.face_sample_seconds
+        still_open = presents_before[-1] == mp[-1]  # no present check after the last missing report
+        closed = durations[:-1] if still_open else durations
+        state.missing_seconds += float(closed.sum())
+        state.missing_episodes += len(closed)
+        if len(closed):
+            state.longest_missing = max(state.longest_missing, float(closed.max()))
+        state.open_missing = (float(begin[-1]), float(mt[-1])) if still_open else None
+
+    def _close_missing(self, state):
+        if state.open_missing is not None:
+            duration = state.open_missing[1] - state.open_missing[0] + self.face_sample_seconds
+            state.missing_seconds += duration
+            state.missing_episodes += 1
+            state.longest_missing = max(state.longest_missing, duration)
+            state.open_missing = None
+
+    def _bursts(self, state, wt):
+        if not len(wt):
+            return
+        wt = np.concatenate((state.burst_tail, wt))
+        in_window = np.searchsorted(wt, wt + self.burst_window, side="right") - np.arange(len(wt))
+        state.max_burst = max(state.max_burst, int(in_window.max()))
+        for i in np.flatnonzero(in_window >= self.burst_threshold):
+            if wt[i] >= state.burst_until:
+                state.bursts += 1
+                state.burst_until = wt[i] + self.burst_window
+        state.burst_tail = wt[wt > wt[-1] - self.burst_window]
+
+    # --- results ---
+    def features(self, session):
+        state = self.sessions[session]
+        self._close_missing(state)
+        meta = state.meta or {}
+        start = to_seconds(meta.get("start_time")) if meta.get("start_time") else None
+        end = to_seconds(meta.get("end_time")) if meta.get("end_time") else None
+        start = start if start is not None else state.first
+        end = end if end is not None else state.last
+        duration = max(end - start, 0.0) if math.isfinite(start) and math.isfinite(end) else 0.0
+        minutes = max(duration, 60.0) / 60.0
+        time_to_lock = max(state.lock_time - start, 0.0) if state.lock_time is not None else None
+        return {
+            "events": state.events,
+            "warnings": state.warnings,
+            "duration_seconds": round(duration, 1),
+            "tab_switches": state.tab_switches,
+            "tab_switches_per_10min": round(state.tab_switches / minutes * 10, 3),
+            "face_missing_seconds": round(state.missing_seconds, 1),
+            "face_missing_fraction": round(min(state.missing_seconds / max(duration, 60.0), 1.0), 4),
+            "face_missing_episodes": state.missing_episodes,
+            "longest_face_missing_seconds": round(state.longest_missing, 1),
+            "multi_face_events": state.multi_face,
+            "violation_bursts": state.bursts,
+            "max_warnings_in_window": state.max_burst,
+            "locked": state.lock_time is not None,
+            "time_to_lock_seconds": round(time_to_lock, 1) if time_to_lock is not None else None,
+        }
+
+    def risk_score(self, features):
+        """0-100: saturating weighted sum, so no single feature dominates once it is clearly bad."""
+        inputs = dict(features)
+        inputs["locked"] = 1.0 if features["locked"] else 0.0
+        ttl = features["time_to_lock_seconds"]
+        inputs["early_lock"] = max(0.0, 1.0 - ttl / EARLY_LOCK_SECONDS) if ttl is not None else 0.0
+        total = sum(weight * float(inputs.get(name) or 0) for name, weight in self.weights.items())
+        return round(100.0 * (1.0 - math.exp(-total)), 1)
+
+    def iter_results(self):
+        for session, state in self.sessions.items():
+            features = self.features(session)
+            yield {"session_id": session, **(state.meta or {}), "risk_score": self.risk_score(features), "features": features}
+
+    def ranked(self, limit=None):
+        """Results by descending risk; with ``limit``, only the top ones are kept while scoring."""
+        key = lambda result: result["risk_score"]
+        if limit:
+            return heapq.nlargest(limit, self.iter_results(), key=key)
+        return sorted(self.iter_results(), key=key, reverse=True)
+
+
+def session_meta(submission):
+    return {key: submission.get(key) for key in ("student_id", "test_id", "status", "start_time", "end_time")}
+
+
+def score_session(submission, events, **options):
+    """Risk result for one submission from its already-loaded events (admin review)."""
+    analyzer = RiskAnalyzer(**options)
+    session_id = submission.get("session_id")
+    analyzer.set_meta(session_id, **session_meta(submission))
+    records = ((session_id, to_seconds(event.get("timestamp")), *classify_stored(event)) for event in events)
+    analyzer.feed(record for record in records if record[1] is not None)
+    return next(analyzer.iter_results())
+
+
+def store_scores(collection, analyzer, computed_at, chunk_size=1000):
+    """Replace each session's stored score with ``analyzer``'s result, in unordered bulk writes."""
+    ops, stored = [], 0
+    for result in analyzer.iter_results():
+        ops.append(ReplaceOne({"_id": result["session_id"]}, {**result, "computed_at": computed_at}, upsert=True))
+        if len(ops) >= chunk_size:
+            collection.bulk_write(ops, ordered=False)
+            stored += len(ops)
+            ops = []
+    if ops:
+        collection.bulk_write(ops, ordered=False)
+        stored += len(ops)
+    return stored
@@ -1,7 +1,7 @@
 # backend/app.py
-from flask import Flask, request, jsonify, render_template, send_file, session, redirect, url_for
+from flask import Flask, Response, request, jsonify, render_template, send_file, session, redirect, url_for, stream_with_context
 from flask_cors import CORS
-from pymongo import MongoClient
+from pymongo import MongoClient, ReturnDocument
 from dotenv import load_dotenv
 import os
 import base64
@@ -9,27 +9,109 @@ import datetime
 import uuid
 import json
 import csv
-from bson import ObjectId
+import re
+import atexit
+import logging
+import itertools
+import math
+from admission import TokenBucket
+from analytics import RiskAnalyzer, chunks, iter_mongo, score_session, session_meta, store_scores
+from archive import SubmissionArchive, archive_chunk
+from autosave import final_answers, parse_deltas, saved_state, write_deltas
+from cache import RecordCache, TTLCache
+from catalog import TestCatalog
+from detectors.face_detector import detect_faces
+from detectors.frame_pipeline import FramePipeline
+from detectors.service import FaceDetectionService, ServiceBusy
+from event_buffer import BufferFull, EventBuffer
+from event_store import EMPTY_COUNTERS, EventStore, event_count, legacy_logs, warning_count
+from exporter import iter_log_rows, stream_csv
+from grading import answer_keys, build_grade, ensure_grade, ensure_grades, is_current, regrade_test
+from jobs import JobRunner
+from json_provider import BSONJSONProvider, dumps_bytes, isoformat_utc
+from http_cache import Payload, payload_response, precompress_folder, send_static_precompressed
+from live_feed import Broker, ChangeStreamRelay, sse_stream
+from live_stats import LiveStats
+from media_store import MediaStore, UploadTooLarge
+from metrics import Metrics
+from provisioning import PROVISIONED, ProvisioningScheduler, provision_sessions, roster_for
+from roster import RosterError, RosterImport, iter_rows
+from schema import ensure_indexes
 
 load_dotenv()
+logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'INFO').upper(), format="%(asctime)s %(levelname)s [%(process)d] %(name)s: %(message)s")
+log = logging.getLogger("secure_exam")
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 app = Flask(__name__, static_folder=os.path.join(PROJECT_ROOT, "frontend", "static"), template_folder=os.path.join(PROJECT_ROOT, "frontend", "templates"))
+app.json = BSONJSONProvider(app)
 CORS(app)
 app.secret_key = os.environ.get('FLASK_SECRET_KEY', 'a-very-strong-secret-key-in-production')
 
 MONGO_URI = os.environ.get('MONGO_URI')
-client = MongoClient(MONGO_URI)
-db = client.secure_exam_lite
+# Per-process request and Mongo command metrics, exposed at /metrics and /api/admin/metrics.
+metrics = Metrics(slow_query_ms=float(os.environ.get('SLOW_QUERY_MS', 100)))
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+if os.environ.get('MONGO_MOCK') == '1':
+    # In-memory stand-in for tests, benchmarks and local runs without a server; mongomock is in requirements-dev.txt.
+    import mongomock
+    client = mongomock.MongoClient()
+else:
+    # Pool sizing: each worker process owns one client; MONGO_MAX_POOL_SIZE should cover its request threads
+    # plus the background flushers, and waitQueueTimeoutMS turns pool exhaustion into a fast error instead of a hang.
+    client = MongoClient(
+        MONGO_URI,
+        maxPoolSize=int(os.environ.get('MONGO_MAX_POOL_SIZE', 100)),
+        minPoolSize=int(os.environ.get('MONGO_MIN_POOL_SIZE', 0)),
+        maxIdleTimeMS=int(os.environ.get('MONGO_MAX_IDLE_MS', 60000)),
+        waitQueueTimeoutMS=int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', 5000)),
+        serverSelectionTimeoutMS=int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', 10000)),
+        event_listeners=[metrics],
+    )
+db = client[os.environ.get('MONGO_DB_NAME', 'secure_exam_lite')]
 users_collection = db.users
 tests_collection = db.tests
 submissions_collection = db.submissions
+ensure_indexes(db)
+# Read-through caches for tests and users; invalidated locally on writes, TTL bounds staleness across processes.
+tests_cache = RecordCache(tests_collection, "test_id", maxsize=int(os.environ.get('TEST_CACHE_SIZE', 2048)), ttl=float(os.environ.get('TEST_CACHE_TTL', 60)))
+users_cache = RecordCache(users_collection, "user_id", projection={"_id": 0, "password": 0}, maxsize=int(os.environ.get('USER_CACHE_SIZE', 100000)), ttl=float(os.environ.get('USER_CACHE_TTL', 300)))
+# Serialized exam-details responses (body, ETag, gzip/br variants), one per test, dropped together with tests_cache.
+test_catalog = TestCatalog(tests_collection, pinned_test_id="dummy-test-01", ttl=tests_cache.cache.ttl)
+exam_details_payloads = TTLCache(maxsize=tests_cache.cache.maxsize, ttl=tests_cache.cache.ttl)
+event_store = EventStore(db, submissions_collection)
+risk_scores_collection = db.risk_scores
+live_stats = LiveStats(db)
+if not live_stats.is_initialized():
+    live_stats.rebuild(submissions_collection)
+
+log.info("Connected to MongoDB.")
+
+# Static assets and pages: compressed once at startup, then served with ETags and Cache-Control.
+STATIC_MAX_AGE = int(os.environ.get('STATIC_MAX_AGE', 3600))
+PAGE_MAX_AGE = int(os.environ.get('PAGE_MAX_AGE', 300))
+EXAM_DETAILS_MAX_AGE = int(os.environ.get('EXAM_DETAILS_MAX_AGE', 60))
+if os.environ.get('PRECOMPRESS_STATIC', '1') == '1':
+    log.info("Precompressed %d static files.", precompress_folder(app.static_folder))
+app.view_functions['static'] = lambda filename: send_static_precompressed(app.static_folder, filename, STATIC_MAX_AGE)
+_page_payloads = {}
+
+def render_page(template_name):
+    """The templates have no per-request context, so each is rendered and compressed once (every time in debug)."""
+    payload = _page_payloads.get(template_name)
+    if payload is None or app.debug:
+        payload = _page_payloads[template_name] = Payload(render_template(template_name).encode("utf-8"), "text/html")
+    return payload_response(payload, max_age=PAGE_MAX_AGE)
 
-print("[DB_CONNECT] Successfully connected to MongoDB.")
+def invalidate_test(test_id):
+    tests_cache.invalidate(test_id)
+    exam_details_payloads.invalidate(test_id)
+    test_catalog.invalidate()
+    answer_keys.invalidate(test_id)
 
 def create_dummy_test_if_not_exists():
     dummy_test_id = "dummy-test-01"
     if tests_collection.count_documents({"test_id": dummy_test_id}) == 0:
-        print(f"Creating dummy test with ID: {dummy_test_id}")
+        log.info(f"Creating dummy test with ID: {dummy_test_id}")
         dummy_test = {
             "test_id": dummy_test_id, "name": "Sample Physics Test", "code": "PHY-DUMMY", "duration_seconds": 600,
             "questions": [
@@ -40,55 +122,221 @@ def create_dummy_test_if_not_exists():
         tests_collection.insert_one(dummy_test)
 create_dummy_test_if_not_exists()
 
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 500))
+FRAME_MAX_BYTES = int(os.environ.get('FRAME_MAX_BYTES', 512 * 1024))
+FRAME_BATCH_MAX = int(os.environ.get('FRAME_BATCH_MAX', 16))
+frame_pipeline = FramePipeline(target_width=int(os.environ.get('FRAME_TARGET_WIDTH', 320)))
+face_service = FaceDetectionService(
+    max_workers=int(os.environ.get('FACE_DETECT_WORKERS', 0)) or None,
+    max_pending=int(os.environ.get('FACE_DETECT_QUEUE', 0)) or None
+)
 UPLOAD_FOLDER = os.path.join(PROJECT_ROOT, "backend", "uploads")
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+SELFIE_MAX_BYTES = int(os.environ.get('SELFIE_MAX_BYTES', 5 * 1024 * 1024))
+media_store = MediaStore(os.path.join(UPLOAD_FOLDER, "media"))
+# Completed submissions older than ARCHIVE_AFTER_DAYS move to compressed shards on disk (archive_submissions job).
+ARCHIVE_AFTER_DAYS = float(os.environ.get('ARCHIVE_AFTER_DAYS', 180))
+submission_archive = SubmissionArchive(
+    db, os.environ.get('ARCHIVE_FOLDER', os.path.join(PROJECT_ROOT, "backend", "archive")),
+    shard_bytes=int(os.environ.get('ARCHIVE_SHARD_MB', 64)) * 1024 * 1024
+)
 
-def mongo_serializer(obj):
-    if isinstance(obj, (ObjectId, datetime.datetime)): return str(obj)
-    raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
+EVENT_BATCH_MAX = int(os.environ.get('EVENT_BATCH_MAX', 200))
+# While Mongo rejects writes, events stay queued up to EVENT_BUFFER_MAX; beyond that uploads get 503.
+event_buffer = EventBuffer(
+    event_store.record,
+    max_events=int(os.environ.get('EVENT_FLUSH_SIZE', 500)),
+    max_delay=float(os.environ.get('EVENT_FLUSH_SECONDS', 1.0)),
+    max_pending=int(os.environ.get('EVENT_BUFFER_MAX', 100000))
+)
+# Autosaved answer deltas are coalesced per question and flushed as targeted $set writes.
+AUTOSAVE_MAX_ANSWER_CHARS = int(os.environ.get('AUTOSAVE_MAX_ANSWER_CHARS', 20000))
+answer_buffer = EventBuffer(
+    lambda batch: write_deltas(submissions_collection, batch),
+    max_events=int(os.environ.get('AUTOSAVE_FLUSH_SIZE', 2000)),
+    max_delay=float(os.environ.get('AUTOSAVE_FLUSH_SECONDS', 2.0))
+)
 
-def save_base64_image(base64_data, upload_dir, filename_prefix):
-    try:
-        if ";base64," in base64_data:
-            header, encoded = base64_data.split(",", 1)
-        else:
-            encoded = base64_data
-        decoded_data = base64.b64decode(encoded)
-        unique_filename = f"{filename_prefix}_{datetime.datetime.utcnow().strftime('%Y%m%d%H%M%S')}.jpeg"
-        file_path = os.path.join(upload_dir, unique_filename)
-        with open(file_path, 'wb') as f: f.write(decoded_data)
-        return file_path
-    except Exception: return None
+# Heavy admin work (cascading deletes, exports, regrades, media cleanup) runs in chunks on background threads.
+JOB_CHUNK_SIZE = int(os.environ.get('JOB_CHUNK_SIZE', 500))
+job_runner = JobRunner(
+    db,
+    workers=int(os.environ.get('JOB_WORKERS', 1)),
+    chunk_size=JOB_CHUNK_SIZE,
+    throttle_seconds=float(os.environ.get('JOB_THROTTLE_SECONDS', 0.05))
+)
+job_runner.recover()
+EXPORT_FOLDER = os.path.join(PROJECT_ROOT, "backend", "exports")
+os.makedirs(EXPORT_FOLDER, exist_ok=True)
+EXPORT_RETENTION_HOURS = float(os.environ.get('EXPORT_RETENTION_HOURS', 24))
+MEDIA_CLEANUP_GRACE_HOURS = float(os.environ.get('MEDIA_CLEANUP_GRACE_HOURS', 24))
+
+# Scheduled starts: sessions are pre-created shortly before the start bell, and the
+# burst of starts and selfie uploads is paced by per-process token buckets (429 + Retry-After).
+PROVISION_LEAD_SECONDS = int(os.environ.get('PROVISION_LEAD_SECONDS', 900))
+start_admission = TokenBucket(float(os.environ.get('START_ADMISSION_RATE', 50)), float(os.environ.get('START_ADMISSION_BURST', 100)))
+selfie_admission = TokenBucket(float(os.environ.get('SELFIE_ADMISSION_RATE', 20)), float(os.environ.get('SELFIE_ADMISSION_BURST', 40)))
+
+_shutdown_done = False
+def shutdown():
+    """Drain background work before the process exits; safe to call more than once.
+
+    Face checks finish first so their events still reach the buffer, running
+    jobs get a bounded grace period, then the buffers are flushed to Mongo and
+    the client closed. Runs from atexit and from
+    the gunicorn worker_exit hook.
+    """
+    global _shutdown_done
+    if _shutdown_done: return
+    _shutdown_done = True
+    face_service.shutdown()
+    provisioner.stop()
+    job_runner.shutdown(timeout=float(os.environ.get('JOB_SHUTDOWN_SECONDS', 20)))
+    event_buffer.close()
+    answer_buffer.close()
+    log.info("Shutdown complete: %s", event_buffer.stats)
+    client.close()
+atexit.register(shutdown)
+
+_session_cache = {}
+def lookup_session(session_id):
+    """(test_id, status) for a session, cached so event requests do not read Mongo per batch.
+
+    The status can be stale across worker processes; nothing that adjusts counters relies on it.
+    """
+    cached = _session_cache.get(session_id)
+    if cached: return cached
+    sub = submissions_collection.find_one({"session_id": session_id}, {"_id": 0, "test_id": 1, "status": 1}) if session_id else None
+    if not sub: return None
+    if len(_session_cache) > 100000: _session_cache.clear()
+    _session_cache[session_id] = (sub.get("test_id"), sub.get("status"))
+    return _session_cache[session_id]
+
+def find_submission(session_id):
+    """A submission from the hot collection, falling back to the archive (read-only copy with its events)."""
+    return submissions_collection.find_one({"session_id": session_id}) or submission_archive.fetch(session_id)
+
+def session_events(submission):
+    if submission.get("archived"):
+        return legacy_logs(submission) + submission.get("events", [])
+    return event_store.for_session(submission)
+
+def session_exists(session_id):
+    return lookup_session(session_id) is not None
+
+def session_active(session_id):
+    found = lookup_session(session_id)
+    return found is not None and found[1] == "active"
+
+def count_pending_alerts(counts):
+    """Add newly stored events to pending alerts for sessions that are still active.
+
+    Status is read from Mongo at flush time rather than from _session_cache: another
+    worker may have completed the session, and its submit already backed out the
+    alerts it saw, so counting later events would leave the totals drifting upward.
+    """
+    alerts_by_test = {}
+    for sub in submissions_collection.find({"session_id": {"$in": list(counts)}, "status": "active"}, {"_id": 0, "session_id": 1, "test_id": 1}):
+        alerts_by_test[sub.get("test_id")] = alerts_by_test.get(sub.get("test_id"), 0) + counts[sub["session_id"]]
+    live_stats.alerts_added(alerts_by_test)
+event_store.listeners.append(count_pending_alerts)
+
+# Proctor live feed: local publishes by default, Mongo change streams when
+# LIVE_FEED_CHANGE_STREAMS=1 (needs a replica set; covers every app process).
+live_broker = Broker()
+LIVE_FEED_CHANGE_STREAMS = os.environ.get('LIVE_FEED_CHANGE_STREAMS') == '1'
+
+def publish_live(event, data):
+    if not LIVE_FEED_CHANGE_STREAMS and live_broker.has_subscribers:
+        live_broker.publish(event, data() if callable(data) else data)
+
+event_store.listeners.append(lambda counts: publish_live("alerts", {"counts": counts}))
+
+def decode_base64_image(base64_data):
+    """Bytes from a data URL or bare base64 string; raises ValueError on bad input."""
+    if not base64_data:
+        raise ValueError("No image data")
+    encoded = base64_data.split(",", 1)[1] if ";base64," in base64_data else base64_data
+    return base64.b64decode(encoded, validate=True)
+
+def encode_cursor(start_time, session_id):
+    raw = json.dumps({"t": start_time.isoformat() if start_time else None, "s": session_id})
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor):
+    raw = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    return (datetime.datetime.fromisoformat(raw["t"]) if raw.get("t") else None), raw["s"]
+
+def admission_denied(bucket):
+    """None if the request is admitted, else a 429 response telling the client when to retry."""
+    wait = bucket.acquire()
+    if not wait: return None
+    response = jsonify({"status": "busy", "message": "Many candidates are starting at once; retrying shortly.", "retry_after": round(wait, 2)})
+    response.headers["Retry-After"] = str(math.ceil(wait))
+    return response, 429
+
+def parse_utc_datetime(value):
+    parsed = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return parsed
+
+@app.before_request
+def start_request_metrics():
+    metrics.start_request(request.url_rule.rule if request.url_rule else "(unmatched)")
+
+@app.after_request
+def finish_request_metrics(response):
+    stats = metrics.end_request(request.method, response.status_code)
+    if stats:
+        response.headers["Server-Timing"] = f'app;dur={stats["seconds"] * 1000:.1f}, db;dur={stats["db_seconds"] * 1000:.1f};desc="{stats["queries"]} queries"'
+    return response
+
+@app.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    """Prometheus scrape endpoint: bearer METRICS_TOKEN when set, otherwise an admin session."""
+    authorized = request.headers.get("Authorization") == f"Bearer {METRICS_TOKEN}" if METRICS_TOKEN else session.get('admin_logged_in')
+    if not authorized:
+        return jsonify({"status": "error", "message": "Unauthorized"}), 401
+    return Response(metrics.prometheus(), mimetype="text/plain; version=0.0.4")
+
+@app.route("/api/admin/metrics", methods=["GET"])
+def admin_metrics():
+    """Routes ranked by total time with queries/documents per request, Mongo commands, recent slow queries."""
+    if not session.get('admin_logged_in'):
+        return jsonify({"status": "error", "message": "Unauthorized"}), 401
+    return jsonify({"status": "success", **metrics.snapshot(),
+                    "admission": {"start": start_admission.stats(), "selfie": selfie_admission.stats()}})
 
 @app.route("/")
 @app.route("/homepage.html")
-def home(): return render_template('homepage.html')
+def home(): return render_page('homepage.html')
 @app.route("/login.html")
-def login_page(): return render_template('login.html')
+def login_page(): return render_page('login.html')
 @app.route("/student_dashboard.html")
-def student_dashboard_page(): return render_template('student_dashboard.html')
+def student_dashboard_page(): return render_page('student_dashboard.html')
 @app.route("/exam.html")
-def exam_page(): return render_template('exam.html')
+def exam_page(): return render_page('exam.html')
 @app.route("/admin_dashboard.html")
-def admin_dashboard_page(): return render_template('admin_dashboard.html')
+def admin_dashboard_page(): return render_page('admin_dashboard.html')
 @app.route("/admin_login.html")
-def admin_login_page(): return render_template('admin_login.html')
+def admin_login_page(): return render_page('admin_login.html')
 @app.route("/submission_success.html")
-def submission_success(): return render_template('submission_success.html')
+def submission_success(): return render_page('submission_success.html')
 @app.route("/past_answers.html")
-def past_answers_page(): return render_template('past_answers.html')
+def past_answers_page(): return render_page('past_answers.html')
 @app.route("/admin_review.html")
-def admin_review_page(): return render_template('admin_review.html')
+def admin_review_page(): return render_page('admin_review.html')
 @app.route("/student_results.html")
-def student_results_page(): return render_template('student_results.html')
+def student_results_page(): return render_page('student_results.html')
 @app.route("/create_test.html")
-def create_test_page(): return render_template('create_test.html')
+def create_test_page(): return render_page('create_test.html')
 
 @app.route("/api/student/login", methods=["POST"])
 def login_student():
     data = request.get_json()
-    student = users_collection.find_one({"user_id": data.get("studentId"), "full_name": data.get("fullName"), "role": "student"})
-    if student:
+    student = users_cache.get(data.get("studentId"))
+    if student and student.get("full_name") == data.get("fullName") and student.get("role") == "student":
         session['user_id'] = student['user_id']
         session['user_name'] = student['full_name']
         return jsonify({"status": "success"}), 200
@@ -97,68 +345,150 @@ def login_student():
 @app.route("/api/student/dashboard", methods=["GET"])
 def get_student_dashboard():
     if 'user_id' not in session: return jsonify({"status": "error", "message": "Unauthorized"}), 401
-    student_id = session['user_id']
-    dummy_test = tests_collection.find_one({"test_id": "dummy-test-01"})
-    all_other_tests = list(tests_collection.find({"test_id": {"$ne": "dummy-test-01"}}))
-    tests_dict = {test['test_id']: test for test in all_other_tests}
-    student_submissions = list(submissions_collection.find({"student_id": student_id}))
-    completed_test_ids = {sub['test_id'] for sub in student_submissions}
-    available_exams, upcoming_exams, completed_exams = [], [], []
-    now = datetime.datetime.now(datetime.timezone.utc)
-    for sub in student_submissions:
-        test_info = tests_dict.get(sub['test_id'])
-        if test_info:
-            completed_test = test_info.copy()
-            completed_test['submission_id'] = sub['session_id']
-            completed_test['submission_time'] = sub.get('end_time')  # Add submission time for 24-hour check
-            completed_exams.append(completed_test)
-    for test in all_other_tests:
-        if test['test_id'] not in completed_test_ids:
-            scheduled_time = test.get('scheduled_datetime')
-            if scheduled_time and scheduled_time.tzinfo is None:
-                scheduled_time = scheduled_time.replace(tzinfo=datetime.timezone.utc)
-            if scheduled_time and now < scheduled_time:
-                upcoming_exams.append(test)
-            else:
-                available_exams.append(test)
-    if dummy_test:
-        available_exams.insert(0, dummy_test)
-    dashboard_data = { "status": "success", "student_name": session.get('user_name'), "exams": { "available": available_exams, "upcoming": upcoming_exams, "completed": completed_exams } }
-    return jsonify(json.loads(json.dumps(dashboard_data, default=mongo_serializer)))
+    pinned, available, upcoming, cards = test_catalog.partition()
+    completed_exams, taken = [], set()
+    for sub in submissions_collection.find({"student_id": session['user_id'], "status": {"$ne": PROVISIONED}}, {"_id": 0, "test_id": 1, "session_id": 1, "end_time": 1}):
+        taken.add(sub['test_id'])
+        card = cards.get(sub['test_id'])
+        if card:
+            end_time = sub.get('end_time')
+            completed_exams.append({**card, "submission_id": sub['session_id'], "submission_time": isoformat_utc(end_time) if end_time else None})
+    for entry in submission_archive.entries({"student_id": session['user_id']}):
+        taken.add(entry['test_id'])
+        card = cards.get(entry['test_id'])
+        if card:
+            end_time = entry.get('end_time')
+            completed_exams.append({**card, "submission_id": entry['session_id'], "submission_time": isoformat_utc(end_time) if end_time else None})
+    if taken:
+        available = [card for card in available if card['test_id'] not in taken]
+        upcoming = [card for card in upcoming if card['test_id'] not in taken]
+    if pinned:
+        available = [pinned] + available
+    return jsonify({"status": "success", "student_name": session.get('user_name'), "exams": {"available": available, "upcoming": upcoming, "completed": completed_exams}})
 
 @app.route("/api/exam/details/<test_id>", methods=["GET"])
 def get_exam_details(test_id):
-    test = tests_collection.find_one({"test_id": test_id}, {"_id": 0})
-    if test: return jsonify({"status": "success", "details": json.loads(json.dumps(test, default=mongo_serializer))})
+    payload = exam_details_payloads.get_or_load(test_id, load_exam_details_payload)
+    if payload: return payload_response(payload, max_age=EXAM_DETAILS_MAX_AGE, private=True)
     return jsonify({"status": "error", "message": "Test not found"}), 404
 
+def load_exam_details_payload(test_id):
+    test = tests_cache.get(test_id)
+    if not test: return None
+    return Payload(dumps_bytes({"status": "success", "details": test}), "application/json")
+
 @app.route("/api/exam/start", methods=["POST"])
 def start_exam_session():
+    """Activate the student's pre-provisioned session for the test, or create one.
+
+    Returns 429 with Retry-After when more starts arrive than the admission rate allows.
+    """
+    busy = admission_denied(start_admission)
+    if busy: return busy
     data = request.get_json()
-    session_id = str(uuid.uuid4())
-    new_submission = {"session_id": session_id, "student_id": data.get('student_id'), "test_id": data.get('test_id'), "start_time": datetime.datetime.utcnow(), "status": "active", "answers": [], "logs": []}
-    submissions_collection.insert_one(new_submission)
-    print(f"SUCCESS: New submission created with session_id: {session_id}")
+    now = datetime.datetime.utcnow()
+    activated = {"status": "active", "start_time": now}
+    new_submission = submissions_collection.find_one_and_update(
+        {"student_id": data.get('student_id'), "test_id": data.get('test_id'), "status": PROVISIONED},
+        {"$set": activated},
+        projection={"_id": 0, "session_id": 1, "student_id": 1, "test_id": 1},
+        return_document=ReturnDocument.BEFORE
+    )
+    if new_submission is not None:
+        new_submission.update(activated)
+    else:
+        new_submission = {"session_id": str(uuid.uuid4()), "student_id": data.get('student_id'), "test_id": data.get('test_id'), "start_time": now, "status": "active", "answers": [], "counters": dict(EMPTY_COUNTERS)}
+        submissions_collection.insert_one(new_submission)
+    session_id = new_submission["session_id"]
+    _session_cache[session_id] = (data.get('test_id'), "active")
+    live_stats.session_started(data.get('test_id'))
+    publish_live("session_started", lambda: describe_session(new_submission))
+    log.debug("New submission created with session_id: %s", session_id)
     return jsonify({"status": "success", "session_id": session_id}), 201
 
+@app.route("/api/exam/autosave", methods=["POST"])
+def autosave_answers():
+    """Accept changed answers {session_id, deltas: [{index, answer, version}]}.
+
+    Versions are per question and increase with every edit on the client.
+    Deltas are buffered, coalesced to the newest version per question and
+    written as targeted updates; older versions never overwrite newer ones.
+    """
+    data = request.get_json(force=True, silent=True) or {}
+    session_id = data.get("session_id")
+    known = lookup_session(session_id)
+    if not known: return jsonify({"status": "error", "message": "Session not found"}), 404
+    if known[1] != "active": return jsonify({"status": "error", "message": "Session is no longer active."}), 409
+    test = tests_cache.get(known[0])
+    try:
+        deltas = parse_deltas(data.get("deltas"), len(test.get("questions", [])) if test else 0, AUTOSAVE_MAX_ANSWER_CHARS)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    accepted, _ = answer_buffer.add(session_id, deltas)
+    return jsonify({"status": "ok", "accepted": accepted}), 202
+
+@app.route("/api/exam/answers/<session_id>", methods=["GET"])
+def get_saved_answers(session_id):
+    """Saved answers and versions for resuming an active session after a reload or crash.
+
+    ``elapsed_seconds`` is measured on the server clock from the session's start_time,
+    so the resumed timer continues instead of restarting at the full duration.
+    """
+    if 'user_id' not in session: return jsonify({"status": "error", "message": "Unauthorized"}), 401
+    answer_buffer.flush()
+    submission = submissions_collection.find_one({"session_id": session_id, "student_id": session['user_id']}, {"_id": 0, "status": 1, "test_id": 1, "answers": 1, "start_time": 1})
+    if not submission: return jsonify({"status": "error", "message": "Session not found"}), 404
+    saved = sorted(saved_state(submission.get("answers")).values(), key=lambda delta: delta["index"])
+    start_time = submission.get("start_time")
+    elapsed = max(0, int((datetime.datetime.utcnow() - start_time).total_seconds())) if start_time else 0
+    return jsonify({"status": "success", "session_status": submission.get("status"), "test_id": submission.get("test_id"), "answers": saved,
+                    "elapsed_seconds": elapsed})
+
 @app.route('/api/exam/submit', methods=['POST'])
 def submit_exam():
+    """Finalize a session. ``answers`` (full list, legacy clients) replaces the saved answers;
+    otherwise the saved autosave state is used, with optional final ``deltas`` merged in by version."""
     data = request.get_json()
     session_id = data.get('session_id')
     answers = data.get('answers')
-    if not session_id or answers is None: return jsonify({"status": "error", "message": "Missing data."}), 400
-    result = submissions_collection.update_one(
-        {"session_id": session_id, "status": "active"},
-        {"$set": {"status": "completed", "answers": answers, "end_time": datetime.datetime.utcnow()}}
+    if not session_id: return jsonify({"status": "error", "message": "Missing data."}), 400
+    if answers is None:
+        current = submissions_collection.find_one({"session_id": session_id, "status": "active"}, {"_id": 0, "test_id": 1, "answers": 1})
+        if not current: return jsonify({"status": "error", "message": "Session not found or already completed."}), 404
+        test = tests_cache.get(current.get("test_id"))
+        try:
+            deltas = parse_deltas(data.get("deltas", []), len(test.get("questions", [])) if test else 0, AUTOSAVE_MAX_ANSWER_CHARS)
+        except ValueError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+        if not deltas:
+            answer_buffer.flush()  # edits this process accepted but has not written yet
+            current = submissions_collection.find_one({"session_id": session_id, "status": "active"}, {"_id": 0, "answers": 1}) or current
+        answers = final_answers(current.get("answers"), deltas, test)
+    event_buffer.flush()  # events this process accepted but has not written yet, so the counters are final
+    # The pre-update document (projected) plus the fields just set; mongomock re-applies the filter
+    # when asked for a projected post-update document, which no longer matches "active".
+    completed = {"status": "completed", "answers": answers, "end_time": datetime.datetime.utcnow()}
+    submission = submissions_collection.find_one_and_update(
+        {"session_id": session_id, "status": "active"}, {"$set": completed},
+        projection={"_id": 0, "session_id": 1, "test_id": 1, "logs": 1, "counters": 1},
+        return_document=ReturnDocument.BEFORE
     )
-    if result.modified_count > 0: return jsonify({"status": "success"}), 200
-    return jsonify({"status": "error", "message": "Session not found or already completed."}), 404
+    if not submission: return jsonify({"status": "error", "message": "Session not found or already completed."}), 404
+    submission.update(completed)
+    _session_cache[session_id] = (submission.get("test_id"), "completed")
+    live_stats.session_finished(submission.get("test_id"), event_count(submission))
+    publish_live("session_submitted", {"id": session_id, "testId": submission.get("test_id")})
+    test = tests_cache.get(submission.get("test_id"))
+    if test:
+        submissions_collection.update_one({"session_id": session_id}, {"$set": {"grade": build_grade(submission, test)}})
+    frame_pipeline.forget(session_id)
+    return jsonify({"status": "success"}), 200
 
 @app.route("/api/submission/summary/<session_id>", methods=["GET"])
 def get_submission_summary(session_id):
     submission = submissions_collection.find_one({"session_id": session_id})
     if not submission: return jsonify({"status": "error", "message": "Submission not found"}), 404
-    test = tests_collection.find_one({"test_id": submission.get("test_id")})
+    test = tests_cache.get(submission.get("test_id"))
     utc_end_time = submission.get("end_time")
     ist_end_time = None
     if utc_end_time:
@@ -166,28 +496,219 @@ def get_submission_summary(session_id):
         ist_end_time = utc_end_time.replace(tzinfo=datetime.timezone.utc).astimezone(ist_tz)
     summary_data = {
         "exam_name": test.get("name", "N/A") if test else "N/A", "end_time": ist_end_time,
-        "questions_attempted": len([ans for ans in submission.get("answers", []) if ans.get("answer") is not None]),
+        "questions_attempted": len([ans for ans in submission.get("answers", []) if ans and ans.get("answer") is not None]),
         "total_questions": len(test.get("questions", [])) if test else 0,
-        "warnings": len([log for log in submission.get("logs", []) if log.get("type") == "warning"])
+        "warnings": warning_count(submission)
     }
-    return jsonify({"status": "success", "summary": json.loads(json.dumps(summary_data, default=mongo_serializer))})
+    return jsonify({"status": "success", "summary": summary_data})
+
+def face_check_event(faces, source):
+    return {
+        "timestamp": datetime.datetime.utcnow(), "event_type": "face_check", "source": source, "faces": faces,
+        "type": "info" if faces == 1 else "warning",
+        "message": f"Server {source} check: {faces} face(s) detected"
+    }
+
+def record_selfie_check(session_id, faces):
+    submissions_collection.update_one({"session_id": session_id}, {"$set": {"selfie_check": {
+        "faces": faces, "verified": faces == 1, "checked_at": datetime.datetime.utcnow()}}})
+    if faces != 1:
+        buffer_checks(session_id, [face_check_event(faces, "selfie")])
+
+def record_frame_results(session_id, results):
+    """Store one face_check event per decodable frame.
+
+    Duplicates of the previous frame repeat its face count (flagged ``duplicate``), so the
+    time a multi-face or empty view lasts is still recorded frame by frame.
+    """
+    events = []
+    for result in results:
+        if result["faces"] is None: continue
+        event = face_check_event(result["faces"], "frame")
+        event["frame_index"] = result["index"]
+        if result["duplicate"]:
+            event["duplicate"] = True
+        events.append(event)
+    if events:
+        buffer_checks(session_id, events)
+
+def buffer_checks(session_id, events):
+    """Queue face_check events produced off-request; there is no client to retry, so a full buffer drops them."""
+    try:
+        event_buffer.add(session_id, events)
+    except BufferFull:
+        log.warning(f"Event buffer full, dropped {len(events)} face check event(s) for {session_id}.")
+
+def queue_frames(session_id, frames):
+    try:
+        face_service.submit(frame_pipeline.analyze, session_id, frames, on_done=lambda results: record_frame_results(session_id, results))
+    except ServiceBusy:
+        response = jsonify({"status": "busy", "message": "Face detection queue is full"})
+        response.headers["Retry-After"] = "5"
+        return response, 503
+    return jsonify({"status": "queued", "frames": len(frames)}), 202
+
+def attach_selfie(session_id, digest, size):
+    """Point the submission at a stored selfie, then verify it and build its thumbnail off-request."""
+    submissions_collection.update_one({"session_id": session_id}, {"$set": {"selfie": {"digest": digest, "size": size, "uploaded_at": datetime.datetime.utcnow()}}})
+    def verify(path):
+        media_store.ensure_thumbnail(digest)
+        return detect_faces(path)
+    try:
+        face_service.submit(verify, media_store.path_for(digest), on_done=lambda faces: record_selfie_check(session_id, faces))
+    except ServiceBusy:
+        log.warning(f"Face detection busy, selfie for {session_id} not verified.")
+
+@app.route("/api/exam/selfie", methods=["POST"])
+def upload_selfie_binary():
+    """Store a selfie sent as the raw request body (image/jpeg) or multipart field ``selfie``."""
+    session_id = request.args.get("session_id") or request.form.get("session_id")
+    if not session_active(session_id): return jsonify({"status": "error", "message": "Session not found or not active"}), 404
+    busy = admission_denied(selfie_admission)
+    if busy: return busy
+    if request.content_length and request.content_length > SELFIE_MAX_BYTES:
+        return jsonify({"status": "error", "message": "Selfie too large"}), 413
+    upload = request.files.get("selfie")
+    try:
+        digest, size = media_store.save_stream(upload.stream if upload else request.stream, SELFIE_MAX_BYTES)
+    except UploadTooLarge:
+        return jsonify({"status": "error", "message": "Selfie too large"}), 413
+    except OSError as e:
+        log.error(f"Failed to store selfie for {session_id}: {e}")
+        return jsonify({"status": "error", "message": "Failed to save selfie"}), 500
+    if size == 0:
+        return jsonify({"status": "error", "message": "Empty selfie upload"}), 400
+    attach_selfie(session_id, digest, size)
+    return jsonify({"status": "success", "digest": digest}), 200
 
 @app.route("/upload-selfie", methods=["POST"])
 def upload_selfie():
-    data = request.get_json()
-    filepath = save_base64_image(data.get("selfie"), UPLOAD_FOLDER, f"selfie_{data.get('session_id')}")
-    if filepath:
-        submissions_collection.update_one({"session_id": data.get('session_id')}, {"$set": {"selfie_path": filepath}})
-        return jsonify({"status": "success"}), 200
-    return jsonify({"status": "error", "message": "Failed to save selfie"}), 500
+    """Legacy JSON/base64 upload; stored the same way as /api/exam/selfie."""
+    data = request.get_json(force=True, silent=True) or {}
+    session_id = data.get('session_id')
+    if not session_active(session_id): return jsonify({"status": "error", "message": "Session not found or not active"}), 404
+    busy = admission_denied(selfie_admission)
+    if busy: return busy
+    try:
+        digest, size = media_store.save_bytes(decode_base64_image(data.get("selfie")), SELFIE_MAX_BYTES)
+    except UploadTooLarge:
+        return jsonify({"status": "error", "message": "Selfie too large"}), 413
+    except ValueError as e:
+        return jsonify({"status": "error", "message": f"Invalid selfie: {e}"}), 400
+    except OSError as e:
+        log.error(f"Failed to store selfie for {session_id}: {e}")
+        return jsonify({"status": "error", "message": "Failed to save selfie"}), 500
+    attach_selfie(session_id, digest, size)
+    return jsonify({"status": "success"}), 200
+
+@app.route("/media/<digest>", methods=["GET"])
+def get_media(digest, thumb=False):
+    """Serve a stored image with its content hash as a strong ETag (conditional and range requests supported)."""
+    if not session.get('admin_logged_in'):
+        return jsonify({"status": "error", "message": "Unauthorized"}), 401
+    try:
+        if not media_store.exists(digest):
+            return jsonify({"status": "error", "message": "Not found"}), 404
+        path = media_store.ensure_thumbnail(digest) if thumb else media_store.path_for(digest)
+    except ValueError:
+        return jsonify({"status": "error", "message": "Not found"}), 404
+    response = send_file(path, mimetype="image/jpeg", conditional=True, etag=f"{digest}{'-t' if thumb else ''}", max_age=31536000)
+    response.cache_control.private = True
+    response.cache_control.public = False
+    response.cache_control.immutable = True
+    return response
+
+@app.route("/media/<digest>/thumb", methods=["GET"])
+def get_media_thumb(digest):
+    return get_media(digest, thumb=True)
+
+@app.route("/api/proctor/frame", methods=["POST"])
+def upload_proctor_frame():
+    """Queue a raw JPEG webcam frame (request body) for server-side face counting.
+
+    The result is recorded as a face_check event on the session. Returns 503
+    with Retry-After when the detection queue is full.
+    """
+    session_id = request.args.get("session_id")
+    if request.content_length and request.content_length > FRAME_MAX_BYTES:
+        return jsonify({"status": "error", "message": "Frame too large"}), 413
+    frame = request.get_data(cache=False)
+    if not frame or len(frame) > FRAME_MAX_BYTES:
+        return jsonify({"status": "error", "message": "Expected a JPEG frame body"}), 400
+    if not session_exists(session_id): return jsonify({"status": "error", "message": "Session not found"}), 404
+    return queue_frames(session_id, [frame])
+
+@app.route("/api/proctor/frames", methods=["POST"])
+def upload_proctor_frames():
+    """Queue a batch of snapshots (multipart field ``frames``, oldest first) for one session."""
+    session_id = request.form.get("session_id") or request.args.get("session_id")
+    if request.content_length and request.content_length > FRAME_MAX_BYTES * FRAME_BATCH_MAX:
+        return jsonify({"status": "error", "message": "Batch too large"}), 413
+    uploads = request.files.getlist("frames")
+    if not uploads or len(uploads) > FRAME_BATCH_MAX:
+        return jsonify({"status": "error", "message": f"Expected 1 to {FRAME_BATCH_MAX} frames"}), 400
+    if not session_exists(session_id): return jsonify({"status": "error", "message": "Session not found"}), 404
+    frames = [upload.read(FRAME_MAX_BYTES + 1) for upload in uploads]
+    if any(len(frame) > FRAME_MAX_BYTES for frame in frames):
+        return jsonify({"status": "error", "message": "Frame too large"}), 413
+    return queue_frames(session_id, frames)
+
+@app.route("/api/admin/cache-stats", methods=["GET"])
+def cache_stats():
+    if not session.get('admin_logged_in'):
+        return jsonify({"status": "error", "message": "Unauthorized"}), 401
+    return jsonify({"status": "success", "tests": tests_cache.stats(), "users": users_cache.stats()})
+
+@app.route("/api/admin/face-detection/stats", methods=["GET"])
+def face_detection_stats():
+    if not session.get('admin_logged_in'):
+        return jsonify({"status": "error", "message": "Unauthorized"}), 401
+    return jsonify({
+        "status": "success", "workers": face_service.max_workers, "max_pending": face_service.max_pending, **face_service.stats,
+        "pipeline": {**frame_pipeline.stats, "frames_per_second_per_core": frame_pipeline.throughput()}
+    })
 
 @app.route("/api/log_event", methods=["POST"])
 def log_event():
     data = request.get_json()
+    if not session_exists(data.get("session_id")): return jsonify({"status": "error", "message": "Session not found"}), 404
     log_entry = {"timestamp": datetime.datetime.utcnow(), "type": data.get("log_type", "info"), "message": data.get("log_message")}
-    result = submissions_collection.update_one({"session_id": data.get("session_id")}, {"$push": {"logs": log_entry}})
-    if result.modified_count > 0: return jsonify({"status": "ok"}), 200
-    return jsonify({"status": "error", "message": "Session not found"}), 404
+    try:
+        event_buffer.add(data.get("session_id"), [log_entry])
+    except BufferFull:
+        return event_buffer_full()
+    return jsonify({"status": "ok"}), 200
+
+def event_buffer_full():
+    response = jsonify({"status": "busy", "message": "Event buffer is full"})
+    response.headers["Retry-After"] = "5"
+    return response, 503
+
+@app.route("/api/exam/events", methods=["POST"])
+def log_events_batch():
+    """Accept a batch of client events: {session_id, client_id, events: [{seq, type, message, timestamp}]}.
+
+    Events are buffered and written in bulk; re-sent sequence numbers from the
+    same client are acknowledged but not stored again. Returns 503 with
+    Retry-After while the buffer is full.
+    """
+    data = request.get_json(force=True, silent=True) or {}
+    session_id = data.get("session_id")
+    events = data.get("events")
+    if not session_id or not isinstance(events, list) or len(events) > EVENT_BATCH_MAX:
+        return jsonify({"status": "error", "message": f"Expected session_id and up to {EVENT_BATCH_MAX} events."}), 400
+    if not session_exists(session_id): return jsonify({"status": "error", "message": "Session not found"}), 404
+    received_at = datetime.datetime.utcnow()
+    entries = [
+        {"timestamp": received_at, "type": event.get("type", "info"), "message": event.get("message"),
+         "seq": event.get("seq"), "client_id": data.get("client_id"), "client_time": event.get("timestamp")}
+        for event in events if isinstance(event, dict)
+    ]
+    try:
+        accepted, duplicates = event_buffer.add(session_id, entries, data.get("client_id"))
+    except BufferFull:
+        return event_buffer_full()
+    return jsonify({"status": "ok", "accepted": accepted, "duplicates": duplicates}), 202
 
 @app.route("/api/exam/violation", methods=["POST"])
 def log_exam_violation():
@@ -204,6 +725,8 @@ def log_exam_violation():
         # Log the violation
         violation_log = {
             "event_type": "exam_violation",
+            "type": "error",
+            "message": f"Exam locked: {reason}",
             "violation_type": violation_type,
             "reason": reason,
             "timestamp": datetime.datetime.utcnow(),
@@ -212,20 +735,15 @@ def log_exam_violation():
             "exam_locked": True
         }
         
-        # Update submission with violation and mark as locked
-        submissions_collection.update_one(
-            {"session_id": session_id},
-            {
-                "$push": {"logs": violation_log},
-                "$set": {
-                    "exam_locked": True,
-                    "lock_reason": reason,
-                    "lock_timestamp": datetime.datetime.utcnow()
-                }
-            }
-        )
+        # Record the violation and mark the submission as locked
+        event_store.append(session_id, violation_log, {
+            "exam_locked": True,
+            "lock_reason": reason,
+            "lock_timestamp": datetime.datetime.utcnow()
+        })
         
-        print(f"Exam locked for session {session_id}: {reason}")
+        publish_live("session_locked", {"id": session_id, "reason": reason, "type": violation_type})
+        log.info(f"Exam locked for session {session_id}: {reason}")
         return jsonify({"status": "success", "message": "Violation logged and exam locked"})
     
     return jsonify({"status": "error", "message": "Invalid violation data"}), 400
@@ -241,11 +759,18 @@ def admin_login():
 
 @app.route("/api/admin/summary", methods=["GET"])
 def get_admin_summary():
-    active_sessions_count = submissions_collection.count_documents({"status": "active"})
-    pipeline = [{"$match": {"status": "active"}}, {"$project": {"alerts_count": {"$size": "$logs"}}}, {"$group": {"_id": None, "total_alerts": {"$sum": "$alerts_count"}}}]
-    alerts_result = list(submissions_collection.aggregate(pipeline))
-    pending_alerts_count = alerts_result[0]['total_alerts'] if alerts_result else 0
-    return jsonify({ "status": "success", "activeSessions": active_sessions_count, "pendingAlerts": pending_alerts_count })
+    summary = live_stats.summary(request.args.get("test_id") or None)
+    response = {"status": "success", **summary}
+    if request.args.get("breakdown"):
+        response["byTest"] = live_stats.breakdown()
+    return jsonify(response)
+
+@app.route("/api/admin/summary/rebuild", methods=["POST"])
+def rebuild_admin_summary():
+    if not session.get('admin_logged_in'):
+        return jsonify({"status": "error", "message": "Unauthorized"}), 401
+    live_stats.rebuild(submissions_collection)
+    return jsonify({"status": "success", **live_stats.summary()})
 
 @app.route("/api/admin/exams", methods=["GET"])
 def get_exam_options():
@@ -253,23 +778,13 @@ def get_exam_options():
     exams_list = [{"id": exam['test_id'], "name": exam['name']} for exam in exams_cursor]
     return jsonify({"status": "success", "exams": exams_list})
 
-@app.route("/api/admin/sessions", methods=["GET"])
-def get_admin_sessions():
-    if not session.get('admin_logged_in'):
-        return jsonify({"status": "error", "message": "Unauthorized"}), 401
-    
-    course_id = request.args.get('courseId', '')
-    query = {"status": "active"}
-    if course_id:
-        query["test_id"] = course_id
-    
-    submissions = list(submissions_collection.find(query).sort("start_time", -1))
-    tests = list(tests_collection.find())
-    users = list(users_collection.find())
-    
-    tests_dict = {test['test_id']: test for test in tests}
-    users_dict = {user['user_id']: user for user in users}
-    
+def describe_sessions(submissions):
+    """Rows for the proctor session list; tests and users are joined for these submissions only."""
+    submissions = list(submissions)
+    test_ids = list({sub.get("test_id") for sub in submissions})
+    student_ids = list({sub.get("student_id") for sub in submissions})
+    tests_dict = tests_cache.get_many(test_ids)
+    users_dict = users_cache.get_many(student_ids)
     sessions_list = []
     for sub in submissions:
         test_info = tests_dict.get(sub.get("test_id"))
@@ -279,13 +794,42 @@ def get_admin_sessions():
             time_str = start_time.strftime("%H:%M") if start_time else "N/A"
             sessions_list.append({
                 "id": sub.get("session_id"),
+                "testId": sub.get("test_id"),
                 "studentName": student_info.get("full_name", "N/A"),
                 "examName": test_info.get("name", "N/A"),
                 "status": sub.get("status", "active"),
                 "time": time_str
             })
+    return sessions_list
+
+def describe_session(submission):
+    rows = describe_sessions([submission])
+    return rows[0] if rows else {"id": submission.get("session_id"), "testId": submission.get("test_id"), "status": submission.get("status", "active")}
+
+@app.route("/api/admin/sessions", methods=["GET"])
+def get_admin_sessions():
+    if not session.get('admin_logged_in'):
+        return jsonify({"status": "error", "message": "Unauthorized"}), 401
+    
+    course_id = request.args.get('courseId', '')
+    query = {"status": "active"}
+    if course_id:
+        query["test_id"] = course_id
     
-    return jsonify({"status": "success", "sessions": sessions_list})
+    submissions = submissions_collection.find(query, {"_id": 0, "session_id": 1, "test_id": 1, "student_id": 1, "status": 1, "start_time": 1}).sort("start_time", -1)
+    return jsonify({"status": "success", "sessions": describe_sessions(submissions)})
+
+@app.route("/api/admin/live", methods=["GET"])
+def admin_live_feed():
+    """Server-sent events for proctors: session_started, session_submitted, session_locked and alerts."""
+    if not session.get('admin_logged_in'):
+        return jsonify({"status": "error", "message": "Unauthorized"}), 401
+    subscription = live_broker.subscribe()
+    return Response(
+        stream_with_context(sse_stream(live_broker, subscription)),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.route("/api/admin/session/<session_id>", methods=["GET"])
 def get_admin_session_details(session_id):
@@ -296,8 +840,8 @@ def get_admin_session_details(session_id):
     if not submission:
         return jsonify({"status": "error", "message": "Session not found"}), 404
     
-    test = tests_collection.find_one({"test_id": submission.get("test_id")})
-    user = users_collection.find_one({"user_id": submission.get("student_id")})
+    test = tests_cache.get(submission.get("test_id"))
+    user = users_cache.get(submission.get("student_id"))
     
     if not test or not user:
         return jsonify({"status": "error", "message": "Data not found"}), 404
@@ -313,96 +857,136 @@ def get_admin_session_details(session_id):
         "startTime": start_time.strftime("%Y-%m-%d %H:%M:%S") if start_time else "N/A",
         "endTime": end_time.strftime("%Y-%m-%d %H:%M:%S") if end_time else "N/A",
         "status": submission.get("status", "active"),
-        "alerts": submission.get("logs", []),
+        "alerts": event_store.for_session(submission),
         "downloadLinks": []  # Placeholder for future file downloads
     }
     
     return jsonify({"status": "success", "details": details})
 
+def export_query(args):
+    """Completed-submission filter from ``test_id`` and ``from``/``to`` params; raises ValueError/TypeError."""
+    query = {"status": "completed"}
+    if args.get("test_id"):
+        query["test_id"] = args["test_id"]
+    time_range = {}
+    if args.get("from"): time_range["$gte"] = parse_utc_datetime(args["from"])
+    if args.get("to"): time_range["$lte"] = parse_utc_datetime(args["to"])
+    if time_range:
+        query["start_time"] = time_range
+    return query
+
 @app.route("/api/admin/export-all-logs-csv", methods=["GET"])
 def export_all_logs_csv():
+    """Stream completed submissions as CSV (kept for small exports; large ones should use /api/admin/exports).
+
+    Optional query params: ``test_id``, ``from``/``to`` (ISO datetimes bounding
+    ``start_time``) and ``gzip=1`` for a compressed download.
+    """
     if not session.get('admin_logged_in'):
         return jsonify({"status": "error", "message": "Unauthorized"}), 401
-    
     try:
-        submissions = list(submissions_collection.find({"status": "completed"}))
-        tests = list(tests_collection.find())
-        users = list(users_collection.find())
-        
-        tests_dict = {test['test_id']: test for test in tests}
-        users_dict = {user['user_id']: user for user in users}
-        
-        # Create CSV content
-        csv_content = "Session ID,Student Name,Student ID,Exam Name,Start Time,End Time,Warning Count,Log Details\n"
-        
-        for sub in submissions:
-            test_info = tests_dict.get(sub.get("test_id"))
-            student_info = users_dict.get(sub.get("student_id"))
-            
-            if test_info and student_info:
-                session_id = sub.get("session_id", "")
-                student_name = student_info.get("full_name", "N/A")
-                student_id = student_info.get("user_id", "N/A")
-                exam_name = test_info.get("name", "N/A")
-                start_time = sub.get("start_time", "")
-                end_time = sub.get("end_time", "")
-                warning_count = len([log for log in sub.get("logs", []) if log.get("type") == "warning"])
-                log_details = "; ".join([f"{log.get('message', '')}" for log in sub.get("logs", [])])
-                
-                csv_content += f'"{session_id}","{student_name}","{student_id}","{exam_name}","{start_time}","{end_time}","{warning_count}","{log_details}"\n'
-        
-        from io import StringIO
-        output = StringIO()
-        output.write(csv_content)
-        output.seek(0)
-        
-        from flask import Response
-        return Response(
-            output.getvalue(),
-            mimetype="text/csv",
-            headers={"Content-Disposition": "attachment;filename=all_proctoring_logs.csv"}
-        )
-    except Exception as e:
-        print(f"ERROR: Failed to export logs: {e}")
-        return jsonify({"status": "error", "message": "Failed to export logs"}), 500
+        query = export_query(request.args)
+    except (ValueError, TypeError):
+        return jsonify({"status": "error", "message": "Invalid date filter."}), 400
+    compress = request.args.get("gzip") in ("1", "true")
+
+    def generate():
+        try:
+            rows = iter_log_rows(submissions_collection, tests_collection, users_collection, event_store, query, batch_size=EXPORT_BATCH_SIZE)
+            yield from stream_csv(rows, compress=compress)
+        except Exception as e:
+            log.error(f"Failed to export logs: {e}")
+            raise
+
+    filename = "all_proctoring_logs.csv.gz" if compress else "all_proctoring_logs.csv"
+    return Response(
+        generate(),
+        mimetype="application/gzip" if compress else "text/csv",
+        headers={"Content-Disposition": f"attachment;filename={filename}", "X-Accel-Buffering": "no"}
+    )
+
+# --- ADMIN SUBMISSIONS ENDPOINT (keyset-paginated, graded at submit time) ---
+SUBMISSIONS_PAGE_SIZE = 50
+SUBMISSIONS_MAX_PAGE_SIZE = 200
 
-# --- UPDATED ADMIN SUBMISSIONS ENDPOINT WITH GRADING ---
 @app.route("/api/admin/submissions", methods=["GET"])
 def get_all_submissions():
-    submissions = list(submissions_collection.find({"status": "completed"}).sort("start_time", -1))
-    tests = list(tests_collection.find())
-    users = list(users_collection.find())
-    tests_dict = {test['test_id']: test for test in tests}
-    users_dict = {user['user_id']: user for user in users}
+    """List completed submissions newest first.
+
+    Query params: ``limit``, ``cursor`` (from the previous page's ``next_cursor``),
+    ``test_id``, ``student`` (ID or name prefix), ``from``/``to`` (ISO datetimes
+    bounding ``start_time``) and ``fields=full`` to include answers and logs.
+    """
+    if not session.get('admin_logged_in'):
+        return jsonify({"status": "error", "message": "Unauthorized"}), 401
+    args = request.args
+    try:
+        limit = min(max(int(args.get("limit", SUBMISSIONS_PAGE_SIZE)), 1), SUBMISSIONS_MAX_PAGE_SIZE)
+        query = {"status": "completed"}
+        if args.get("test_id"):
+            query["test_id"] = args["test_id"]
+        time_range = {}
+        if args.get("from"): time_range["$gte"] = parse_utc_datetime(args["from"])
+        if args.get("to"): time_range["$lte"] = parse_utc_datetime(args["to"])
+        if time_range:
+            query["start_time"] = time_range
+        if args.get("cursor"):
+            cursor_time, cursor_session = decode_cursor(args["cursor"])
+            query["$or"] = [{"start_time": {"$lt": cursor_time}}, {"start_time": cursor_time, "session_id": {"$lt": cursor_session}}]
+    except (ValueError, TypeError, KeyError):
+        return jsonify({"status": "error", "message": "Invalid pagination or filter parameters."}), 400
+    student_filter = args.get("student", "").strip()
+    if student_filter:
+        # Prefixes of the ID (as typed or upper-cased, bounded on the user_id index) or of the name
+        # (any case) match; they are resolved against users so the submissions query stays an indexed $in.
+        id_prefixes = [re.compile("^" + re.escape(prefix)) for prefix in {student_filter, student_filter.upper()}]
+        name_prefix = {"$regex": "^" + re.escape(student_filter), "$options": "i"}
+        matches = users_collection.find({"role": "student", "$or": [{"user_id": {"$in": id_prefixes}}, {"full_name": name_prefix}]}, {"_id": 0, "user_id": 1})
+        query["student_id"] = {"$in": [student_filter] + [u["user_id"] for u in matches]}
+    full = args.get("fields") == "full"
+    projection = {"_id": 0} if full else {"_id": 0, "logs": 0, "answers": 0, "grade.answers": 0}
+    cursor = submissions_collection.find(query, projection).sort([("start_time", -1), ("session_id", -1)]).batch_size(limit + 1)
+    # Rows whose test or student no longer exists are dropped before the page is cut, so only the last page is short.
+    page, tests_dict, users_dict = [], {}, {}
+    while len(page) <= limit:
+        batch = list(itertools.islice(cursor, limit + 1 - len(page)))
+        if not batch:
+            break
+        tests_dict.update(tests_cache.get_many(sub.get("test_id") for sub in batch))
+        users_dict.update(users_cache.get_many(sub.get("student_id") for sub in batch))
+        page.extend(sub for sub in batch if sub.get("test_id") in tests_dict and sub.get("student_id") in users_dict)
+    cursor.close()
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = encode_cursor(page[-1].get("start_time"), page[-1].get("session_id"))
+    grades = {sub.get("session_id"): sub.get("grade") for sub in page}
+    stale = [sub.get("session_id") for sub in page if not is_current(sub.get("grade"), tests_dict[sub.get("test_id")])]
+    if stale:
+        grades.update(ensure_grades(submissions_collection, submissions_collection.find({"session_id": {"$in": stale}}), tests_dict))
+    if not full:
+        # Summary rows skip log bodies; warning_count only needs the types, for rows that have legacy warnings.
+        legacy = {doc["session_id"]: doc["logs"] for doc in submissions_collection.find(
+            {"session_id": {"$in": [sub.get("session_id") for sub in page]}, "logs.type": "warning"}, {"_id": 0, "session_id": 1, "logs.type": 1})}
+        for sub in page:
+            sub["logs"] = legacy.get(sub.get("session_id"), [])
+    events = event_store.for_sessions([sub.get("session_id") for sub in page]) if full else {}
     results = []
-    for sub in submissions:
-        test_info = tests_dict.get(sub.get("test_id"))
-        student_info = users_dict.get(sub.get("student_id"))
-        if not test_info or not student_info: continue
-        score, mcq_count, graded_answers = 0, 0, []
-        test_questions = {q['text']: q for q in test_info.get('questions', [])}
-        for student_answer in sub.get('answers', []):
-            q_text = student_answer.get('question_text')
-            s_answer = student_answer.get('answer')
-            question_details = test_questions.get(q_text)
-            status = 'pending'
-            if question_details and question_details.get('type') == 'mcq':
-                mcq_count += 1
-                correct_answer = question_details.get('answer')
-                if s_answer == correct_answer:
-                    score += 1
-                    status = 'correct'
-                else:
-                    status = 'incorrect'
-            graded_answers.append({"question_text": q_text, "answer": s_answer, "status": status})
-        final_score_str = f"{score}/{mcq_count}" if mcq_count > 0 else "N/A"
-        results.append({
+    for sub in page:
+        test_info = tests_dict[sub.get("test_id")]
+        student_info = users_dict[sub.get("student_id")]
+        grade = grades[sub.get("session_id")]
+        row = {
             "session_id": sub.get("session_id"), "student_id": sub.get("student_id"), "test_id": sub.get("test_id"),
             "start_time": sub.get("start_time"), "student_name": student_info.get("full_name", "N/A"),
-            "exam_name": test_info.get("name", "N/A"), "logs": sub.get("logs", []),
-            "answers": graded_answers, "score": final_score_str
-        })
-    return jsonify({"status": "success", "submissions": json.loads(json.dumps(results, default=mongo_serializer))})
+            "exam_name": test_info.get("name", "N/A"), "score": grade["score_str"], "warnings": warning_count(sub),
+            "answer_count": grade.get("total", len(grade.get("answers", [])))
+        }
+        if full:
+            row["answers"] = grade["answers"]
+            row["logs"] = sub.get("logs", []) + events.get(sub.get("session_id"), [])
+        results.append(row)
+    return jsonify({"status": "success", "submissions": results, "next_cursor": next_cursor})
 
 @app.route("/api/admin/create_test", methods=["POST"])
 def create_test():
@@ -426,6 +1010,11 @@ def create_test():
         "test_id": test_id, "name": title, "code": f"{code_from_title}-{test_id[:4].upper()}",
         "duration_seconds": duration_minutes * 60, "questions": questions, "created_at": datetime.datetime.utcnow()
     }
+    student_ids = data.get('student_ids')
+    if student_ids is not None:
+        if not isinstance(student_ids, list) or not all(isinstance(sid, str) and sid.strip() for sid in student_ids):
+            return jsonify({"status": "error", "message": "student_ids must be a list of student IDs."}), 400
+        new_test['student_ids'] = list(dict.fromkeys(sid.strip() for sid in student_ids))
     scheduled_time_str = data.get('scheduled_datetime')
     if scheduled_time_str:
         try:
@@ -433,7 +1022,8 @@ def create_test():
         except (ValueError, TypeError):
             return jsonify({"status": "error", "message": "Invalid datetime format for schedule."}), 400
     tests_collection.insert_one(new_test)
-    print(f"SUCCESS: Test '{title}' created and saved to database.")
+    invalidate_test(test_id)
+    log.info(f"Test '{title}' created and saved to database.")
     return jsonify({"status": "success", "message": "Test created successfully!"}), 201
 
 @app.route("/api/admin/test/<test_id>", methods=['DELETE'])
@@ -443,20 +1033,46 @@ def delete_test(test_id):
     if test_id == "dummy-test-01":
         return jsonify({"status": "error", "message": "Cannot delete the sample test."}), 403
     test_deletion_result = tests_collection.delete_one({"test_id": test_id})
+    invalidate_test(test_id)
     if test_deletion_result.deleted_count > 0:
-        submission_deletion_result = submissions_collection.delete_many({"test_id": test_id})
-        print(f"Deleted test {test_id} and {submission_deletion_result.deleted_count} associated submissions.")
-        return jsonify({"status": "success", "message": f"Test and {submission_deletion_result.deleted_count} submissions deleted."}), 200
+        # The test is gone (no new sessions can start); its submissions are purged in the background.
+        job_id = job_runner.submit("purge_submissions", {"query": {"test_id": test_id}}, created_by=f"delete test {test_id}")
+        log.info(f"Deleted test {test_id}; purging its submissions in job {job_id}.")
+        return jsonify({"status": "success", "message": "Test deleted. Its submissions are being removed in the background.", "job_id": job_id}), 202
     else:
         return jsonify({"status": "error", "message": "Test not found."}), 404
 
+@app.route("/api/admin/test/<test_id>/regrade", methods=["POST"])
+def regrade_test_submissions(test_id):
+    if not session.get('admin_logged_in'):
+        return jsonify({"status": "error", "message": "Unauthorized"}), 401
+    invalidate_test(test_id)
+    test = tests_cache.get(test_id)
+    if not test:
+        return jsonify({"status": "error", "message": "Test not found."}), 404
+    job_id = job_runner.submit("regrade_test", {"test_id": test_id}, created_by=f"regrade test {test_id}")
+    return jsonify({"status": "success", "message": "Regrade started.", "job_id": job_id}), 202
+
+@app.route("/api/admin/test/<test_id>/provision", methods=["POST"])
+def provision_test_sessions(test_id):
+    """Pre-create sessions for a test now instead of waiting for the scheduler."""
+    if not session.get('admin_logged_in'):
+        return jsonify({"status": "error", "message": "Unauthorized"}), 401
+    test = tests_cache.get(test_id)
+    if not test:
+        return jsonify({"status": "error", "message": "Test not found."}), 404
+    if not roster_for(test):
+        return jsonify({"status": "error", "message": "Test has no student roster (student_ids) to provision."}), 400
+    job_id = job_runner.submit("provision_sessions", {"test_id": test_id}, created_by=f"provision test {test_id}")
+    return jsonify({"status": "success", "message": "Session provisioning started.", "job_id": job_id}), 202
+
 @app.route("/api/student/results/<session_id>", methods=["GET"])
 def get_student_results(session_id):
     # Ensure the user is logged in and is the owner of the session
     if 'user_id' not in session:
         return jsonify({"status": "error", "message": "Unauthorized"}), 401
     student_id = session['user_id']
-    submission = submissions_collection.find_one({"session_id": session_id})
+    submission = find_submission(session_id)
     if not submission:
         return jsonify({"status": "error", "message": "Submission not found"}), 404
     if submission.get("student_id") != student_id:
@@ -489,44 +1105,19 @@ def get_student_results(session_id):
         }), 200
     
     # Results are available - proceed with grading
-    test = tests_collection.find_one({"test_id": submission.get("test_id")})
-    user = users_collection.find_one({"user_id": student_id})
+    test = tests_cache.get(submission.get("test_id"))
+    user = users_cache.get(student_id)
     if not test or not user:
         return jsonify({"status": "error", "message": "Data not found"}), 404
     
-    # Grading logic (similar to admin)
-    score, mcq_count, graded_answers = 0, 0, []
-    test_questions = {q['text']: q for q in test.get('questions', [])}
-    for student_answer in submission.get('answers', []):
-        q_text = student_answer.get('question_text')
-        s_answer = student_answer.get('answer')
-        question_details = test_questions.get(q_text)
-        status = 'pending'
-        correct_answer = None
-        q_type = question_details.get('type') if question_details else 'subjective'
-        if question_details and q_type == 'mcq':
-            mcq_count += 1
-            correct_answer = question_details.get('answer')
-            if s_answer == correct_answer:
-                score += 1
-                status = 'correct'
-            else:
-                status = 'incorrect'
-        graded_answers.append({
-            "question_text": q_text,
-            "answer": s_answer,
-            "type": q_type,
-            "status": status,
-            "correct_answer": correct_answer if (q_type == 'mcq' and status == 'incorrect') else None
-        })
-    final_score_str = f"{score}/{mcq_count}" if mcq_count > 0 else "N/A"
+    graded = ensure_grade(submissions_collection, submission, test)
     result = {
         "status": "success",
         "exam_name": test.get("name", "N/A"),
         "exam_code": test.get("code", "N/A"),
         "student_name": user.get("full_name", "N/A"),
-        "score": final_score_str,
-        "answers": graded_answers,
+        "score": graded["score_str"],
+        "answers": graded["answers"],
         "submission_time": submission_time.isoformat(),
         "results_available_time": (submission_time + datetime.timedelta(hours=24)).isoformat()
     }
@@ -536,56 +1127,92 @@ def get_student_results(session_id):
 def admin_review_submission(session_id):
     if not session.get('admin_logged_in'):
         return jsonify({"status": "error", "message": "Unauthorized"}), 401
-    submission = submissions_collection.find_one({"session_id": session_id})
+    submission = find_submission(session_id)
     if not submission:
         return jsonify({"status": "error", "message": "Submission not found"}), 404
-    test = tests_collection.find_one({"test_id": submission.get("test_id")})
-    user = users_collection.find_one({"user_id": submission.get("student_id")})
+    test = tests_cache.get(submission.get("test_id"))
+    user = users_cache.get(submission.get("student_id"))
     if not test or not user:
         return jsonify({"status": "error", "message": "Data not found"}), 404
-    # Grading logic (same as student/admin)
-    score, mcq_count, graded_answers = 0, 0, []
-    test_questions = {q['text']: q for q in test.get('questions', [])}
-    for student_answer in submission.get('answers', []):
-        q_text = student_answer.get('question_text')
-        s_answer = student_answer.get('answer')
-        question_details = test_questions.get(q_text)
-        status = 'pending'
-        correct_answer = None
-        q_type = question_details.get('type') if question_details else 'subjective'
-        if question_details and q_type == 'mcq':
-            mcq_count += 1
-            correct_answer = question_details.get('answer')
-            if s_answer == correct_answer:
-                score += 1
-                status = 'correct'
-            else:
-                status = 'incorrect'
-        graded_answers.append({
-            "question_text": q_text,
-            "answer": s_answer,
-            "type": q_type,
-            "status": status,
-            "correct_answer": correct_answer if (q_type == 'mcq' and status == 'incorrect') else None
-        })
-    final_score_str = f"{score}/{mcq_count}" if mcq_count > 0 else "N/A"
+    graded = ensure_grade(submissions_collection, submission, test)
+    logs = session_events(submission)
     selfie_path = submission.get('selfie_path')
     # If selfie_path exists, make it accessible from frontend (strip backend/ if needed)
     if selfie_path and selfie_path.startswith('backend/'):
         selfie_path = selfie_path.replace('backend/', '../backend/')
+    selfie_digest = (submission.get('selfie') or {}).get('digest')
     result = {
         "status": "success",
         "exam_name": test.get("name", "N/A"),
         "exam_code": test.get("code", "N/A"),
         "student_name": user.get("full_name", "N/A"),
         "student_id": user.get("user_id", "N/A"),
-        "score": final_score_str,
+        "score": graded["score_str"],
         "selfie_path": selfie_path,
-        "answers": graded_answers,
-        "logs": submission.get('logs', [])
+        "selfie_url": url_for('get_media', digest=selfie_digest) if selfie_digest else None,
+        "selfie_thumb_url": url_for('get_media_thumb', digest=selfie_digest) if selfie_digest else None,
+        "answers": graded["answers"],
+        "logs": logs,
+        "risk": score_session(submission, logs),
+        "risk_rank": risk_rank(submission),
+        "archived": bool(submission.get("archived"))
     }
     return jsonify(result)
 
+def risk_rank(submission):
+    """{rank, of, computed_at} of the session among its test's stored scores, or None before the first scoring run."""
+    stored = risk_scores_collection.find_one({"_id": submission.get("session_id")}, {"risk_score": 1, "computed_at": 1})
+    if not stored:
+        return None
+    test_filter = {"test_id": submission.get("test_id")}
+    return {"rank": risk_scores_collection.count_documents({**test_filter, "risk_score": {"$gt": stored["risk_score"]}}) + 1,
+            "of": risk_scores_collection.count_documents(test_filter), "computed_at": stored.get("computed_at")}
+
+@app.route("/api/admin/archive", methods=["GET"])
+def archive_stats():
+    if not session.get('admin_logged_in'):
+        return jsonify({"status": "error", "message": "Unauthorized"}), 401
+    return jsonify({"status": "success", "archive": submission_archive.stats(), "archive_after_days": ARCHIVE_AFTER_DAYS})
+
+@app.route("/api/admin/archive", methods=["POST"])
+def start_archive():
+    """Archive completed submissions older than ``older_than_days`` (default ARCHIVE_AFTER_DAYS) in the background."""
+    if not session.get('admin_logged_in'):
+        return jsonify({"status": "error", "message": "Unauthorized"}), 401
+    params = request.get_json(silent=True) or {}
+    try:
+        older_than_days = float(params.get("older_than_days", ARCHIVE_AFTER_DAYS))
+        if older_than_days < 1: raise ValueError()
+    except (ValueError, TypeError):
+        return jsonify({"status": "error", "message": "older_than_days must be at least 1."}), 400
+    if job_runner.collection.count_documents({"kind": "archive_submissions", "status": {"$in": ["queued", "running"]}}, limit=1):
+        return jsonify({"status": "error", "message": "An archive run is already in progress."}), 409
+    job_id = job_runner.submit("archive_submissions", {"older_than_days": older_than_days}, created_by="archive")
+    return jsonify({"status": "success", "message": "Archiving started.", "job_id": job_id}), 202
+
+@app.route("/api/admin/risk", methods=["GET"])
+def get_risk_ranking():
+    """Stored sessions ranked by risk score; ``test_id`` and ``limit`` (default 50) are optional."""
+    if not session.get('admin_logged_in'):
+        return jsonify({"status": "error", "message": "Unauthorized"}), 401
+    limit = min(max(request.args.get("limit", 50, type=int), 1), 500)
+    query = {"test_id": request.args["test_id"]} if request.args.get("test_id") else {}
+    ranked = list(risk_scores_collection.find(query, {"_id": 0}).sort("risk_score", -1).limit(limit))
+    users_dict = users_cache.get_many(list({row.get("student_id") for row in ranked}))
+    tests_dict = tests_cache.get_many(list({row.get("test_id") for row in ranked}))
+    for row in ranked:
+        row["student_name"] = (users_dict.get(row.get("student_id")) or {}).get("full_name", "N/A")
+        row["exam_name"] = (tests_dict.get(row.get("test_id")) or {}).get("name", "N/A")
+    return jsonify({"status": "success", "sessions": ranked})
+
+@app.route("/api/admin/risk/recompute", methods=["POST"])
+def recompute_risk_scores():
+    if not session.get('admin_logged_in'):
+        return jsonify({"status": "error", "message": "Unauthorized"}), 401
+    test_id = (request.get_json(silent=True) or {}).get("test_id")
+    job_id = job_runner.submit("risk_scores", {"test_id": test_id} if test_id else {}, created_by="risk scoring")
+    return jsonify({"status": "success", "message": "Risk scoring started.", "job_id": job_id}), 202
+
 @app.route("/api/admin/students", methods=["POST"])
 def create_student():
     if not session.get('admin_logged_in'):
@@ -614,12 +1241,92 @@ def create_student():
     
     try:
         users_collection.insert_one(new_student)
-        print(f"SUCCESS: Student '{full_name}' (ID: {student_id}) created successfully.")
+        users_cache.invalidate(student_id)
+        log.info(f"Student '{full_name}' (ID: {student_id}) created successfully.")
         return jsonify({"status": "success", "message": f"Student {full_name} created successfully!"}), 201
     except Exception as e:
-        print(f"ERROR: Failed to create student: {e}")
+        log.error(f"Failed to create student: {e}")
         return jsonify({"status": "error", "message": "Failed to create student"}), 500
 
+ROSTER_MAX_ROWS = int(os.environ.get('ROSTER_MAX_ROWS', 100000))
+ROSTER_CHUNK_SIZE = int(os.environ.get('ROSTER_CHUNK_SIZE', 1000))
+ROSTER_MAX_BYTES = int(os.environ.get('ROSTER_MAX_BYTES', 64 * 1024 * 1024))
+ROSTER_FOLDER = os.path.join(UPLOAD_FOLDER, "rosters")
+os.makedirs(ROSTER_FOLDER, exist_ok=True)
+
+def spool_upload(stream, path, max_bytes, chunk_size=64 * 1024):
+    """Copy a request stream to ``path`` in chunks, so a job can read it after the request has ended."""
+    size = 0
+    try:
+        with open(path, "wb") as out:
+            while True:
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    return size
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge()
+                out.write(chunk)
+    except BaseException:
+        if os.path.exists(path):
+            os.unlink(path)
+        raise
+
+def import_roster_job(ctx, path, fmt, mode):
+    """Validate and upsert a spooled roster; the job result is the import report (counts and bad rows)."""
+    def written(ids):
+        for user_id in ids:
+            users_cache.invalidate(user_id)
+        ctx.progress(advance=len(ids))
+        ctx.pause()
+    importer = RosterImport(users_collection, mode=mode, chunk_size=ROSTER_CHUNK_SIZE,
+                            max_rows=ROSTER_MAX_ROWS, on_written=written)
+    try:
+        with open(path, "rb") as roster:
+            report = importer.run(iter_rows(roster, fmt))
+    except RosterError as e:
+        # Chunks written before the problem was found stay written.
+        report = importer.report
+        raise RosterError(f"{e} Stopped after row {report['rows']}: {report['created']} created, {report['updated']} updated.")
+    finally:
+        os.unlink(path)
+    log.info(f"Roster import: {report['created']} created, {report['existing']} existing, {report['updated']} updated, {report['failed']} failed.")
+    return report
+
+@app.route("/api/admin/students/import", methods=["POST"])
+def import_students():
+    """Bulk-create students from a CSV (student_id, full_name[, email]) or JSONL roster.
+
+    The roster is the raw request body or a multipart ``roster`` file; the format
+    comes from ``?format=``, the content type or the file extension. ``?mode=update``
+    refreshes names/emails of existing students instead of skipping them. The upload
+    is spooled to disk and its header checked, then rows are validated and written by
+    an import_roster job (202 + job_id); the job result reports every bad row.
+    """
+    if not session.get('admin_logged_in'):
+        return jsonify({"status": "error", "message": "Unauthorized"}), 401
+    upload = request.files.get("roster")
+    content_type = (upload.mimetype if upload else request.mimetype) or ""
+    filename = (upload.filename if upload else "") or ""
+    fmt = request.args.get("format") or ("jsonl" if "json" in content_type or filename.endswith((".jsonl", ".ndjson")) else "csv")
+    mode = request.args.get("mode", "skip")
+    if mode not in ("skip", "update"):
+        return jsonify({"status": "error", "message": "mode must be skip or update."}), 400
+    prune_exports(ROSTER_FOLDER, keep=roster_spools_in_use())
+    path = os.path.join(ROSTER_FOLDER, f"{uuid.uuid4().hex}.{fmt if fmt in ('csv', 'jsonl') else 'txt'}")
+    try:
+        size = spool_upload(upload.stream if upload else request.stream, path, ROSTER_MAX_BYTES)
+    except UploadTooLarge:
+        return jsonify({"status": "error", "message": f"Roster is larger than {ROSTER_MAX_BYTES // (1024 * 1024)} MB."}), 413
+    try:
+        with open(path, "rb") as roster:
+            next(iter_rows(roster, fmt), None)  # unknown format or missing columns fail here, before the job is queued
+    except RosterError as e:
+        os.unlink(path)
+        return jsonify({"status": "error", "message": str(e)}), 400
+    job_id = job_runner.submit("import_roster", {"path": path, "fmt": fmt, "mode": mode}, created_by="roster import")
+    return jsonify({"status": "success", "message": "Roster import started.", "job_id": job_id, "bytes": size}), 202
+
 @app.route("/api/admin/students", methods=["GET"])
 def get_all_students():
     if not session.get('admin_logged_in'):
@@ -627,9 +1334,9 @@ def get_all_students():
     
     try:
         students = list(users_collection.find({"role": "student"}, {"_id": 0, "password": 0}))
-        return jsonify({"status": "success", "students": json.loads(json.dumps(students, default=mongo_serializer))})
+        return jsonify({"status": "success", "students": students})
     except Exception as e:
-        print(f"ERROR: Failed to fetch students: {e}")
+        log.error(f"Failed to fetch students: {e}")
         return jsonify({"status": "error", "message": "Failed to fetch students"}), 500
 
 @app.route("/api/admin/students/<student_id>", methods=["DELETE"])
@@ -643,21 +1350,279 @@ def delete_student(student_id):
         return jsonify({"status": "error", "message": "Student not found"}), 404
     
     try:
-        # Delete student's submissions first
-        submissions_deleted = submissions_collection.delete_many({"student_id": student_id})
-        
-        # Delete the student
+        # Delete the student first so they cannot log in or start new sessions,
+        # then purge their submissions in the background.
         users_collection.delete_one({"user_id": student_id, "role": "student"})
+        users_cache.invalidate(student_id)
+        job_id = job_runner.submit("purge_submissions", {"query": {"student_id": student_id}}, created_by=f"delete student {student_id}")
         
-        print(f"SUCCESS: Student '{student.get('full_name')}' (ID: {student_id}) and {submissions_deleted.deleted_count} submissions deleted.")
+        log.info(f"Student '{student.get('full_name')}' (ID: {student_id}) deleted; purging submissions in job {job_id}.")
         return jsonify({
             "status": "success", 
-            "message": f"Student {student.get('full_name')} and {submissions_deleted.deleted_count} submissions deleted successfully!"
-        }), 200
+            "message": f"Student {student.get('full_name')} deleted. Their submissions are being removed in the background.",
+            "job_id": job_id
+        }), 202
     except Exception as e:
-        print(f"ERROR: Failed to delete student: {e}")
+        log.error(f"Failed to delete student: {e}")
         return jsonify({"status": "error", "message": "Failed to delete student"}), 500
 
+# --- BACKGROUND JOBS ---
+def unreferenced_digests(digests):
+    """The subset of selfie digests no remaining submission (hot or archived) points at."""
+    digests = set(digests)
+    if not digests:
+        return set()
+    digests -= set(submissions_collection.distinct("selfie.digest", {"selfie.digest": {"$in": list(digests)}}))
+    return digests - submission_archive.referenced_digests(digests) if digests else digests
+
+def purge_submissions_job(ctx, query):
+    """Delete matching submissions chunk by chunk, with their events, live counters and unshared selfies."""
+    total = submissions_collection.count_documents(query)
+    ctx.progress(0, total)
+    deleted, media_deleted = 0, 0
+    projection = {"_id": 0, "session_id": 1, "test_id": 1, "status": 1, "counters": 1, "selfie.digest": 1}
+    while True:
+        chunk = list(submissions_collection.find(query, projection).limit(job_runner.chunk_size))
+        if not chunk:
+            break
+        session_ids = [sub["session_id"] for sub in chunk]
+        live_stats.sessions_removed(sub for sub in chunk if sub.get("status") == "active")
+        event_store.delete_sessions(session_ids)
+        risk_scores_collection.delete_many({"_id": {"$in": session_ids}})
+        deleted += submissions_collection.delete_many({"session_id": {"$in": session_ids}}).deleted_count
+        for digest in unreferenced_digests((sub.get("selfie") or {}).get("digest") for sub in chunk if sub.get("selfie")):
+            media_store.delete(digest)
+            media_deleted += 1
+        ctx.progress(deleted, max(total, deleted))
+        ctx.pause()
+    archived_ids, archived_digests = submission_archive.forget(query)
+    risk_scores_collection.delete_many({"_id": {"$in": archived_ids}})
+    for digest in unreferenced_digests(archived_digests):
+        media_store.delete(digest)
+        media_deleted += 1
+    log.info(f"Purged {deleted} submissions and {len(archived_ids)} archived ones matching {query} ({media_deleted} selfies removed).")
+    return {"submissions_deleted": deleted, "archived_deleted": len(archived_ids), "selfies_deleted": media_deleted}
+
+def regrade_test_job(ctx, test_id):
+    test = tests_cache.get(test_id)
+    if not test:
+        raise ValueError("Test not found.")
+    ctx.progress(0, submissions_collection.count_documents({"test_id": test_id, "status": "completed"}))
+    def on_batch(processed):
+        ctx.progress(processed)
+        ctx.pause()
+    regraded = regrade_test(submissions_collection, test, batch_size=job_runner.chunk_size, on_batch=on_batch)
+    log.info(f"Regraded {regraded} submissions for test {test_id}.")
+    return {"regraded": regraded}
+
+def export_path(job_id, compress):
+    return os.path.join(EXPORT_FOLDER, f"{job_id}.csv.gz" if compress else f"{job_id}.csv")
+
+def prune_exports(folder=EXPORT_FOLDER, keep=()):
+    """Remove files older than EXPORT_RETENTION_HOURS (finished exports, roster uploads left by interrupted imports).
+
+    Paths in ``keep`` are left alone whatever their age.
+    """
+    cutoff = datetime.datetime.now().timestamp() - EXPORT_RETENTION_HOURS * 3600
+    for name in os.listdir(folder):
+        path = os.path.join(folder, name)
+        if path not in keep and os.path.isfile(path) and os.path.getmtime(path) < cutoff:
+            os.unlink(path)
+
+def roster_spools_in_use():
+    """Spooled rosters of import jobs that are still queued or running; a job behind a long queue may outlive the retention."""
+    jobs = job_runner.collection.find({"kind": "import_roster", "status": {"$in": ["queued", "running"]}}, {"params.path": 1})
+    return {job["params"]["path"] for job in jobs if job.get("params", {}).get("path")}
+
+def export_logs_job(ctx, filters, compress=True):
+    """Write the CSV export to EXPORT_FOLDER; downloaded later through /api/admin/jobs/<id>/download."""
+    prune_exports()
+    query = export_query(filters)
+    ctx.progress(0, submissions_collection.count_documents(query))
+    def throttled(rows):
+        for count, row in enumerate(rows, start=1):
+            yield row
+            if count % job_runner.chunk_size == 0:
+                ctx.progress(count)
+                ctx.pause()
+            else:
+                ctx.done = count
+    path = export_path(ctx.job_id, compress)
+    tmp_path = path + ".part"
+    rows = iter_log_rows(submissions_collection, tests_collection, users_collection, event_store, query, batch_size=EXPORT_BATCH_SIZE)
+    try:
+        with open(tmp_path, "wb") as out:
+            for chunk in stream_csv(throttled(rows), compress=compress, flush_every=EXPORT_BATCH_SIZE):
+                out.write(chunk)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+    return {"rows": ctx.done, "compressed": compress, "bytes": os.path.getsize(path)}
+
+def cleanup_media_job(ctx, grace_hours):
+    """Remove stored selfies no submission references (e.g. left by retried or abandoned uploads)."""
+    older_than = datetime.datetime.now().timestamp() - grace_hours * 3600
+    scanned, deleted, batch = 0, 0, []
+    def sweep(batch):
+        orphans = unreferenced_digests(batch)
+        for digest in orphans:
+            media_store.delete(digest)
+        return len(orphans)
+    for digest in media_store.iter_stored(older_than=older_than):
+        batch.append(digest)
+        if len(batch) >= job_runner.chunk_size:
+            deleted += sweep(batch)
+            scanned += len(batch)
+            batch = []
+            ctx.progress(scanned)
+            ctx.pause()
+    deleted += sweep(batch)
+    scanned += len(batch)
+    ctx.progress(scanned, scanned)
+    log.info(f"Media cleanup scanned {scanned} files and removed {deleted} orphans.")
+    return {"scanned": scanned, "deleted": deleted}
+
+RISK_CHUNK_SIZE = int(os.environ.get('RISK_CHUNK_SIZE', 100000))
+
+def risk_scores_job(ctx, test_id=None):
+    """Score every active/completed session (optionally of one test) and store the results in risk_scores."""
+    query = {"status": {"$in": ["active", "completed"]}}
+    if test_id:
+        query["test_id"] = test_id
+    ctx.progress(0, submissions_collection.count_documents(query))
+    analyzer = RiskAnalyzer()
+    def on_session(sub):
+        analyzer.set_meta(sub["session_id"], **session_meta(sub))
+        ctx.progress(advance=1)
+    events = iter_mongo(submissions_collection, event_store, query, batch_size=EXPORT_BATCH_SIZE, on_session=on_session)
+    for chunk in chunks(events, RISK_CHUNK_SIZE):
+        analyzer.add_chunk(*chunk)
+        ctx.pause()
+    stored = store_scores(risk_scores_collection, analyzer, datetime.datetime.utcnow(), chunk_size=job_runner.chunk_size)
+    log.info(f"Scored {stored} sessions from {analyzer.events} events.")
+    return {"sessions": stored, "events": analyzer.events}
+
+def archive_submissions_job(ctx, older_than_days):
+    """Move completed submissions that ended more than ``older_than_days`` ago, with their events, to the archive."""
+    cutoff = datetime.datetime.utcnow() - datetime.timedelta(days=older_than_days)
+    query = {"status": "completed", "end_time": {"$lt": cutoff}}
+    ctx.progress(0, submissions_collection.count_documents(query))
+    writer, archived = submission_archive.writer(), 0
+    try:
+        while True:
+            chunk = list(submissions_collection.find(query).sort("end_time", 1).limit(job_runner.chunk_size))
+            if not chunk:
+                break
+            session_ids = archive_chunk(submission_archive, writer, chunk, event_store.for_sessions([sub["session_id"] for sub in chunk]), datetime.datetime.utcnow())
+            event_store.delete_sessions(session_ids)
+            archived += submissions_collection.delete_many({"session_id": {"$in": session_ids}, "status": "completed"}).deleted_count
+            for session_id in session_ids:
+                _session_cache.pop(session_id, None)
+            ctx.progress(archived)
+            ctx.pause()
+    finally:
+        writer.close()
+    log.info(f"Archived {archived} submissions that ended before {cutoff:%Y-%m-%d}.")
+    return {"archived": archived, "cutoff": cutoff}
+
+def provision_sessions_job(ctx, test_id):
+    test = tests_cache.get(test_id)
+    if not test:
+        raise ValueError("Test not found.")
+    def on_chunk(processed):
+        ctx.progress(processed)
+        ctx.pause()
+    roster = roster_for(test)
+    if not roster:
+        log.warning(f"Test {test_id} has no student roster; no sessions provisioned.")
+        return {"provisioned": 0, "roster": 0}
+    ctx.progress(0, len(roster))
+    created = provision_sessions(submissions_collection, test_id, roster, chunk_size=job_runner.chunk_size, on_chunk=on_chunk)
+    log.info(f"Provisioned {created} sessions for test {test_id}.")
+    return {"provisioned": created, "roster": len(roster)}
+
+job_runner.register("purge_submissions", purge_submissions_job)
+job_runner.register("provision_sessions", provision_sessions_job)
+job_runner.register("risk_scores", risk_scores_job)
+job_runner.register("archive_submissions", archive_submissions_job)
+job_runner.register("regrade_test", regrade_test_job)
+job_runner.register("export_logs", export_logs_job)
+job_runner.register("cleanup_media", cleanup_media_job)
+job_runner.register("import_roster", import_roster_job)
+
+provisioner = ProvisioningScheduler(
+    tests_collection,
+    on_due=lambda test_id: job_runner.submit("provision_sessions", {"test_id": test_id}, created_by="scheduled start"),
+    lead_seconds=PROVISION_LEAD_SECONDS
+)
+if PROVISION_LEAD_SECONDS > 0:
+    provisioner.start()
+
+def describe_job(job):
+    if job.get("kind") == "export_logs" and job.get("status") == "succeeded":
+        job["download_url"] = url_for("download_job_result", job_id=job["job_id"])
+    job.pop("params", None)
+    return job
+
+@app.route("/api/admin/jobs", methods=["GET"])
+def list_jobs():
+    if not session.get('admin_logged_in'):
+        return jsonify({"status": "error", "message": "Unauthorized"}), 401
+    limit = min(max(request.args.get("limit", 50, type=int), 1), 200)
+    return jsonify({"status": "success", "jobs": [describe_job(job) for job in job_runner.recent(limit)]})
+
+@app.route("/api/admin/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    """Poll a job: ``status`` is queued, running, succeeded or failed; ``progress`` is {done, total}."""
+    if not session.get('admin_logged_in'):
+        return jsonify({"status": "error", "message": "Unauthorized"}), 401
+    job = job_runner.get(job_id)
+    if not job:
+        return jsonify({"status": "error", "message": "Job not found"}), 404
+    return jsonify({"status": "success", "job": describe_job(job)})
+
+@app.route("/api/admin/jobs/<job_id>/download", methods=["GET"])
+def download_job_result(job_id):
+    if not session.get('admin_logged_in'):
+        return jsonify({"status": "error", "message": "Unauthorized"}), 401
+    job = job_runner.get(job_id)
+    if not job or job.get("kind") != "export_logs" or job.get("status") != "succeeded":
+        return jsonify({"status": "error", "message": "Export not found"}), 404
+    compress = job.get("result", {}).get("compressed", False)
+    path = export_path(job["job_id"], compress)
+    if not os.path.exists(path):
+        return jsonify({"status": "error", "message": "Export has expired; run it again."}), 410
+    filename = "all_proctoring_logs.csv.gz" if compress else "all_proctoring_logs.csv"
+    return send_file(path, mimetype="application/gzip" if compress else "text/csv", as_attachment=True, download_name=filename)
+
+@app.route("/api/admin/exports", methods=["POST"])
+def start_export():
+    """Start a CSV export job; accepts the same filters as the streaming export plus ``gzip`` (default on)."""
+    if not session.get('admin_logged_in'):
+        return jsonify({"status": "error", "message": "Unauthorized"}), 401
+    params = request.get_json(silent=True) or {}
+    filters = {key: params[key] for key in ("test_id", "from", "to") if params.get(key)}
+    try:
+        export_query(filters)  # validate now; the job rebuilds the query from the stored filters
+    except (ValueError, TypeError, AttributeError):
+        return jsonify({"status": "error", "message": "Invalid date filter."}), 400
+    job_id = job_runner.submit("export_logs", {"filters": filters, "compress": params.get("gzip", True) not in (False, 0, "0", "false")}, created_by="export")
+    return jsonify({"status": "success", "message": "Export started.", "job_id": job_id}), 202
+
+@app.route("/api/admin/media/cleanup", methods=["POST"])
+def start_media_cleanup():
+    if not session.get('admin_logged_in'):
+        return jsonify({"status": "error", "message": "Unauthorized"}), 401
+    params = request.get_json(silent=True) or {}
+    try:
+        grace_hours = float(params.get("grace_hours", MEDIA_CLEANUP_GRACE_HOURS))
+        if grace_hours < 0: raise ValueError()
+    except (ValueError, TypeError):
+        return jsonify({"status": "error", "message": "grace_hours must be a non-negative number."}), 400
+    job_id = job_runner.submit("cleanup_media", {"grace_hours": grace_hours}, created_by="media cleanup")
+    return jsonify({"status": "success", "message": "Media cleanup started.", "job_id": job_id}), 202
+
 @app.route("/api/student/logout", methods=["POST"])
 def student_logout():
     session.pop('user_id', None)
@@ -669,5 +1634,8 @@ def admin_logout():
     session.pop('admin_logged_in', None)
     return jsonify({"status": "success", "message": "Logged out successfully"})
 
+if LIVE_FEED_CHANGE_STREAMS:
+    ChangeStreamRelay(live_broker, submissions_collection, event_store.collection, describe_session).start()
+
 if __name__ == "__main__":
     app.run(debug=True, port=5000)
\ No newline at end of file
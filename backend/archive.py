@@ -0,0 +1,131 @@
+# backend/archive.py
+import datetime
+import gzip
+import os
+import uuid
+from bson import json_util
+from pymongo import UpdateOne
+
+ARCHIVE_INDEX_COLLECTION = "archived_submissions"
+JSON_OPTIONS = json_util.RELAXED_JSON_OPTIONS  # datetimes round-trip as {"$date": ...}
+
+
+class SubmissionArchive:
+    """Cold tier for old completed submissions: gzip JSON-lines shards on local disk.
+
+    Every record (the submission plus its proctoring events) is written as its
+    own gzip member, so one record can be read back by seeking to its offset
+    and decompressing ``length`` bytes; concatenated members still form a
+    valid ``.jsonl.gz`` that ``zcat`` can read end to end. The lookup index is
+    the small ``archived_submissions`` collection: session_id -> shard, offset,
+    length, plus the fields the dashboards and cleanup jobs filter on.
+
+    Each archive run appends to its own shards (rotated at ``shard_bytes``),
+    so concurrent runs never share a file.
+    """
+
+    def __init__(self, db, root, shard_bytes=64 * 1024 * 1024):
+        self.index = db[ARCHIVE_INDEX_COLLECTION]
+        self.root = root
+        self.shard_bytes = shard_bytes
+        os.makedirs(root, exist_ok=True)
+
+    def _shard_path(self, shard):
+        if os.path.basename(shard) != shard:
+            raise ValueError("Invalid shard name")
+        return os.path.join(self.root, shard)
+
+    def writer(self):
+        return _ShardWriter(self)
+
+    def fetch(self, session_id):
+        """The archived submission (with its ``events``), or None; marked ``archived: True``."""
+        entry = self.index.find_one({"_id": session_id}) if session_id else None
+        if not entry:
+            return None
+        with open(self._shard_path(entry["shard"]), "rb") as handle:
+            handle.seek(entry["offset"])
+            record = json_util.loads(gzip.decompress(handle.read(entry["length"])), json_options=JSON_OPTIONS)
+        record["archived"] = True
+        return record
+
+    def entries(self, query, projection=None):
+        return self.index.find(query, projection or {"_id": 0, "session_id": 1, "test_id": 1, "end_time": 1})
+
+    def forget(self, query):
+        """Drop index entries (e.g. for a deleted student); returns (session_ids, selfie digests) they referenced.
+
+        The shard bytes stay until the shard is removed; without an index
+        entry the record is no longer reachable from the app.
+        """
+        entries = list(self.index.find(query, {"_id": 1, "selfie_digest": 1}))
+        if entries:
+            self.index.delete_many({"_id": {"$in": [entry["_id"] for entry in entries]}})
+        return [entry["_id"] for entry in entries], [entry["selfie_digest"] for entry in entries if entry.get("selfie_digest")]
+
+    def referenced_digests(self, digests):
+        return set(self.index.distinct("selfie_digest", {"selfie_digest": {"$in": list(digests)}}))
+
+    def stats(self):
+        shards = [name for name in os.listdir(self.root) if name.endswith(".jsonl.gz")]
+        return {"sessions": self.index.estimated_document_count(), "shards": len(shards),
+                "bytes": sum(os.path.getsize(self._shard_path(name)) for name in shards)}
+
+
+class _ShardWriter:
+    """Appends records for one archive run; ``flush`` makes the written chunk durable before it is indexed."""
+
+    def __init__(self, archive):
+        self.archive = archive
+        self.run_id = f"{datetime.datetime.utcnow():%Y%m%d}-{uuid.uuid4().hex[:8]}"
+        self.sequence = 0
+        self.handle = None
+        self.shard = None
+
+    def _open(self):
+        self.close()
+        self.sequence += 1
+        self.shard = f"{self.run_id}-{self.sequence:03d}.jsonl.gz"
+        self.handle = open(self.archive._shard_path(self.shard), "ab")
+
+    def write(self, record):
+        """Append one record; returns its index entry fields (shard, offset, length)."""
+        if self.handle is None or self.handle.tell() >= self.archive.shard_bytes:
+            self._open()
+        data = gzip.compress((json_util.dumps(record, json_options=JSON_OPTIONS) + "\n").encode("utf-8"))
+        offset = self.handle.tell()
+        self.handle.write(data)
+        return {"shard": self.shard, "offset": offset, "length": len(data)}
+
+    def flush(self):
+        if self.handle:
+            self.handle.flush()
+            os.fsync(self.handle.fileno())
+
+    def close(self):
+        if self.handle:
+            self.flush()
+            self.handle.close()
+            self.handle = None
+
+
+def archive_chunk(archive, writer, submissions, events_by_session, archived_at):
+    """Write a chunk of submissions to the shard and index them; returns the archived session_ids.
+
+    Removing them from the hot collections is left to the caller, after this
+    returns, so a crash in between leaves a record in both tiers (reads prefer
+    the hot copy) rather than in neither.
+    """
+    ops = []
+    for sub in submissions:
+        sub.pop("_id", None)
+        location = writer.write({**sub, "events": events_by_session.get(sub["session_id"], [])})
+        entry = {**location, "session_id": sub["session_id"], "student_id": sub.get("student_id"), "test_id": sub.get("test_id"),
+                 "end_time": sub.get("end_time"), "archived_at": archived_at}
+        if (sub.get("selfie") or {}).get("digest"):
+            entry["selfie_digest"] = sub["selfie"]["digest"]
+        ops.append(UpdateOne({"_id": sub["session_id"]}, {"$set": entry}, upsert=True))
+    writer.flush()
+    if ops:
+        archive.index.bulk_write(ops, ordered=False)
+    return [sub["session_id"] for sub in submissions]
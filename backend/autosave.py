@@ -0,0 +1,76 @@
+# backend/autosave.py
+from pymongo import UpdateOne
+
+
+def parse_deltas(raw, question_count, max_answer_chars):
+    """Validate client deltas ``[{index, answer, version}]``; raises ValueError on bad input."""
+    if not isinstance(raw, list):
+        raise ValueError("deltas must be a list")
+    deltas = []
+    for item in raw:
+        if not isinstance(item, dict):
+            raise ValueError("each delta must be an object")
+        index, version, answer = item.get("index"), item.get("version"), item.get("answer")
+        if not isinstance(index, int) or isinstance(index, bool) or not 0 <= index < question_count:
+            raise ValueError(f"question index out of range: {index!r}")
+        if not isinstance(version, int) or isinstance(version, bool) or version < 1:
+            raise ValueError(f"version must be a positive integer: {version!r}")
+        if answer is not None and (not isinstance(answer, str) or len(answer) > max_answer_chars):
+            raise ValueError(f"answer for question {index} must be a string of at most {max_answer_chars} characters")
+        deltas.append({"index": index, "answer": answer, "version": version})
+    return deltas
+
+
+def coalesce(deltas):
+    """Keep only the newest version of each question: {index: delta}."""
+    latest = {}
+    for delta in deltas:
+        current = latest.get(delta["index"])
+        if current is None or delta["version"] >= current["version"]:
+            latest[delta["index"]] = delta
+    return latest
+
+
+def answer_updates(session_id, deltas):
+    """One targeted ``$set answers.<idx>`` per changed question.
+
+    The filter only matches while the session is active and the stored copy
+    is older, so out-of-order or late flushes (e.g. from another worker after
+    submit) never overwrite newer work.
+    """
+    ops = []
+    for index, delta in coalesce(deltas).items():
+        path = f"answers.{index}"
+        ops.append(UpdateOne(
+            {"session_id": session_id, "status": "active",
+             "$or": [{f"{path}.v": {"$lt": delta["version"]}}, {f"{path}.v": {"$exists": False}}]},
+            {"$set": {path: {"question_index": index, "answer": delta["answer"], "v": delta["version"]}}}
+        ))
+    return ops
+
+
+def write_deltas(collection, batch):
+    """EventBuffer flush function: ``{session_id: [delta, ...]}`` -> one unordered bulk write."""
+    ops = [op for session_id, deltas in batch.items() for op in answer_updates(session_id, deltas)]
+    if ops:
+        collection.bulk_write(ops, ordered=False)
+    return len(ops)
+
+
+def saved_state(answers):
+    """{index: delta} from a session's stored answers array (entries may be null)."""
+    state = {}
+    for position, entry in enumerate(answers or []):
+        if isinstance(entry, dict):
+            index = entry.get("question_index", position)
+            state[index] = {"index": index, "answer": entry.get("answer"), "version": entry.get("v", 0)}
+    return state
+
+
+def final_answers(stored_answers, deltas, test):
+    """The submitted answers array, in test order, from saved state plus any final deltas."""
+    merged = coalesce(list(saved_state(stored_answers).values()) + list(deltas or []))
+    questions = test.get("questions", []) if test else []
+    count = max(len(questions), max(merged, default=-1) + 1)
+    return [{"question_text": questions[i].get("text") if i < len(questions) else None,
+             "answer": merged[i]["answer"] if i in merged else None} for i in range(count)]
@@ -0,0 +1,105 @@
+# bench/bench_indexes.py
+"""Lookup latency with and without the schema indexes.
+
+Seeds a scratch database with N submissions (default 100k) spread over
+students and tests, times the hot lookups from app.py with only the default
+_id index, then runs schema.ensure_indexes and times them again.
+
+Usage (from backend/, needs a running mongod):
+    python bench/bench_indexes.py [--submissions 100000] [--repeat 200]
+
+MONGO_URI selects the server; BENCH_MONGO_DB the scratch database
+(default secure_exam_bench), which is dropped before and after the run.
+"""
+import argparse
+import datetime
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+from pymongo import MongoClient
+from schema import drop_declared_indexes, ensure_indexes
+
+
+def seed(db, submissions, students, tests, chunk=5000):
+    now = datetime.datetime.utcnow()
+    db.tests.insert_many([{"test_id": f"t{t:05d}", "name": f"Test {t}", "questions": []} for t in range(tests)])
+    db.users.insert_many([{"user_id": f"s{s:06d}", "full_name": f"Student {s}", "role": "student"} for s in range(students)])
+    session_ids, batch = [], []
+    for i in range(submissions):
+        session_id = str(uuid.uuid4())
+        session_ids.append(session_id)
+        batch.append({
+            "session_id": session_id, "student_id": f"s{random.randrange(students):06d}", "test_id": f"t{random.randrange(tests):05d}",
+            "status": "active" if i % 50 == 0 else "completed", "start_time": now - datetime.timedelta(seconds=i * 7),
+            "answers": [], "counters": {"events": 0, "warnings": 0, "violations": 0}
+        })
+        if len(batch) >= chunk:
+            db.submissions.insert_many(batch)
+            batch = []
+    if batch:
+        db.submissions.insert_many(batch)
+    return session_ids
+
+
+def lookups(session_ids, students, tests):
+    return {
+        "find_one session_id": lambda db: db.submissions.find_one({"session_id": random.choice(session_ids)}),
+        "find student_id": lambda db: list(db.submissions.find({"student_id": f"s{random.randrange(students):06d}"})),
+        "find student+test": lambda db: db.submissions.find_one({"student_id": f"s{random.randrange(students):06d}", "test_id": f"t{random.randrange(tests):05d}"}),
+        "active by start_time": lambda db: list(db.submissions.find({"status": "active"}).sort("start_time", -1).limit(50)),
+        "test+status page": lambda db: list(db.submissions.find({"test_id": f"t{random.randrange(tests):05d}", "status": "completed"}).sort("start_time", -1).limit(50)),
+        "find_one test_id": lambda db: db.tests.find_one({"test_id": f"t{random.randrange(tests):05d}"}),
+        "find_one user_id": lambda db: db.users.find_one({"user_id": f"s{random.randrange(students):06d}"}),
+    }
+
+
+def measure(db, queries, repeat):
+    results = {}
+    for name, run in queries.items():
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            run(db)
+            samples.append((time.perf_counter() - started) * 1000)
+        samples.sort()
+        results[name] = (statistics.median(samples), samples[int(len(samples) * 0.95) - 1])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--submissions", type=int, default=100000)
+    parser.add_argument("--students", type=int, default=20000)
+    parser.add_argument("--tests", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    load_dotenv()
+    client = MongoClient(os.environ.get("MONGO_URI"))
+    db_name = os.environ.get("BENCH_MONGO_DB", "secure_exam_bench")
+    client.drop_database(db_name)
+    db = client[db_name]
+    try:
+        print(f"Seeding {args.submissions} submissions, {args.students} students, {args.tests} tests...")
+        session_ids = seed(db, args.submissions, args.students, args.tests)
+        queries = lookups(session_ids, args.students, args.tests)
+        drop_declared_indexes(db)
+        before = measure(db, queries, args.repeat)
+        ensure_indexes(db)
+        after = measure(db, queries, args.repeat)
+        print(f"\n{'lookup':24} {'no index p50/p95 ms':>22} {'indexed p50/p95 ms':>22} {'speedup':>8}")
+        for name in queries:
+            (b50, b95), (a50, a95) = before[name], after[name]
+            print(f"{name:24} {b50:>10.2f} / {b95:<9.2f} {a50:>10.2f} / {a95:<9.2f} {b50 / a50 if a50 else float('inf'):>7.1f}x")
+    finally:
+        client.drop_database(db_name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# bench/bench_json.py
+"""Encode time and peak memory of a 10k-submission admin payload.
+
+Compares the old ``jsonify(json.loads(json.dumps(x, default=...)))`` double
+serialization with BSONJSONProvider on the stdlib encoder and, when orjson
+is installed, on orjson. No database is needed; documents are generated
+with ObjectIds and datetimes like the ones pymongo returns.
+
+Usage (from backend/):
+    python bench/bench_json.py [--submissions 10000] [--repeat 5]
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+import uuid
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId
+from flask import Flask
+import json_provider
+from json_provider import BSONJSONProvider, bson_default
+
+
+def make_payload(count):
+    now = datetime.datetime.utcnow()
+    submissions = []
+    for i in range(count):
+        start = now - datetime.timedelta(minutes=i)
+        submissions.append({
+            "_id": ObjectId(), "session_id": str(uuid.uuid4()), "student_id": f"s{i % 2000:06d}", "test_id": f"t{i % 40:05d}",
+            "status": "completed", "start_time": start, "end_time": start + datetime.timedelta(minutes=45),
+            "student_name": f"Student {i % 2000}", "test_name": f"Test {i % 40}", "answer_count": 20, "warnings": random.randrange(5),
+            "grade": {"score": random.randrange(20), "total": 20, "score_str": "12/20", "graded_at": now},
+            "answers": [{"question_index": q, "answer": f"option {random.randrange(4)}"} for q in range(20)],
+        })
+    return {"status": "success", "submissions": submissions, "next_cursor": None}
+
+
+def legacy_encode(app, payload):
+    with app.app_context():
+        return app.json.response(json.loads(json.dumps(payload, default=bson_default))).get_data()
+
+
+def provider_encode(app, payload):
+    with app.app_context():
+        return app.json.response(payload).get_data()
+
+
+def measure(label, encode, payload, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = encode(payload)
+        times.append(time.perf_counter() - started)
+    tracemalloc.start()
+    encode(payload)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{label:<28} median {statistics.median(times) * 1000:8.1f} ms   peak {peak / 2**20:7.1f} MiB   body {len(body) / 2**20:6.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--submissions", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    payload = make_payload(args.submissions)
+    default_app = Flask("bench_default")
+    default_app.json.default = bson_default
+    provider_app = Flask("bench_provider")
+    provider_app.json = BSONJSONProvider(provider_app)
+
+    orjson = json_provider.orjson
+    json_provider.orjson = None
+    measure("dumps/loads + jsonify", lambda p: legacy_encode(default_app, p), payload, args.repeat)
+    measure("provider (stdlib)", lambda p: provider_encode(provider_app, p), payload, args.repeat)
+    json_provider.orjson = orjson
+    if orjson is not None:
+        measure("provider (orjson)", lambda p: provider_encode(provider_app, p), payload, args.repeat)
+    else:
+        print("orjson is not installed; skipping the orjson run")
+
+
+if __name__ == "__main__":
+    main()
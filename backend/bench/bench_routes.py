@@ -0,0 +1,376 @@
+# bench/bench_routes.py
+"""Per-route latency, throughput and memory for every /api route, checked against a baseline.
+
+Seeds a stand-in database with exam-day volumes (thousands of tests, 100k
+students and submissions with long log arrays), then drives each /api route
+in app.py through the Flask test client. For every route it records p50/p95
+latency, single-threaded throughput and the peak Python memory allocated by
+one request (tracemalloc). Results are compared with bench/baseline_routes.json
+and the run exits non-zero when a route is slower or heavier than its baseline
+by more than --tolerance, or returns more 4xx errors than its baseline. Any
+5xx response fails the run, with or without a baseline.
+
+The database is an in-memory mongomock by default (MONGO_MOCK=1 in app.py);
+--mongo-uri runs against a real mongod instead, using a scratch database
+(BENCH_MONGO_DB, default secure_exam_bench) that is dropped first.
+
+Usage (from backend/, after pip install -r requirements-dev.txt):
+    python bench/bench_routes.py --quick                   # small volumes; compared with the committed baseline
+    python bench/bench_routes.py --save-baseline           # record a new baseline
+    python bench/bench_routes.py --routes admin/submissions,exam/events
+
+The committed baseline was recorded with --quick. Timings are machine-specific,
+and a shared host can make a whole run tens of percent slower, so the default
+--tolerance of 1.0 (twice as slow) targets real regressions such as a lost
+index. Re-record the baseline (--quick --save-baseline) on the machine that
+runs the comparison, and only compare runs made with the same volumes.
+"""
+import argparse
+import datetime
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+import uuid
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+BASELINE_PATH = os.path.join(BACKEND_DIR, "bench", "baseline_routes.json")
+ADMIN_ID, ADMIN_PASSWORD = "bench-admin@example.com", "bench-password"
+FULL = {"tests": 2000, "students": 100000, "submissions": 100000, "log_length": 40, "questions": 20}
+QUICK = {"tests": 200, "students": 5000, "submissions": 5000, "log_length": 20, "questions": 20}
+# Routes that scan whole collections by design; fewer iterations keep the run time reasonable.
+SLOW_ROUTES = {"admin/summary/rebuild": 3, "admin/students GET": 5}
+
+
+def configure_environment(args):
+    """Must run before app is imported: app connects and bootstraps at import time."""
+    if args.mongo_uri:
+        from pymongo import MongoClient
+        os.environ["MONGO_URI"] = args.mongo_uri
+        os.environ["MONGO_DB_NAME"] = os.environ.get("BENCH_MONGO_DB", "secure_exam_bench")
+        MongoClient(args.mongo_uri).drop_database(os.environ["MONGO_DB_NAME"])
+    else:
+        os.environ["MONGO_MOCK"] = "1"
+    os.environ.setdefault("PRECOMPRESS_STATIC", "0")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    # Measure the routes themselves, not the admission limiter's 429s.
+    os.environ.setdefault("START_ADMISSION_RATE", "0")
+    os.environ.setdefault("SELFIE_ADMISSION_RATE", "0")
+    # Likewise the face-detection queue: frame routes answer 503 when it is full, which is backpressure, not route cost.
+    os.environ.setdefault("FACE_DETECT_QUEUE", "100000")
+
+
+def make_jpeg(width=640, height=480):
+    import cv2
+    import numpy as np
+    ramp = np.linspace(0, 255, width, dtype=np.uint8)
+    image = np.dstack([np.tile(ramp, (height, 1))] * 3)
+    return cv2.imencode(".jpg", image)[1].tobytes()
+
+
+class Fixture:
+    """Seeds the database and hands out random existing ids to the route builders."""
+
+    def __init__(self, server, volumes, chunk=5000):
+        self.server = server
+        self.volumes = volumes
+        now = datetime.datetime.utcnow()
+        self.test_ids = [f"bench-t{t:05d}" for t in range(volumes["tests"])]
+        self.student_ids = [f"bench-s{s:06d}" for s in range(volumes["students"])]
+        questions = [{"type": "mcq", "text": f"Question {q}", "options": ["A", "B", "C", "D"], "answer": "A"} if q % 4
+                     else {"type": "subjective", "text": f"Question {q}"} for q in range(volumes["questions"])]
+        server.tests_collection.insert_many([
+            {"test_id": test_id, "name": f"Bench Test {t}", "code": f"B{t}", "duration_seconds": 3600, "questions": questions,
+             "created_at": now, **({"scheduled_datetime": now + datetime.timedelta(days=7)} if t % 10 == 0 else {})}
+            for t, test_id in enumerate(self.test_ids)])
+        server.users_collection.insert_one({"user_id": ADMIN_ID, "full_name": "Bench Admin", "role": "admin", "password": ADMIN_PASSWORD})
+        for start in range(0, len(self.student_ids), chunk):
+            server.users_collection.insert_many([{"user_id": student_id, "full_name": f"Bench Student {student_id[-6:]}", "role": "student"}
+                                                 for student_id in self.student_ids[start:start + chunk]])
+        self.completed, self.active, batch = [], [], []
+        for i in range(volumes["submissions"]):
+            session_id, active = str(uuid.uuid4()), i % 50 == 0
+            start_time = now - datetime.timedelta(days=2, seconds=i * 7)
+            (self.active if active else self.completed).append(session_id)
+            logs = [{"timestamp": start_time + datetime.timedelta(seconds=j * 30), "type": "warning" if j % 10 == 0 else "info",
+                     "message": "Tab switched" if j % 10 == 0 else "Heartbeat"} for j in range(volumes["log_length"])]
+            doc = {"session_id": session_id, "student_id": random.choice(self.student_ids), "test_id": random.choice(self.test_ids),
+                   "status": "active" if active else "completed", "start_time": start_time, "logs": logs,
+                   "answers": [{"question_index": q, "question_text": f"Question {q}", "answer": random.choice("ABCD")} for q in range(volumes["questions"])],
+                   "counters": {"events": 0, "warnings": 0, "violations": 0}}
+            if not active:
+                doc["end_time"] = start_time + datetime.timedelta(minutes=50)
+            batch.append(doc)
+            if len(batch) >= chunk:
+                server.submissions_collection.insert_many(batch)
+                batch = []
+        if batch:
+            server.submissions_collection.insert_many(batch)
+        self.owners = {doc["session_id"]: doc["student_id"] for doc in server.submissions_collection.find(
+            {"session_id": {"$in": self.completed[:1000]}}, {"_id": 0, "session_id": 1, "student_id": 1})}
+        server.live_stats.rebuild(server.submissions_collection)
+        self.jpeg = make_jpeg()
+
+    def test_id(self):
+        return random.choice(self.test_ids)
+
+    def student_id(self):
+        return random.choice(self.student_ids)
+
+    def completed_session(self):
+        return random.choice(self.completed)
+
+    def owned_session(self):
+        session_id = random.choice(list(self.owners))
+        return session_id, self.owners[session_id]
+
+    def active_session(self):
+        return random.choice(self.active)
+
+    def new_active_session(self):
+        session_id = str(uuid.uuid4())
+        self.server.submissions_collection.insert_one({
+            "session_id": session_id, "student_id": self.student_id(), "test_id": self.test_id(), "status": "active",
+            "start_time": datetime.datetime.utcnow(), "answers": [], "counters": {"events": 0, "warnings": 0, "violations": 0}})
+        return session_id
+
+    def new_test(self, roster=0):
+        test_id = f"bench-tmp-{uuid.uuid4().hex[:12]}"
+        self.server.tests_collection.insert_one({"test_id": test_id, "name": "Disposable", "duration_seconds": 600, "questions": [],
+                                                 **({"student_ids": random.sample(self.student_ids, roster)} if roster else {})})
+        return test_id
+
+    def new_student(self):
+        student_id = f"bench-tmp-{uuid.uuid4().hex[:12]}"
+        self.server.users_collection.insert_one({"user_id": student_id, "full_name": "Disposable Student", "role": "student"})
+        return student_id
+
+
+def routes(fx):
+    """name -> builder returning the request for one iteration (setup inside a builder is not timed).
+
+    Builders return a dict of test-client ``open`` kwargs plus optional ``as_student``
+    (log in as that student), ``as_admin`` and ``first_chunk`` (streaming response).
+    """
+    def events(count):
+        return [{"seq": i, "type": "info", "message": "Heartbeat", "timestamp": time.time()} for i in range(count)]
+
+    def submit():
+        return {"method": "POST", "path": "/api/exam/submit",
+                "json": {"session_id": fx.new_active_session(), "answers": [{"question_index": 1, "answer": "A"}]}}
+
+    def student_results():
+        session_id, owner = fx.owned_session()
+        return {"method": "GET", "path": f"/api/student/results/{session_id}", "as_student": owner}
+
+    def frames():
+        return {"method": "POST", "path": "/api/proctor/frames", "content_type": "multipart/form-data",
+                "data": {"session_id": fx.active_session(), "frames": [(io.BytesIO(fx.jpeg), f"f{i}.jpg") for i in range(3)]}}
+
+    def roster_csv(rows):
+        prefix = uuid.uuid4().hex[:8]
+        return "student_id,full_name,email\n" + "".join(f"imp-{prefix}-{i},Imported {i},imp{i}@example.com\n" for i in range(rows))
+
+    admin = {"as_admin": True}
+    return {
+        "student/login": lambda: {"method": "POST", "path": "/api/student/login",
+                                  "json": {"studentId": (sid := fx.student_id()), "fullName": f"Bench Student {sid[-6:]}"}},
+        "student/dashboard": lambda: {"method": "GET", "path": "/api/student/dashboard", "as_student": fx.student_id()},
+        "exam/details": lambda: {"method": "GET", "path": f"/api/exam/details/{fx.test_id()}"},
+        "exam/start": lambda: {"method": "POST", "path": "/api/exam/start", "json": {"student_id": fx.student_id(), "test_id": fx.test_id()}},
+        "exam/submit": submit,
+        "submission/summary": lambda: {"method": "GET", "path": f"/api/submission/summary/{fx.completed_session()}"},
+        "exam/selfie": lambda: {"method": "POST", "path": "/api/exam/selfie", "query_string": {"session_id": fx.active_session()},
+                                "data": fx.jpeg, "content_type": "image/jpeg"},
+        "proctor/frame": lambda: {"method": "POST", "path": "/api/proctor/frame", "query_string": {"session_id": fx.active_session()},
+                                  "data": fx.jpeg, "content_type": "image/jpeg"},
+        "proctor/frames": frames,
+        "log_event": lambda: {"method": "POST", "path": "/api/log_event",
+                              "json": {"session_id": fx.active_session(), "log_type": "info", "log_message": "Heartbeat"}},
+        "exam/events": lambda: {"method": "POST", "path": "/api/exam/events",
+                                "json": {"session_id": fx.active_session(), "client_id": str(uuid.uuid4()), "events": events(20)}},
+        "exam/violation": lambda: {"method": "POST", "path": "/api/exam/violation",
+                                   "json": {"session_id": fx.active_session(), "type": "tab_switch", "reason": "Tab switched", "tabSwitchCount": 1}},
+        "student/results": student_results,
+        "student/logout": lambda: {"method": "POST", "path": "/api/student/logout", "as_student": fx.student_id()},
+        "admin/login": lambda: {"method": "POST", "path": "/api/admin/login", "json": {"email": ADMIN_ID, "password": ADMIN_PASSWORD}},
+        "admin/summary": lambda: {"method": "GET", "path": "/api/admin/summary", "query_string": {"breakdown": "1"}, **admin},
+        "admin/summary/rebuild": lambda: {"method": "POST", "path": "/api/admin/summary/rebuild", **admin},
+        "admin/cache-stats": lambda: {"method": "GET", "path": "/api/admin/cache-stats", **admin},
+        "admin/face-detection/stats": lambda: {"method": "GET", "path": "/api/admin/face-detection/stats", **admin},
+        "admin/exams": lambda: {"method": "GET", "path": "/api/admin/exams", **admin},
+        "admin/sessions": lambda: {"method": "GET", "path": "/api/admin/sessions", **admin},
+        "admin/live": lambda: {"method": "GET", "path": "/api/admin/live", "first_chunk": True, **admin},
+        "admin/session": lambda: {"method": "GET", "path": f"/api/admin/session/{fx.active_session()}", **admin},
+        "admin/export-all-logs-csv": lambda: {"method": "GET", "path": "/api/admin/export-all-logs-csv",
+                                              "query_string": {"test_id": fx.test_id()}, **admin},
+        "admin/exports": lambda: {"method": "POST", "path": "/api/admin/exports", "json": {"test_id": fx.test_id()}, **admin},
+        "admin/jobs": lambda: {"method": "GET", "path": "/api/admin/jobs", **admin},
+        "admin/submissions": lambda: {"method": "GET", "path": "/api/admin/submissions", **admin},
+        "admin/submissions?fields=full": lambda: {"method": "GET", "path": "/api/admin/submissions", "query_string": {"fields": "full"}, **admin},
+        "admin/review": lambda: {"method": "GET", "path": f"/api/admin/review/{fx.completed_session()}", **admin},
+        "admin/create_test": lambda: {"method": "POST", "path": "/api/admin/create_test",
+                                      "json": {"title": "Bench created", "duration": "30", "questions": []}, **admin},
+        "admin/test/regrade": lambda: {"method": "POST", "path": f"/api/admin/test/{fx.test_id()}/regrade", **admin},
+        "admin/test/provision": lambda: {"method": "POST", "path": f"/api/admin/test/{fx.new_test(roster=20)}/provision", **admin},
+        "admin/test DELETE": lambda: {"method": "DELETE", "path": f"/api/admin/test/{fx.new_test()}", **admin},
+        "admin/students POST": lambda: {"method": "POST", "path": "/api/admin/students",
+                                        "json": {"student_id": f"bench-new-{uuid.uuid4().hex[:12]}", "full_name": "New Student"}, **admin},
+        "admin/students/import": lambda: {"method": "POST", "path": "/api/admin/students/import", "query_string": {"format": "csv"},
+                                          "data": roster_csv(50), "content_type": "text/csv", **admin},
+        "admin/students GET": lambda: {"method": "GET", "path": "/api/admin/students", **admin},
+        "admin/students DELETE": lambda: {"method": "DELETE", "path": f"/api/admin/students/{fx.new_student()}", **admin},
+        "admin/logout": lambda: {"method": "POST", "path": "/api/admin/logout", **admin},
+    }
+
+
+def issue(client, spec):
+    """Run one request and return (status, seconds); login state is set up before the clock starts."""
+    spec = dict(spec)
+    student, as_admin, first_chunk = spec.pop("as_student", None), spec.pop("as_admin", False), spec.pop("first_chunk", False)
+    with client.session_transaction() as sess:
+        sess.clear()
+        if student:
+            sess["user_id"], sess["user_name"] = student, "Bench Student"
+        if as_admin:
+            sess["admin_logged_in"] = True
+    started = time.perf_counter()
+    if first_chunk:
+        response = client.open(buffered=False, **spec)
+        next(iter(response.response))
+        response.close()
+    else:
+        response = client.open(**spec)
+        response.get_data()
+    return response.status_code, time.perf_counter() - started
+
+
+def measure(client, build, repeat, warmup, settle=lambda: None):
+    """``settle`` runs after every request, untimed, so work a request leaves behind is not billed to the next one."""
+    for _ in range(min(warmup, repeat)):
+        issue(client, build())
+        settle()
+    times, errors, server_errors = [], 0, 0
+    for _ in range(repeat):
+        status, seconds = issue(client, build())
+        settle()
+        times.append(seconds)
+        errors += status >= 400
+        server_errors += status >= 500
+    spec = build()
+    tracemalloc.start()
+    issue(client, spec)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    times.sort()
+    return {"count": repeat, "errors": errors, "server_errors": server_errors, "p50_ms": round(statistics.median(times) * 1000, 3),
+            "p95_ms": round(times[min(len(times) - 1, int(0.95 * len(times)))] * 1000, 3),
+            "req_per_s": round(repeat / sum(times), 1), "peak_kib": round(peak / 1024, 1)}
+
+
+def server_failures(results):
+    """5xx responses are failures whatever the baseline says."""
+    return [f"{name}: {result['server_errors']} of {result['count']} requests returned 5xx"
+            for name, result in results.items() if result["server_errors"]]
+
+
+def settle(server, timeout=300):
+    """Wait for background work a request started (jobs, queued face checks)."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        stats = server.face_service.stats
+        busy_faces = stats["submitted"] - stats["completed"] - stats["failed"]
+        if not busy_faces and not server.job_runner.collection.count_documents({"status": {"$in": ["queued", "running"]}}):
+            return
+        time.sleep(0.01)
+    print(f"  (background work still running after {timeout}s)")
+
+
+def compare(results, baseline, tolerance, min_delta_ms, min_delta_kib):
+    regressions = server_failures(results)
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if result["errors"] > base.get("errors", 0):
+            regressions.append(f"{name}: {result['errors']} errors (baseline {base.get('errors', 0)})")
+        if result["p50_ms"] > base["p50_ms"] * (1 + tolerance) and result["p50_ms"] - base["p50_ms"] > min_delta_ms:
+            regressions.append(f"{name}: p50 {result['p50_ms']} ms vs baseline {base['p50_ms']} ms")
+        if result["peak_kib"] > base["peak_kib"] * (1 + tolerance) and result["peak_kib"] - base["peak_kib"] > min_delta_kib:
+            regressions.append(f"{name}: peak {result['peak_kib']} KiB vs baseline {base['peak_kib']} KiB")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help=f"small volumes: {QUICK}")
+    for key, value in FULL.items():
+        parser.add_argument(f"--{key.replace('_', '-')}", type=int, default=None, help=f"default {value}")
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--routes", default="", help="comma-separated subset of route names")
+    parser.add_argument("--mongo-uri", default=None)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=1.0, help="allowed relative slowdown / memory growth")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="ignore p50 changes smaller than this")
+    parser.add_argument("--min-delta-kib", type=float, default=256.0, help="ignore peak-memory changes smaller than this")
+    args = parser.parse_args()
+    volumes = {key: getattr(args, key) or (QUICK if args.quick else FULL)[key] for key in FULL}
+
+    configure_environment(args)
+    random.seed(1234)
+    import app as server
+    print(f"Seeding {volumes} ...")
+    started = time.perf_counter()
+    fx = Fixture(server, volumes)
+    print(f"Seeded in {time.perf_counter() - started:.1f}s\n")
+
+    client = server.app.test_client()
+    table = routes(fx)
+    selected = [name for name in table if not args.routes or name in args.routes.split(",")]
+    results = {}
+    print(f"{'route':<32} {'p50 ms':>9} {'p95 ms':>9} {'req/s':>8} {'peak KiB':>10} {'errors':>7}")
+    for name in selected:
+        result = results[name] = measure(client, table[name], min(args.repeat, SLOW_ROUTES.get(name, args.repeat)), args.warmup,
+                                         settle=lambda: settle(server))
+        print(f"{name:<32} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['req_per_s']:>8.1f} {result['peak_kib']:>10.1f} {result['errors']:>7}")
+    server.shutdown()
+
+    failures = server_failures(results)
+    if args.save_baseline:
+        if failures:
+            print("\n" + "\n".join(f"FAILURE {line}" for line in failures) + "\nNot saving a baseline with server errors.")
+            return 1
+        baseline = {"volumes": volumes, "routes": results}
+        if os.path.exists(args.baseline) and args.routes:
+            with open(args.baseline) as f:
+                previous = json.load(f)
+            if previous.get("volumes") == volumes:
+                baseline["routes"] = {**previous["routes"], **results}
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to record one.")
+        print("\n".join(f"FAILURE {line}" for line in failures))
+        return 1 if failures else 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get("volumes") != volumes:
+        print(f"\nBaseline was recorded with {baseline.get('volumes')}; not comparing a run with {volumes}.")
+        print("\n".join(f"FAILURE {line}" for line in failures))
+        return 1 if failures else 2
+    regressions = compare(results, baseline["routes"], args.tolerance, args.min_delta_ms, args.min_delta_kib)
+    print("\n" + ("\n".join(f"REGRESSION {line}" for line in regressions) if regressions else "No regressions against the baseline."))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
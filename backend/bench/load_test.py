@@ -0,0 +1,197 @@
+# bench/load_test.py
+"""Exam-day load test: N simulated candidates against a running server.
+
+Each candidate logs in, loads the dashboard and exam details, starts a
+session, posts batches of proctoring events and submits, the way the
+frontend does. All candidates start together (the "start bell") unless
+--ramp spreads them out. Reports p50/p99 latency, errors and throughput per
+endpoint. Only the standard library is needed to drive the load.
+
+Usage (from backend/, with the server running, e.g. under gunicorn):
+    python bench/load_test.py --seed --candidates 500 [--url http://127.0.0.1:5000]
+
+--seed inserts throwaway students (user_id load-00000, ...) directly into
+MONGO_URI and removes them and their submissions afterwards (needs pymongo);
+without it the students must already exist. Cleanup bypasses the app, so
+POST /api/admin/summary/rebuild afterwards to resync the live counters.
+--provision also pre-creates their sessions (as the scheduled-start
+provisioner does), so starts are activations rather than inserts.
+
+Starts answered with 429 are retried after the server's retry_after plus
+jitter, like the exam page; the throttled attempts are reported under
+their own "[429]" label and do not count as errors.
+"""
+import argparse
+import collections
+import gzip
+import http.cookiejar
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = collections.defaultdict(list)
+        self.errors = collections.Counter()
+        self._lock = threading.Lock()
+
+    def record(self, label, seconds, ok):
+        with self._lock:
+            self.latencies[label].append(seconds)
+            if not ok:
+                self.errors[label] += 1
+
+
+class Candidate:
+    """One browser: its own cookie jar, every request timed under an endpoint label."""
+
+    def __init__(self, base_url, stats, timeout):
+        self.base_url = base_url.rstrip("/")
+        self.stats = stats
+        self.timeout = timeout
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+
+    def call(self, label, path, body=None):
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, method="POST" if data is not None else "GET",
+                                         headers={"Content-Type": "application/json", "Accept-Encoding": "gzip"})
+        started = time.perf_counter()
+        try:
+            with self.opener.open(request, timeout=self.timeout) as response:
+                payload = response.read()
+                status = response.status
+                if response.headers.get("Content-Encoding") == "gzip":
+                    payload = gzip.decompress(payload)
+        except urllib.error.HTTPError as e:
+            payload, status = e.read(), e.code
+        except (urllib.error.URLError, OSError):
+            payload, status = b"", 0
+        if status == 429:
+            label += " [429]"
+        self.stats.record(label, time.perf_counter() - started, 200 <= status < 300 or status == 429)
+        if response_is_json(payload):
+            return status, json.loads(payload)
+        return status, None
+
+
+def response_is_json(payload):
+    return payload[:1] in (b"{", b"[")
+
+
+ADMISSION_RETRIES = 20
+
+
+def run_candidate(index, args, stats, bell):
+    student_id = f"{args.prefix}{index:05d}"
+    candidate = Candidate(args.url, stats, args.timeout)
+    bell.wait()
+    if args.ramp:
+        time.sleep(random.uniform(0, args.ramp))
+    status, _ = candidate.call("POST /api/student/login", "/api/student/login", {"studentId": student_id, "fullName": f"Load Candidate {index}"})
+    if status != 200:
+        return
+    candidate.call("GET /api/student/dashboard", "/api/student/dashboard")
+    candidate.call("GET /api/exam/details", f"/api/exam/details/{args.test_id}")
+    for _ in range(ADMISSION_RETRIES):
+        status, body = candidate.call("POST /api/exam/start", "/api/exam/start", {"student_id": student_id, "test_id": args.test_id})
+        if status != 429:
+            break
+        time.sleep((body or {}).get("retry_after", 1) + random.random())
+    if status != 201 or not body:
+        return
+    session_id, client_id, seq = body["session_id"], str(uuid.uuid4()), 0
+    for _ in range(args.event_batches):
+        time.sleep(random.uniform(0, 2 * args.think))
+        events = []
+        for _ in range(args.batch_size):
+            seq += 1
+            events.append({"seq": seq, "type": "warning" if random.random() < 0.05 else "info",
+                           "message": "Tab switched" if random.random() < 0.05 else "Heartbeat", "timestamp": time.time()})
+        candidate.call("POST /api/exam/events", "/api/exam/events", {"session_id": session_id, "client_id": client_id, "events": events})
+    answers = [{"question_index": q, "answer": "Newton"} for q in range(2)]
+    candidate.call("POST /api/exam/submit", "/api/exam/submit", {"session_id": session_id, "answers": answers})
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def report(stats, elapsed):
+    print(f"\n{'endpoint':<30} {'count':>7} {'errors':>7} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9} {'req/s':>8}")
+    total = 0
+    for label, values in stats.latencies.items():
+        total += len(values)
+        print(f"{label:<30} {len(values):>7} {stats.errors[label]:>7} {percentile(values, 0.5) * 1000:>9.1f} "
+              f"{percentile(values, 0.99) * 1000:>9.1f} {max(values) * 1000:>9.1f} {len(values) / elapsed:>8.1f}")
+    print(f"\n{total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s), {sum(stats.errors.values())} errors")
+
+
+def seed_students(args):
+    from dotenv import load_dotenv
+    from pymongo import MongoClient
+    load_dotenv()
+    db = MongoClient(os.environ.get("MONGO_URI"))[args.database]
+    db.users.delete_many({"user_id": {"$regex": f"^{args.prefix}"}})
+    db.users.insert_many([{"user_id": f"{args.prefix}{i:05d}", "full_name": f"Load Candidate {i}", "role": "student"}
+                          for i in range(args.candidates)])
+    if args.provision:
+        sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        from provisioning import provision_sessions
+        provision_sessions(db.submissions, args.test_id, (f"{args.prefix}{i:05d}" for i in range(args.candidates)))
+    return db
+
+
+def cleanup_students(db, args):
+    students = {"$regex": f"^{args.prefix}"}
+    session_ids = db.submissions.distinct("session_id", {"student_id": students})
+    db.proctoring_events.delete_many({"session_id": {"$in": session_ids}})
+    db.submissions.delete_many({"student_id": students})
+    db.users.delete_many({"user_id": students})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--candidates", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=0, help="client threads (default: one per candidate)")
+    parser.add_argument("--test-id", default="dummy-test-01")
+    parser.add_argument("--event-batches", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--think", type=float, default=0.5, help="mean seconds between event batches")
+    parser.add_argument("--ramp", type=float, default=0.0, help="spread candidate arrivals over this many seconds")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", action="store_true")
+    parser.add_argument("--provision", action="store_true", help="with --seed, pre-create the candidates' sessions")
+    parser.add_argument("--prefix", default="load-")
+    parser.add_argument("--database", default="secure_exam_lite")
+    args = parser.parse_args()
+
+    db = seed_students(args) if args.seed else None
+    stats = Stats()
+    concurrency = args.concurrency or args.candidates
+    bell = threading.Barrier(min(concurrency, args.candidates))
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            futures = [pool.submit(run_candidate, i, args, stats, bell if i < bell.parties else threading.Barrier(1))
+                       for i in range(args.candidates)]
+            for future in futures:
+                future.result()
+        report(stats, time.perf_counter() - started)
+    finally:
+        if db is not None:
+            cleanup_students(db, args)
+    return 1 if sum(stats.errors.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
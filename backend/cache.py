@@ -0,0 +1,122 @@
+# backend/cache.py
+import collections
+import threading
+import time
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after ``ttl`` seconds.
+
+    ``get_or_load`` is single-flight: when many requests miss on the same key
+    at once, one of them runs the loader and the rest wait for its result.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._loading = {}
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, key, loader):
+        value = self.get(key)
+        if value is not None:
+            return value
+        with self._lock:
+            pending = self._loading.get(key)
+            leader = pending is None
+            if leader:
+                pending = self._loading[key] = {"done": threading.Event(), "value": None}
+        if not leader:
+            pending["done"].wait()
+            return pending["value"]
+        try:
+            value = loader(key)
+            if value is not None:
+                self.set(key, value)
+            pending["value"] = value
+            return value
+        finally:
+            with self._lock:
+                self._loading.pop(key, None)
+            pending["done"].set()
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"size": len(self._data), "maxsize": self.maxsize, "ttl": self.ttl, "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions, "hit_rate": round(self.hits / lookups, 4) if lookups else None}
+
+
+class RecordCache:
+    """Read-through cache of documents from one collection, keyed by a unique field.
+
+    Cached documents are shared between requests and must be treated as
+    read-only. Invalidation is per process; ``ttl`` bounds how long other
+    processes can serve a stale record after a write.
+    """
+
+    def __init__(self, collection, key_field, projection=None, maxsize=1024, ttl=60.0):
+        self.collection = collection
+        self.key_field = key_field
+        self.projection = projection or {"_id": 0}
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def _load(self, key):
+        return self.collection.find_one({self.key_field: key}, self.projection)
+
+    def get(self, key):
+        if key is None:
+            return None
+        return self.cache.get_or_load(key, self._load)
+
+    def get_many(self, keys):
+        """{key: doc} for the keys that exist; misses are fetched with a single ``$in`` query."""
+        found, missing = {}, []
+        for key in set(keys):
+            if key is None:
+                continue
+            doc = self.cache.get(key)
+            if doc is None:
+                missing.append(key)
+            else:
+                found[key] = doc
+        if missing:
+            for doc in self.collection.find({self.key_field: {"$in": missing}}, self.projection):
+                self.cache.set(doc[self.key_field], doc)
+                found[doc[self.key_field]] = doc
+        return found
+
+    def invalidate(self, key):
+        self.cache.invalidate(key)
+
+    def stats(self):
+        return self.cache.stats()
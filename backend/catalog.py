@@ -0,0 +1,77 @@
+# backend/catalog.py
+import bisect
+import datetime
+import threading
+import time
+from json_provider import isoformat_utc
+
+# Only the fields the student dashboard renders; questions are reduced to a count in the query.
+CARD_PIPELINE = [
+    {"$project": {"_id": 0, "test_id": 1, "name": 1, "duration_seconds": 1, "scheduled_datetime": 1,
+                  "question_count": {"$size": {"$ifNull": ["$questions", []]}}}},
+    {"$sort": {"scheduled_datetime": 1, "test_id": 1}},
+]
+
+
+def _as_utc(value):
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=datetime.timezone.utc)
+    return value
+
+
+class TestCatalog:
+    """In-memory index of test "cards" for the dashboard, partitioned by schedule time.
+
+    Cards are JSON-ready (datetimes already rendered as strings) and shared
+    between requests, so they must not be mutated. Tests without a schedule
+    are always available; scheduled ones are kept sorted so the available /
+    upcoming split for "now" is a single bisect. The index is rebuilt after
+    ``ttl`` seconds or on ``invalidate()``.
+    """
+
+    def __init__(self, collection, pinned_test_id=None, ttl=60.0):
+        self.collection = collection
+        self.pinned_test_id = pinned_test_id
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._index = None
+        self._expires = 0.0
+
+    def _build(self):
+        pinned, by_id, unscheduled, scheduled_times, scheduled = None, {}, [], [], []
+        for doc in self.collection.aggregate(CARD_PIPELINE):
+            when = _as_utc(doc.get("scheduled_datetime"))
+            if doc.get("scheduled_datetime") is not None:
+                doc["scheduled_datetime"] = isoformat_utc(doc["scheduled_datetime"])
+            if doc["test_id"] == self.pinned_test_id:
+                pinned = doc
+                continue
+            by_id[doc["test_id"]] = doc
+            if when is None:
+                unscheduled.append(doc)
+            else:
+                scheduled_times.append(when)
+                scheduled.append(doc)
+        return {"pinned": pinned, "by_id": by_id, "unscheduled": unscheduled, "times": scheduled_times, "scheduled": scheduled}
+
+    def _current(self):
+        with self._lock:
+            if self._index is None or time.monotonic() >= self._expires:
+                self._index = self._build()
+                self._expires = time.monotonic() + self.ttl
+            return self._index
+
+    def invalidate(self):
+        with self._lock:
+            self._index = None
+
+    def card(self, test_id):
+        """The card for a (non-pinned) test, or None."""
+        return self._current()["by_id"].get(test_id)
+
+    def partition(self, now=None):
+        """(pinned card or None, cards available now, cards scheduled in the future, {test_id: card})."""
+        index = self._current()
+        split = bisect.bisect_right(index["times"], now or datetime.datetime.now(datetime.timezone.utc))
+        available = index["unscheduled"] + index["scheduled"][:split]
+        return index["pinned"], available, index["scheduled"][split:], index["by_id"]
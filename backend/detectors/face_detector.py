@@ -1,9 +1,34 @@
 # detectors/face_detector.py
+import threading
 import cv2
+import numpy as np
+
+CASCADE_PATH = cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+_local = threading.local()
+
+def get_cascade():
+    # CascadeClassifier is not safe to share between threads, so each worker
+    # thread parses the Haar XML once and keeps its own instance.
+    cascade = getattr(_local, "cascade", None)
+    if cascade is None:
+        cascade = _local.cascade = cv2.CascadeClassifier(CASCADE_PATH)
+    return cascade
+
+def decode_gray(image_bytes):
+    """Decode JPEG/PNG bytes straight to a grayscale array (no temp file)."""
+    gray = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+    if gray is None:
+        raise ValueError("Could not decode image data")
+    return gray
+
+def detect_faces_in_gray(gray, scale_factor=1.1, min_neighbors=4, min_size=(30, 30)):
+    return get_cascade().detectMultiScale(gray, scale_factor, min_neighbors, minSize=min_size)
+
+def detect_faces_in_bytes(image_bytes):
+    return len(detect_faces_in_gray(decode_gray(image_bytes)))
 
 def detect_faces(image_path):
-    face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
-    img = cv2.imread(image_path)
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    faces = face_cascade.detectMultiScale(gray, 1.1, 4)
-    return len(faces)
+    img = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+    if img is None:
+        raise ValueError(f"Could not read image: {image_path}")
+    return len(detect_faces_in_gray(img))
@@ -0,0 +1,60 @@
+# detectors/service.py
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+from detectors.face_detector import detect_faces_in_bytes, get_cascade
+
+log = logging.getLogger("secure_exam.face_detection")
+
+
+class ServiceBusy(Exception):
+    """Raised when the detection queue is full; callers should retry later."""
+
+
+class FaceDetectionService:
+    """Runs face detection on a bounded thread pool.
+
+    OpenCV releases the GIL inside ``imdecode`` and ``detectMultiScale``, so a
+    thread pool gives real parallelism without the pickling cost of a process
+    pool. At most ``max_pending`` jobs may be queued or running; beyond that
+    ``submit`` raises ``ServiceBusy`` instead of letting request threads pile up.
+    """
+
+    def __init__(self, max_workers=None, max_pending=None):
+        self.max_workers = max_workers or os.cpu_count() or 2
+        self.max_pending = max_pending or self.max_workers * 8
+        if self.max_workers > 1:
+            # Parallelism comes from the pool; OpenCV's own threads would only oversubscribe the cores.
+            cv2.setNumThreads(1)
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="face-detect", initializer=get_cascade)
+        self.stats = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0}
+
+    def submit(self, fn, *args, on_done=None):
+        if not self._slots.acquire(blocking=False):
+            self.stats["rejected"] += 1
+            raise ServiceBusy()
+        self.stats["submitted"] += 1
+
+        def run():
+            try:
+                result = fn(*args)
+                if on_done is not None:
+                    on_done(result)
+                self.stats["completed"] += 1
+                return result
+            except Exception as e:
+                self.stats["failed"] += 1
+                log.error(f"Face detection job failed: {e}")
+            finally:
+                self._slots.release()
+
+        return self._executor.submit(run)
+
+    def count_faces(self, image_bytes, on_done=None):
+        return self.submit(detect_faces_in_bytes, image_bytes, on_done=on_done)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
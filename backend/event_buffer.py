@@ -0,0 +1,129 @@
+# backend/event_buffer.py
+import collections
+import logging
+import threading
+import time
+
+log = logging.getLogger("secure_exam.events")
+
+
+class BufferFull(Exception):
+    """Raised by ``add`` when ``max_pending`` events are already waiting; callers should retry later."""
+
+
+class EventBuffer:
+    """Collects proctoring events in memory and writes them in bulk.
+
+    Events are grouped per session and handed to ``flush_fn`` as
+    ``{session_id: [entry, ...]}`` whenever ``max_events`` are pending or the
+    oldest pending event is ``max_delay`` seconds old. Client sequence numbers
+    are remembered per (session, client) so retried batches are not stored twice.
+    A failed flush keeps its events queued for the next attempt; once
+    ``max_pending`` events are waiting, ``add`` raises ``BufferFull``.
+    """
+
+    def __init__(self, flush_fn, max_events=500, max_delay=1.0, max_tracked_clients=50000, max_pending=None):
+        self._flush_fn = flush_fn
+        self.max_events = max_events
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+        self._pending = {}
+        self._pending_count = 0
+        self._oldest = None
+        self._seen = collections.OrderedDict()
+        self._max_tracked_clients = max_tracked_clients
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._flush_lock = threading.Lock()
+        self._closed = False
+        self.stats = {"accepted": 0, "duplicates": 0, "rejected": 0, "flushes": 0, "written": 0}
+        self._thread = threading.Thread(target=self._run, name="event-buffer", daemon=True)
+        self._thread.start()
+
+    def add(self, session_id, entries, client_id=None):
+        """Queue entries for a session; returns (accepted, duplicates)."""
+        accepted = duplicates = 0
+        with self._lock:
+            if self.max_pending is not None and self._pending_count >= self.max_pending:
+                self.stats["rejected"] += len(entries)
+                raise BufferFull()
+            seen = self._seen_for((session_id, client_id))
+            bucket = self._pending.setdefault(session_id, [])
+            for entry in entries:
+                seq = entry.get("seq")
+                if seq is not None:
+                    if seq in seen:
+                        duplicates += 1
+                        continue
+                    seen.add(seq)
+                bucket.append(entry)
+                accepted += 1
+            if not bucket:
+                del self._pending[session_id]
+            self._pending_count += accepted
+            if accepted and self._oldest is None:
+                self._oldest = time.monotonic()
+            self.stats["accepted"] += accepted
+            self.stats["duplicates"] += duplicates
+            if self._pending_count >= self.max_events:
+                self._wakeup.notify()
+        return accepted, duplicates
+
+    def _seen_for(self, client_key):
+        seen = self._seen.get(client_key)
+        if seen is None:
+            seen = self._seen[client_key] = set()
+            if len(self._seen) > self._max_tracked_clients:
+                self._seen.popitem(last=False)
+        else:
+            self._seen.move_to_end(client_key)
+        return seen
+
+    def flush(self):
+        """Write everything pending now; returns the number of events written."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                count, self._pending_count, self._oldest = self._pending_count, 0, None
+            if not batch:
+                return 0
+            try:
+                self._flush_fn(batch)
+            except Exception as e:
+                log.error(f"Failed to flush {count} buffered events: {e}")
+                with self._lock:
+                    for session_id, entries in batch.items():
+                        self._pending.setdefault(session_id, [])[:0] = entries
+                    self._pending_count += count
+                    self._oldest = self._oldest or time.monotonic()
+                return 0
+            self.stats["flushes"] += 1
+            self.stats["written"] += count
+            return count
+
+    def pending(self):
+        return self._pending_count
+
+    def _due(self):
+        if self._pending_count >= self.max_events:
+            return True
+        return self._oldest is not None and time.monotonic() - self._oldest >= self.max_delay
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._closed and not self._due():
+                    self._wakeup.wait(self.max_delay)
+                if self._closed:
+                    return
+            self.flush()
+            if self._pending_count:
+                # A failed flush re-queued its events; back off before retrying.
+                time.sleep(self.max_delay)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._wakeup.notify()
+        self._thread.join(timeout=5)
+        return self.flush()
@@ -0,0 +1,170 @@
+# backend/event_store.py
+import datetime
+import logging
+import threading
+from bson import ObjectId
+from pymongo import ASCENDING, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+EVENTS_COLLECTION = "proctoring_events"
+EMPTY_COUNTERS = {"events": 0, "warnings": 0, "violations": 0}
+
+log = logging.getLogger("secure_exam.events")
+
+
+def _is_warning(entry):
+    return entry.get("type") == "warning"
+
+
+def _is_violation(entry):
+    return entry.get("event_type") == "exam_violation"
+
+
+def legacy_logs(submission):
+    """Events recorded before the event store existed live in ``submission.logs``."""
+    return submission.get("logs") or []
+
+
+def warning_count(submission):
+    counters = submission.get("counters") or {}
+    return counters.get("warnings", 0) + sum(1 for log in legacy_logs(submission) if _is_warning(log))
+
+
+def event_count(submission):
+    counters = submission.get("counters") or {}
+    return counters.get("events", 0) + len(legacy_logs(submission))
+
+
+class EventStore:
+    """Append-only store for proctoring events, one document per event.
+
+    Submissions keep only rolled-up ``counters`` and ``last_event``. Events that
+    carry a client sequence number get a deterministic ``_id`` so replays of the
+    same batch are rejected by the primary key instead of being stored twice.
+    ``listeners`` are called with ``{session_id: new_event_count}`` after each write.
+
+    Counters are rolled forward once per stored event: ids whose counter update
+    failed are remembered, so a retried batch counts them when the re-insert is
+    rejected as a duplicate, and only then.
+    """
+
+    def __init__(self, db, submissions_collection):
+        self.collection = db[EVENTS_COLLECTION]
+        self.submissions = submissions_collection
+        self.listeners = []
+        self._uncounted = set()
+        self._uncounted_lock = threading.Lock()
+
+    def _notify(self, counts):
+        for listener in self.listeners:
+            try:
+                listener(counts)
+            except Exception as e:
+                # Events are already stored; a failing listener must not trigger a re-write.
+                log.error(f"Event listener failed: {e}")
+
+    def _document(self, session_id, entry, client_id=None):
+        doc = {k: v for k, v in entry.items() if k != "client_id"}
+        doc["session_id"] = session_id
+        doc.setdefault("timestamp", datetime.datetime.utcnow())
+        if entry.get("seq") is not None:
+            doc["_id"] = f"{session_id}:{entry.get('client_id') or client_id or '-'}:{entry['seq']}"
+        else:
+            # Kept on the entry so a retry of the same buffered batch reuses the id.
+            doc["_id"] = entry.setdefault("_id", ObjectId())
+        return doc
+
+    def _counter_update(self, session_id, entries, set_fields=None):
+        last = max(entries, key=lambda e: e["timestamp"])
+        update = {
+            "$inc": {
+                "counters.events": len(entries),
+                "counters.warnings": sum(1 for e in entries if _is_warning(e)),
+                "counters.violations": sum(1 for e in entries if _is_violation(e)),
+            },
+            "$max": {"last_event_at": last["timestamp"]},
+            "$set": {"last_event": {"timestamp": last["timestamp"], "type": last.get("type") or last.get("event_type"),
+                                    "message": last.get("message") or last.get("reason")}},
+        }
+        if set_fields:
+            update["$set"].update(set_fields)
+        return UpdateOne({"session_id": session_id}, update)
+
+    def record(self, batch):
+        """Store ``{session_id: [entry, ...]}`` and roll the counters forward.
+
+        Returns the number of new events stored (replayed duplicates excluded).
+        After a failure the same batch can be passed again; nothing is stored or
+        counted twice.
+        """
+        docs = [self._document(session_id, entry) for session_id, entries in batch.items() for entry in entries]
+        if not docs:
+            return 0
+        rejected = set()
+        try:
+            self.collection.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            rejected = {err["index"] for err in errors}
+            if any(err.get("code") != 11000 for err in errors):
+                self._mark_uncounted(doc["_id"] for idx, doc in enumerate(docs) if idx not in rejected)
+                raise
+        except Exception:
+            # Any of them may have been written before the failure.
+            self._mark_uncounted(doc["_id"] for doc in docs)
+            raise
+        with self._uncounted_lock:
+            # A rejected id still counts if an earlier attempt inserted it but failed to update the counters.
+            stored = {}
+            for idx, doc in enumerate(docs):
+                if idx not in rejected or doc["_id"] in self._uncounted:
+                    stored.setdefault(doc["session_id"], []).append(doc)
+            sessions = list(stored)
+            ids = {doc["_id"] for entries in stored.values() for doc in entries}
+            if stored:
+                try:
+                    self.submissions.bulk_write([self._counter_update(sid, stored[sid]) for sid in sessions], ordered=False)
+                except BulkWriteError as e:
+                    failed = {sessions[err["index"]] for err in e.details.get("writeErrors", [])}
+                    self._uncounted = (self._uncounted - ids) | {doc["_id"] for sid in failed for doc in stored[sid]}
+                    raise
+                except Exception:
+                    self._uncounted |= ids
+                    raise
+            self._uncounted -= ids
+        if stored:
+            self._notify({sid: len(entries) for sid, entries in stored.items()})
+        return sum(len(entries) for entries in stored.values())
+
+    def _mark_uncounted(self, ids):
+        with self._uncounted_lock:
+            self._uncounted.update(ids)
+
+    def append(self, session_id, entry, set_fields=None):
+        """Synchronously store a single event, optionally setting submission fields."""
+        doc = self._document(session_id, entry)
+        try:
+            self.collection.insert_one(doc)
+        except DuplicateKeyError:
+            return False
+        self.submissions.bulk_write([self._counter_update(session_id, [doc], set_fields)])
+        self._notify({session_id: 1})
+        return True
+
+    def for_session(self, submission, limit=None):
+        """Events for a submission in time order, legacy embedded logs first."""
+        cursor = self.collection.find({"session_id": submission.get("session_id")}, {"_id": 0, "session_id": 0}).sort("timestamp", ASCENDING)
+        if limit:
+            cursor = cursor.limit(limit)
+        return legacy_logs(submission) + list(cursor)
+
+    def for_sessions(self, session_ids):
+        """Group events for several sessions with a single query."""
+        grouped = {session_id: [] for session_id in session_ids}
+        cursor = self.collection.find({"session_id": {"$in": list(session_ids)}}, {"_id": 0}).sort([("session_id", ASCENDING), ("timestamp", ASCENDING)])
+        for event in cursor:
+            grouped[event.pop("session_id")].append(event)
+        return grouped
+
+    def delete_sessions(self, session_ids):
+        return self.collection.delete_many({"session_id": {"$in": list(session_ids)}}).deleted_count
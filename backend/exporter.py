@@ -0,0 +1,91 @@
+# backend/exporter.py
+import csv
+import zlib
+from event_store import legacy_logs, warning_count
+
+CSV_HEADER = ["Session ID", "Student Name", "Student ID", "Exam Name", "Start Time", "End Time", "Warning Count", "Log Details"]
+
+
+class _LineBuffer:
+    """Minimal file-like sink so csv.writer output can be yielded row by row."""
+
+    def __init__(self):
+        self.parts = []
+
+    def write(self, value):
+        self.parts.append(value)
+
+    def drain(self):
+        data = "".join(self.parts)
+        self.parts = []
+        return data
+
+
+def iter_log_rows(submissions_collection, tests_collection, users_collection, event_store, query, batch_size=500):
+    """Yield one CSV row per submission matching ``query``.
+
+    Names and proctoring events are joined per cursor batch with ``$in``
+    lookups, so only the data referenced by the current batch is held in memory.
+    """
+    cursor = submissions_collection.find(
+        query, {"_id": 0, "session_id": 1, "student_id": 1, "test_id": 1, "start_time": 1, "end_time": 1, "logs": 1, "counters": 1}
+    ).batch_size(batch_size)
+    test_names = {}
+    batch = []
+    for sub in cursor:
+        batch.append(sub)
+        if len(batch) >= batch_size:
+            yield from _rows_for_batch(batch, tests_collection, users_collection, event_store, test_names)
+            batch = []
+    if batch:
+        yield from _rows_for_batch(batch, tests_collection, users_collection, event_store, test_names)
+
+
+def _rows_for_batch(batch, tests_collection, users_collection, event_store, test_names):
+    missing_tests = list({sub.get("test_id") for sub in batch} - test_names.keys())
+    if missing_tests:
+        for test in tests_collection.find({"test_id": {"$in": missing_tests}}, {"_id": 0, "test_id": 1, "name": 1}):
+            test_names[test["test_id"]] = test.get("name", "N/A")
+    student_ids = list({sub.get("student_id") for sub in batch})
+    student_names = {u["user_id"]: u.get("full_name", "N/A") for u in users_collection.find({"user_id": {"$in": student_ids}}, {"_id": 0, "user_id": 1, "full_name": 1})}
+    events = event_store.for_sessions([sub.get("session_id") for sub in batch])
+    for sub in batch:
+        exam_name = test_names.get(sub.get("test_id"))
+        student_name = student_names.get(sub.get("student_id"))
+        if exam_name is None or student_name is None:
+            continue
+        yield [
+            sub.get("session_id", ""), student_name, sub.get("student_id", ""), exam_name,
+            sub.get("start_time", ""), sub.get("end_time", ""), warning_count(sub),
+            "; ".join(f"{log.get('message', '')}" for log in legacy_logs(sub) + events.get(sub.get("session_id"), []))
+        ]
+
+
+def stream_csv(rows, compress=False, flush_every=200):
+    """Encode ``rows`` as CSV chunks, optionally gzip-compressed.
+
+    The header is emitted before the first row is fetched so clients receive
+    bytes immediately; afterwards output is flushed every ``flush_every`` rows.
+    """
+    buffer = _LineBuffer()
+    writer = csv.writer(buffer)
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+
+    def encode(text):
+        data = text.encode("utf-8")
+        return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH) if compressor else data
+
+    writer.writerow(CSV_HEADER)
+    yield encode(buffer.drain())
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= flush_every:
+            yield encode(buffer.drain())
+            pending = 0
+    tail = buffer.drain()
+    if compressor:
+        yield compressor.compress(tail.encode("utf-8")) + compressor.flush()
+    elif tail:
+        yield tail.encode("utf-8")
@@ -0,0 +1,163 @@
+# backend/grading.py
+import datetime
+import hashlib
+import json
+import threading
+from pymongo import UpdateOne
+
+
+class AnswerKey:
+    """Compiled answer key for a single test.
+
+    Questions are addressed by their position in the test; the question text is
+    kept as a fallback for submissions whose answers are not in test order.
+    """
+    __slots__ = ("test_id", "questions", "index_by_text", "fingerprint")
+
+    def __init__(self, test_id, questions):
+        self.test_id = test_id
+        self.questions = questions
+        self.index_by_text = {}
+        for idx, (text, _q_type, _answer) in enumerate(questions):
+            self.index_by_text.setdefault(text, idx)
+        digest = hashlib.sha1(json.dumps(questions, sort_keys=True, default=str).encode("utf-8"))
+        self.fingerprint = digest.hexdigest()[:16]
+
+    def lookup(self, position, q_text):
+        if position < len(self.questions) and self.questions[position][0] == q_text:
+            return self.questions[position]
+        idx = self.index_by_text.get(q_text)
+        return self.questions[idx] if idx is not None else None
+
+
+def compile_answer_key(test):
+    questions = tuple(
+        (q.get("text"), q.get("type", "subjective"), q.get("answer") if q.get("type") == "mcq" else None)
+        for q in test.get("questions", [])
+    )
+    return AnswerKey(test.get("test_id"), questions)
+
+
+def format_score(score, mcq_count):
+    return f"{score}/{mcq_count}" if mcq_count > 0 else "N/A"
+
+
+def grade_answers(key, answers):
+    """Grade a list of submitted answers against a compiled key."""
+    score, mcq_count, graded_answers = 0, 0, []
+    for position, student_answer in enumerate(answers or []):
+        student_answer = student_answer or {}  # autosaved, still-active sessions can have gaps
+        q_text = student_answer.get("question_text")
+        s_answer = student_answer.get("answer")
+        question = key.lookup(position, q_text)
+        q_type = question[1] if question else "subjective"
+        status, correct_answer = "pending", None
+        if q_type == "mcq":
+            mcq_count += 1
+            correct_answer = question[2]
+            if s_answer == correct_answer:
+                score += 1
+                status = "correct"
+            else:
+                status = "incorrect"
+        graded_answers.append({
+            "question_text": q_text,
+            "answer": s_answer,
+            "type": q_type,
+            "status": status,
+            "correct_answer": correct_answer if status == "incorrect" else None
+        })
+    return {"score": score, "mcq_count": mcq_count, "score_str": format_score(score, mcq_count), "answers": graded_answers}
+
+
+class AnswerKeyCache:
+    """Process-wide cache of compiled answer keys, keyed by test_id."""
+
+    def __init__(self):
+        self._keys = {}
+        self._lock = threading.Lock()
+
+    def get(self, test):
+        test_id = test.get("test_id")
+        key = self._keys.get(test_id)
+        if key is None:
+            key = compile_answer_key(test)
+            with self._lock:
+                self._keys[test_id] = key
+        return key
+
+    def invalidate(self, test_id):
+        with self._lock:
+            self._keys.pop(test_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._keys.clear()
+
+
+answer_keys = AnswerKeyCache()
+
+
+def build_grade(submission, test):
+    """Materialized grade stored on the submission under ``grade``."""
+    key = answer_keys.get(test)
+    grade = grade_answers(key, submission.get("answers", []))
+    grade["total"] = len(grade["answers"])
+    grade["key"] = key.fingerprint
+    grade["graded_at"] = datetime.datetime.utcnow()
+    return grade
+
+
+def is_current(grade, test):
+    return bool(grade) and grade.get("key") == answer_keys.get(test).fingerprint
+
+
+def ensure_grades(collection, submissions, tests_by_id):
+    """Return {session_id: grade} for completed submissions.
+
+    Stored grades are reused as-is; missing or stale ones (graded against an
+    older answer key) are recomputed and written back in one bulk write.
+    """
+    grades, updates = {}, []
+    for sub in submissions:
+        test = tests_by_id.get(sub.get("test_id"))
+        if test is None:
+            continue
+        grade = sub.get("grade")
+        if not is_current(grade, test):
+            grade = build_grade(sub, test)
+            updates.append(UpdateOne({"session_id": sub.get("session_id")}, {"$set": {"grade": grade}}))
+        grades[sub.get("session_id")] = grade
+    if updates:
+        collection.bulk_write(updates, ordered=False)
+    return grades
+
+
+def ensure_grade(collection, submission, test):
+    return ensure_grades(collection, [submission], {test.get("test_id"): test}).get(submission.get("session_id"))
+
+
+def regrade_test(collection, test, batch_size=500, on_batch=None):
+    """Recompute stored grades for every completed submission of a test whose
+    grade predates the current answer key. Returns the number regraded.
+
+    ``on_batch(processed)`` runs after each bulk write (progress, throttling)."""
+    answer_keys.invalidate(test.get("test_id"))
+    fingerprint = answer_keys.get(test).fingerprint
+    query = {"test_id": test.get("test_id"), "status": "completed", "grade.key": {"$ne": fingerprint}}
+    cursor = collection.find(query, {"session_id": 1, "test_id": 1, "answers": 1}).batch_size(batch_size)
+    regraded, processed, updates = 0, 0, []
+    for sub in cursor:
+        updates.append(UpdateOne({"session_id": sub["session_id"]}, {"$set": {"grade": build_grade(sub, test)}}))
+        if len(updates) >= batch_size:
+            regraded += collection.bulk_write(updates, ordered=False).modified_count
+            processed += len(updates)
+            updates = []
+            if on_batch:
+                on_batch(processed)
+    if updates:
+        regraded += collection.bulk_write(updates, ordered=False).modified_count
+        processed += len(updates)
+        if on_batch:
+            on_batch(processed)
+    return regraded
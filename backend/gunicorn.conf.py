@@ -0,0 +1,56 @@
+# backend/gunicorn.conf.py
+"""Production serving config: ``gunicorn -c gunicorn.conf.py app:app`` (from backend/).
+
+Worker model
+------------
+The default is ``gthread``: a few processes, each with a pool of request
+threads. Request handlers spend most of their time waiting on Mongo, and a
+process keeps its in-memory state (test/user caches, the event buffer, the
+face-detection pool) shared across its threads, so threads are cheaper than
+more processes. Each open admin live feed (SSE) holds one thread for as long
+as it is connected, so size GUNICORN_THREADS with that in mind.
+
+``GUNICORN_WORKER_CLASS=gevent`` (requires gevent) serves many more
+concurrent connections per process; gunicorn patches the stdlib before the
+app is imported, so pymongo and the background flush threads cooperate.
+Face detection still runs on real threads in OpenCV and is bounded by
+FACE_DETECT_WORKERS either way.
+
+The app is loaded in each worker (no preload) because a MongoClient must not
+be shared across fork. Each worker's Mongo pool (MONGO_MAX_POOL_SIZE) should
+be at least GUNICORN_THREADS plus a few connections for the background
+flushers; with gevent use roughly GUNICORN_WORKER_CONNECTIONS / 4. Across
+all workers the total must stay within the server's connection limit.
+
+On SIGTERM, workers stop accepting requests, finish in-flight ones within
+``graceful_timeout`` and then run ``app.shutdown()``, which waits for queued
+face checks and flushes buffered proctoring events to Mongo.
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+workers = int(os.environ.get("GUNICORN_WORKERS", min(multiprocessing.cpu_count(), 4)))
+threads = int(os.environ.get("GUNICORN_THREADS", 32))
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", 1000))
+backlog = int(os.environ.get("GUNICORN_BACKLOG", 2048))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+# SSE connections stay open; timeout only applies to a worker that stops heartbeating.
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 60))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+# Recycle workers occasionally to bound memory growth; jitter avoids restarting them all at once.
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 0))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 500))
+preload_app = False
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG") or None
+errorlog = "-"
+loglevel = os.environ.get("LOG_LEVEL", "info").lower()
+
+
+def worker_exit(server, worker):
+    # Imported lazily: the module is already loaded in the worker, and this must not import it in the arbiter.
+    import sys
+    app_module = sys.modules.get("app")
+    if app_module is not None:
+        app_module.shutdown()
@@ -0,0 +1,116 @@
+# backend/http_cache.py
+import gzip
+import hashlib
+import mimetypes
+import os
+from flask import Response, request, send_file
+from werkzeug.exceptions import NotFound
+from werkzeug.utils import safe_join
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (".css", ".js", ".html", ".svg", ".json", ".txt", ".map")
+MIN_COMPRESS_SIZE = 512
+
+
+def precompress_folder(folder, min_size=MIN_COMPRESS_SIZE):
+    """Write ``.gz`` (and ``.br`` when brotli is installed) next to every text asset.
+
+    Variants newer than their source are left alone, so this is cheap to run
+    on every start. Returns the number of files written.
+    """
+    written = 0
+    for root, _dirs, files in os.walk(folder):
+        for name in files:
+            if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            source = os.path.join(root, name)
+            if os.path.getsize(source) < min_size:
+                continue
+            encoders = [(".gz", lambda data: gzip.compress(data, 9, mtime=0))]
+            if brotli is not None:
+                encoders.append((".br", lambda data: brotli.compress(data, quality=11)))
+            data = None
+            for suffix, encode in encoders:
+                target = source + suffix
+                if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(source):
+                    continue
+                if data is None:
+                    with open(source, "rb") as f:
+                        data = f.read()
+                with open(target + ".tmp", "wb") as f:
+                    f.write(encode(data))
+                os.replace(target + ".tmp", target)
+                written += 1
+    return written
+
+
+def accepted_encodings():
+    """Encodings the client accepts, ignoring those explicitly refused with q=0."""
+    accepted = set()
+    for part in request.headers.get("Accept-Encoding", "").split(","):
+        token, _, params = part.strip().partition(";")
+        if token and params.replace(" ", "") not in ("q=0", "q=0.0"):
+            accepted.add(token.lower())
+    return accepted
+
+
+class Payload:
+    """A response body prepared once: strong ETag plus pre-compressed variants."""
+    __slots__ = ("body", "etag", "variants", "mimetype")
+
+    def __init__(self, body, mimetype):
+        self.body = body
+        self.mimetype = mimetype
+        self.etag = hashlib.sha1(body).hexdigest()
+        self.variants = {}
+        if len(body) >= MIN_COMPRESS_SIZE:
+            self.variants["gzip"] = gzip.compress(body, 6, mtime=0)
+            if brotli is not None:
+                self.variants["br"] = brotli.compress(body, quality=9)
+
+
+def payload_response(payload, max_age=0, private=False):
+    """Serve a Payload with ETag/304 handling and the best accepted encoding."""
+    response = Response(mimetype=payload.mimetype)
+    response.set_etag(payload.etag)
+    response.vary.add("Accept-Encoding")
+    response.cache_control.max_age = max_age
+    if private:
+        response.cache_control.private = True
+    else:
+        response.cache_control.public = True
+    if request.if_none_match.contains(payload.etag):
+        response.status_code = 304
+        return response
+    accepted = accepted_encodings()
+    encoding = next((enc for enc in ("br", "gzip") if enc in payload.variants and enc in accepted), None)
+    if encoding:
+        response.set_data(payload.variants[encoding])
+        response.headers["Content-Encoding"] = encoding
+    else:
+        response.set_data(payload.body)
+    return response
+
+
+def send_static_precompressed(folder, filename, max_age):
+    """Serve a static file, preferring a ``.br``/``.gz`` sibling the client accepts."""
+    path = safe_join(folder, filename)
+    if path is None or not os.path.isfile(path):
+        raise NotFound()
+    mimetype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    accepted = accepted_encodings()
+    for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+        variant = path + suffix
+        if encoding in accepted and os.path.isfile(variant) and os.path.getmtime(variant) >= os.path.getmtime(path):
+            response = send_file(variant, mimetype=mimetype, conditional=True, max_age=max_age)
+            response.headers["Content-Encoding"] = encoding
+            break
+    else:
+        response = send_file(path, mimetype=mimetype, conditional=True, max_age=max_age)
+    response.vary.add("Accept-Encoding")
+    response.cache_control.public = True
+    return response
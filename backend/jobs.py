@@ -0,0 +1,150 @@
+# backend/jobs.py
+import datetime
+import logging
+import os
+import queue
+import socket
+import threading
+import time
+import uuid
+
+log = logging.getLogger("secure_exam.jobs")
+
+JOBS_COLLECTION = "jobs"
+
+
+class JobContext:
+    """Handed to a job function: progress reporting and throttling between chunks."""
+
+    def __init__(self, runner, job_id):
+        self._runner = runner
+        self.job_id = job_id
+        self.done = 0
+        self.total = None
+        self._last_saved = 0.0
+
+    def progress(self, done=None, total=None, advance=0):
+        """Update progress; persisted at most once per ``progress_interval`` seconds."""
+        if total is not None:
+            self.total = total
+        self.done = done if done is not None else self.done + advance
+        if time.monotonic() - self._last_saved >= self._runner.progress_interval:
+            self._save()
+
+    def _save(self):
+        self._last_saved = time.monotonic()
+        self._runner.collection.update_one({"_id": self.job_id}, {"$set": {
+            "progress": {"done": self.done, "total": self.total}, "updated_at": datetime.datetime.utcnow()}})
+
+    def pause(self):
+        """Yield to request traffic between chunks."""
+        time.sleep(self._runner.throttle_seconds)
+
+
+class JobRunner:
+    """In-process queue for heavy admin work, with job records persisted in Mongo.
+
+    ``submit`` stores a queued record and returns its id immediately; a small
+    pool of worker threads runs the registered function for the job's kind,
+    which processes its work in chunks, reports progress through the context
+    and pauses between chunks so live exam traffic keeps priority. The record
+    (status, progress, result or error) can be polled from any app process.
+    Jobs interrupted by a restart are marked failed on the next start.
+    """
+
+    def __init__(self, db, workers=1, chunk_size=500, throttle_seconds=0.05, progress_interval=1.0, stale_after=300):
+        self.collection = db[JOBS_COLLECTION]
+        self.chunk_size = chunk_size
+        self.throttle_seconds = throttle_seconds
+        self.progress_interval = progress_interval
+        self.stale_after = stale_after
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._handlers = {}
+        self._queue = queue.Queue()
+        self._threads = []
+        for i in range(max(1, workers)):
+            thread = threading.Thread(target=self._work, name=f"job-runner-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        self._heartbeat_stop = threading.Event()
+        threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True).start()
+
+    def register(self, kind, fn):
+        """``fn(ctx, **params)`` returns a JSON-serializable result dict."""
+        self._handlers[kind] = fn
+
+    def submit(self, kind, params=None, created_by=None):
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job_id = uuid.uuid4().hex
+        now = datetime.datetime.utcnow()
+        self.collection.insert_one({
+            "_id": job_id, "kind": kind, "params": params or {}, "status": "queued", "owner": self.owner,
+            "created_by": created_by, "created_at": now, "updated_at": now, "progress": {"done": 0, "total": None}})
+        self._queue.put(job_id)
+        return job_id
+
+    def get(self, job_id):
+        job = self.collection.find_one({"_id": job_id})
+        if job:
+            job["job_id"] = job.pop("_id")
+        return job
+
+    def recent(self, limit=50):
+        jobs = list(self.collection.find({}, {"params": 0}).sort("created_at", -1).limit(limit))
+        for job in jobs:
+            job["job_id"] = job.pop("_id")
+        return jobs
+
+    def recover(self):
+        """Fail jobs whose owning process stopped heartbeating (e.g. killed mid-run)."""
+        cutoff = datetime.datetime.utcnow() - datetime.timedelta(seconds=self.stale_after)
+        result = self.collection.update_many(
+            {"status": {"$in": ["queued", "running"]}, "updated_at": {"$lt": cutoff}},
+            {"$set": {"status": "failed", "error": "Interrupted by a server restart; run it again.", "finished_at": datetime.datetime.utcnow()}})
+        return result.modified_count
+
+    def _heartbeat(self):
+        # Keeps this process's queued/running jobs from looking stale to recover() in other processes.
+        while not self._heartbeat_stop.wait(self.stale_after / 3):
+            try:
+                self.collection.update_many({"owner": self.owner, "status": {"$in": ["queued", "running"]}},
+                                            {"$set": {"updated_at": datetime.datetime.utcnow()}})
+            except Exception as e:
+                log.error(f"Job heartbeat failed: {e}")
+
+    def _work(self):
+        while True:
+            job_id = self._queue.get()
+            if job_id is None:
+                return
+            self._run(job_id)
+
+    def _run(self, job_id):
+        job = self.collection.find_one_and_update(
+            {"_id": job_id, "status": "queued"},
+            {"$set": {"status": "running", "started_at": datetime.datetime.utcnow(), "updated_at": datetime.datetime.utcnow()}})
+        if not job:
+            return
+        ctx = JobContext(self, job_id)
+        started = time.perf_counter()
+        try:
+            result = self._handlers[job["kind"]](ctx, **job["params"])
+        except Exception as e:
+            log.error(f"Job {job_id} ({job['kind']}) failed: {e}")
+            update = {"status": "failed", "error": str(e)}
+        else:
+            update = {"status": "succeeded", "result": result or {}}
+            log.info(f"Job {job_id} ({job['kind']}) finished in {time.perf_counter() - started:.1f}s.")
+        now = datetime.datetime.utcnow()
+        self.collection.update_one({"_id": job_id}, {"$set": {
+            **update, "progress": {"done": ctx.done, "total": ctx.total}, "finished_at": now, "updated_at": now}})
+
+    def shutdown(self, timeout=30):
+        """Let running jobs finish (up to ``timeout``); jobs still queued are failed by recover() later."""
+        self._heartbeat_stop.set()
+        for _ in self._threads:
+            self._queue.put(None)
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
@@ -0,0 +1,63 @@
+# backend/json_provider.py
+import datetime
+import json
+from bson import ObjectId
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib encoder is used without it
+    orjson = None
+
+# Datetimes go through bson_default as well so the output ("2024-05-01T10:00:00.000Z")
+# is the same with and without orjson.
+ORJSON_OPTIONS = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY) if orjson else 0
+
+
+def isoformat_utc(value):
+    """ISO 8601 in UTC with a "Z" suffix; naive datetimes are taken to be UTC, as pymongo returns them."""
+    if value.tzinfo is not None:
+        value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return value.isoformat(timespec="milliseconds") + "Z"
+
+
+def bson_default(obj):
+    if isinstance(obj, datetime.datetime):
+        return isoformat_utc(obj)
+    if isinstance(obj, datetime.date):
+        return obj.isoformat()
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
+
+
+def dumps_bytes(obj):
+    """Encode Mongo documents (ObjectId, datetime) straight to UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=bson_default, option=ORJSON_OPTIONS)
+    return json.dumps(obj, default=bson_default).encode("utf-8")
+
+
+def dumps(obj):
+    return dumps_bytes(obj).decode("utf-8")
+
+
+class BSONJSONProvider(DefaultJSONProvider):
+    """App-wide JSON provider that encodes ObjectId and datetime natively.
+
+    Handlers can pass Mongo documents to ``jsonify`` as they are. With orjson
+    installed, responses are encoded by it in a single pass to bytes.
+    """
+    default = staticmethod(bson_default)
+    sort_keys = False
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.dumps(obj, default=bson_default, option=ORJSON_OPTIONS).decode("utf-8")
+        return super().dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if orjson is None or self._app.debug:
+            return super().response(*args, **kwargs)  # the stdlib path pretty-prints in debug
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj, default=bson_default, option=ORJSON_OPTIONS), mimetype=self.mimetype)
@@ -0,0 +1,116 @@
+# backend/live_feed.py
+import queue
+import threading
+from json_provider import dumps
+
+
+class Subscription:
+    def __init__(self, max_queue):
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.overflowed = False
+
+
+class Broker:
+    """In-process pub/sub for the proctor live feed.
+
+    Each subscriber gets a bounded queue; a subscriber that falls behind is
+    marked as overflowed and told to resync instead of blocking publishers.
+    """
+
+    def __init__(self, max_queue=256):
+        self.max_queue = max_queue
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        sub = Subscription(self.max_queue)
+        with self._lock:
+            self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    @property
+    def has_subscribers(self):
+        return bool(self._subscribers)
+
+    def publish(self, event, data):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            try:
+                sub.queue.put_nowait((event, data))
+            except queue.Full:
+                sub.overflowed = True
+
+
+def format_sse(event, data):
+    return f"event: {event}\ndata: {dumps(data)}\n\n"
+
+
+def sse_stream(broker, sub, heartbeat_seconds=15):
+    """Yield server-sent events for ``sub`` until the client disconnects."""
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            if sub.overflowed:
+                sub.overflowed = False
+                with sub.queue.mutex:
+                    sub.queue.queue.clear()
+                yield format_sse("resync", {})
+            try:
+                event, data = sub.queue.get(timeout=heartbeat_seconds)
+            except queue.Empty:
+                yield ": keep-alive\n\n"
+                continue
+            yield format_sse(event, data)
+    finally:
+        broker.unsubscribe(sub)
+
+
+class ChangeStreamRelay:
+    """Feed the broker from Mongo change streams instead of local publishes.
+
+    With several app processes each one only sees its own requests; watching
+    the collections lets every process push every change to its proctors.
+    Requires a replica set. ``describe_session`` turns a submission into the
+    payload used by ``session_started``.
+    """
+
+    def __init__(self, broker, submissions_collection, events_collection, describe_session):
+        self.broker = broker
+        self.submissions = submissions_collection
+        self.events = events_collection
+        self.describe_session = describe_session
+        self._threads = []
+
+    def start(self):
+        for target in (self._watch_submissions, self._watch_events):
+            thread = threading.Thread(target=target, name=f"live-feed-{target.__name__}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _watch_submissions(self):
+        pipeline = [{"$match": {"operationType": {"$in": ["insert", "update"]}}}]
+        with self.submissions.watch(pipeline, full_document="updateLookup") as stream:
+            for change in stream:
+                doc = change.get("fullDocument") or {}
+                if change["operationType"] == "insert":
+                    if doc.get("status") == "active":
+                        self.broker.publish("session_started", self.describe_session(doc))
+                    continue
+                updated = change.get("updateDescription", {}).get("updatedFields", {})
+                if updated.get("status") == "active":
+                    self.broker.publish("session_started", self.describe_session(doc))
+                elif updated.get("status") == "completed":
+                    self.broker.publish("session_submitted", {"id": doc.get("session_id"), "testId": doc.get("test_id")})
+                if updated.get("exam_locked"):
+                    self.broker.publish("session_locked", {"id": doc.get("session_id"), "testId": doc.get("test_id"), "reason": doc.get("lock_reason")})
+
+    def _watch_events(self):
+        with self.events.watch([{"$match": {"operationType": "insert"}}]) as stream:
+            for change in stream:
+                doc = change.get("fullDocument") or {}
+                self.broker.publish("alerts", {"counts": {doc.get("session_id"): 1}})
@@ -0,0 +1,89 @@
+# backend/live_stats.py
+from pymongo import UpdateOne
+
+GLOBAL_ID = "global"
+
+
+def _test_doc_id(test_id):
+    return f"test:{test_id}"
+
+
+class LiveStats:
+    """Running totals behind the admin summary dashboard.
+
+    One ``global`` document plus one document per test hold the number of
+    active sessions and pending alerts (events recorded against active
+    sessions). Every change is an atomic ``$inc``, so reading the summary is a
+    primary-key lookup no matter how many candidates are sitting an exam.
+    """
+
+    def __init__(self, db):
+        self.collection = db.live_stats
+
+    def _apply(self, deltas):
+        """``deltas`` maps test_id -> (active_sessions, pending_alerts) increments."""
+        ops, total_active, total_alerts = [], 0, 0
+        for test_id, (active, alerts) in deltas.items():
+            if not active and not alerts:
+                continue
+            total_active += active
+            total_alerts += alerts
+            ops.append(UpdateOne({"_id": _test_doc_id(test_id)},
+                                 {"$inc": {"active_sessions": active, "pending_alerts": alerts}, "$set": {"test_id": test_id}},
+                                 upsert=True))
+        if not ops:
+            return
+        ops.append(UpdateOne({"_id": GLOBAL_ID}, {"$inc": {"active_sessions": total_active, "pending_alerts": total_alerts}}, upsert=True))
+        self.collection.bulk_write(ops, ordered=False)
+
+    def session_started(self, test_id):
+        self._apply({test_id: (1, 0)})
+
+    def session_finished(self, test_id, alerts):
+        self._apply({test_id: (-1, -alerts)})
+
+    def sessions_removed(self, submissions):
+        """Back out active sessions that are being deleted outright."""
+        deltas = {}
+        for sub in submissions:
+            active, alerts = deltas.get(sub.get("test_id"), (0, 0))
+            deltas[sub.get("test_id")] = (active - 1, alerts - (sub.get("counters") or {}).get("events", 0))
+        self._apply(deltas)
+
+    def alerts_added(self, alerts_by_test):
+        self._apply({test_id: (0, alerts) for test_id, alerts in alerts_by_test.items()})
+
+    def summary(self, test_id=None):
+        doc = self.collection.find_one({"_id": _test_doc_id(test_id) if test_id else GLOBAL_ID}) or {}
+        return {"activeSessions": max(doc.get("active_sessions", 0), 0), "pendingAlerts": max(doc.get("pending_alerts", 0), 0)}
+
+    def breakdown(self):
+        docs = self.collection.find({"_id": {"$ne": GLOBAL_ID}, "active_sessions": {"$gt": 0}}, {"_id": 0})
+        return [{"testId": d["test_id"], "activeSessions": d.get("active_sessions", 0), "pendingAlerts": max(d.get("pending_alerts", 0), 0)} for d in docs]
+
+    def is_initialized(self):
+        return self.collection.count_documents({"_id": GLOBAL_ID}, limit=1) > 0
+
+    def rebuild(self, submissions_collection):
+        """Recompute every counter from the active submissions.
+
+        Used to seed an empty stats collection and to correct drift, e.g. after
+        a crash between a submission write and its counter update.
+        """
+        pipeline = [
+            {"$match": {"status": "active"}},
+            {"$group": {"_id": "$test_id", "active_sessions": {"$sum": 1},
+                        "pending_alerts": {"$sum": {"$add": [{"$ifNull": ["$counters.events", 0]}, {"$size": {"$ifNull": ["$logs", []]}}]}}}}
+        ]
+        rows = list(submissions_collection.aggregate(pipeline))
+        ops = []
+        self.collection.update_many({"_id": {"$ne": GLOBAL_ID}}, {"$set": {"active_sessions": 0, "pending_alerts": 0}})
+        for row in rows:
+            ops.append(UpdateOne({"_id": _test_doc_id(row["_id"])},
+                                 {"$set": {"test_id": row["_id"], "active_sessions": row["active_sessions"], "pending_alerts": row["pending_alerts"]}},
+                                 upsert=True))
+        ops.append(UpdateOne({"_id": GLOBAL_ID},
+                             {"$set": {"active_sessions": sum(r["active_sessions"] for r in rows),
+                                       "pending_alerts": sum(r["pending_alerts"] for r in rows)}},
+                             upsert=True))
+        self.collection.bulk_write(ops, ordered=False)
@@ -0,0 +1,109 @@
+# backend/media_store.py
+import hashlib
+import io
+import os
+import re
+import tempfile
+import cv2
+import numpy as np
+
+DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class MediaStore:
+    """Content-addressed image storage on local disk.
+
+    Files live at ``<root>/<aa>/<bb>/<sha256>.jpg`` so identical uploads (e.g.
+    client retries) share one file, and names can never collide. Thumbnails
+    are stored next to the original as ``<sha256>.thumb.jpg``.
+    """
+
+    def __init__(self, root, thumb_width=160, chunk_size=64 * 1024):
+        self.root = root
+        self.thumb_width = thumb_width
+        self.chunk_size = chunk_size
+        self._tmp_dir = os.path.join(root, "tmp")
+        os.makedirs(self._tmp_dir, exist_ok=True)
+
+    def path_for(self, digest, thumb=False):
+        if not DIGEST_RE.match(digest or ""):
+            raise ValueError("Invalid media digest")
+        return os.path.join(self.root, digest[:2], digest[2:4], f"{digest}.thumb.jpg" if thumb else f"{digest}.jpg")
+
+    def exists(self, digest):
+        return os.path.exists(self.path_for(digest))
+
+    def save_stream(self, stream, max_bytes):
+        """Copy ``stream`` to disk in chunks while hashing it; returns (digest, size)."""
+        hasher, size = hashlib.sha256(), 0
+        fd, tmp_path = tempfile.mkstemp(dir=self._tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                while True:
+                    chunk = stream.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise UploadTooLarge()
+                    hasher.update(chunk)
+                    tmp.write(chunk)
+            digest = hasher.hexdigest()
+            final_path = self.path_for(digest)
+            if os.path.exists(final_path):
+                os.unlink(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(final_path), exist_ok=True)
+                os.replace(tmp_path, final_path)
+            return digest, size
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def save_bytes(self, data, max_bytes):
+        return self.save_stream(io.BytesIO(data), max_bytes)
+
+    def ensure_thumbnail(self, digest):
+        """Create the thumbnail if it is missing; returns its path."""
+        thumb_path = self.path_for(digest, thumb=True)
+        if os.path.exists(thumb_path):
+            return thumb_path
+        image = cv2.imread(self.path_for(digest), cv2.IMREAD_REDUCED_COLOR_2)
+        if image is None:
+            raise ValueError("Stored media is not a decodable image")
+        height, width = image.shape[:2]
+        if width > self.thumb_width:
+            image = cv2.resize(image, (self.thumb_width, max(1, height * self.thumb_width // width)), interpolation=cv2.INTER_AREA)
+        ok, encoded = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 80])
+        if not ok:
+            raise ValueError("Could not encode thumbnail")
+        fd, tmp_path = tempfile.mkstemp(dir=self._tmp_dir)
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(np.asarray(encoded).tobytes())
+        os.replace(tmp_path, thumb_path)
+        return thumb_path
+
+    def iter_stored(self, older_than=None):
+        """Yield the digest of every stored original, skipping files modified after ``older_than`` (epoch seconds)."""
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            if dirpath == self.root:
+                dirnames[:] = [d for d in dirnames if os.path.join(dirpath, d) != self._tmp_dir]
+            for filename in filenames:
+                digest, ext = os.path.splitext(filename)
+                if ext != ".jpg" or not DIGEST_RE.match(digest):
+                    continue
+                if older_than is not None and os.path.getmtime(os.path.join(dirpath, filename)) > older_than:
+                    continue
+                yield digest
+
+    def delete(self, digest):
+        for thumb in (False, True):
+            try:
+                os.unlink(self.path_for(digest, thumb=thumb))
+            except FileNotFoundError:
+                pass
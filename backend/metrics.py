@@ -0,0 +1,197 @@
+# backend/metrics.py
+import collections
+import json
+import logging
+import threading
+import time
+from pymongo import monitoring
+
+log = logging.getLogger("secure_exam.metrics")
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Commands whose "filter" is worth logging for slow or unfiltered queries.
+FILTERED_COMMANDS = {"find": "filter", "count": "query", "delete": "deletes", "update": "updates", "aggregate": "pipeline", "distinct": "query"}
+
+
+def _documents_returned(reply):
+    cursor = reply.get("cursor")
+    if cursor:
+        return len(cursor.get("firstBatch", cursor.get("nextBatch", ())))
+    if "values" in reply:  # distinct
+        return len(reply["values"])
+    return reply.get("n", 0) if isinstance(reply.get("n"), int) else 0
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _Histogram:
+    __slots__ = ("buckets", "count", "total", "max", "recent")
+
+    def __init__(self):
+        self.buckets = [0] * len(DURATION_BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = collections.deque(maxlen=512)  # for percentiles in the JSON view
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+        for i, bound in enumerate(DURATION_BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+
+    def percentile(self, fraction):
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class Metrics(monitoring.CommandListener):
+    """Per-route request timings plus the Mongo commands each request issued.
+
+    Register the instance as a pymongo event listener and call ``start_request``
+    / ``end_request`` around each request. Commands run on the calling thread,
+    so they are attributed to the request via a thread-local; commands from
+    background threads (event flushes, face checks) only count towards the
+    per-command totals. Commands slower than ``slow_query_ms`` are logged, and
+    those plus unfiltered finds are kept in a short ring buffer.
+    """
+
+    def __init__(self, slow_query_ms=100, slow_log_size=100):
+        self.slow_query_seconds = slow_query_ms / 1000.0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._pending = {}  # (connection, request_id) -> (command name, collection, filter)
+        self.routes = collections.defaultdict(lambda: {"latency": _Histogram(), "statuses": collections.Counter(),
+                                                       "queries": 0, "db_seconds": 0.0, "documents": 0})
+        self.commands = collections.defaultdict(lambda: {"count": 0, "failures": 0, "seconds": 0.0, "documents": 0})
+        self.slow_queries = collections.deque(maxlen=slow_log_size)
+        self.slow_total = 0
+
+    # --- pymongo CommandListener ---
+    def started(self, event):
+        name = event.command_name
+        collection = event.command.get("collection" if name == "getMore" else name)
+        collection = collection if isinstance(collection, str) else None
+        criteria = event.command.get(FILTERED_COMMANDS[name]) if name in FILTERED_COMMANDS else None
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (name, collection, criteria)
+
+    def succeeded(self, event):
+        self._finish(event, _documents_returned(event.reply), failed=False)
+
+    def failed(self, event):
+        self._finish(event, 0, failed=True)
+
+    def _finish(self, event, documents, failed):
+        seconds = event.duration_micros / 1e6
+        with self._lock:
+            name, collection, criteria = self._pending.pop((event.connection_id, event.request_id), (event.command_name, None, None))
+            stats = self.commands[(name, collection or "")]
+            stats["count"] += 1
+            stats["failures"] += failed
+            stats["seconds"] += seconds
+            stats["documents"] += documents
+        current = getattr(self._local, "request", None)
+        if current is not None:
+            current["queries"] += 1
+            current["db_seconds"] += seconds
+            current["documents"] += documents
+        unfiltered = name == "find" and not criteria
+        if seconds >= self.slow_query_seconds or unfiltered:
+            self._record_slow(name, collection, criteria, seconds, documents, unfiltered, current)
+
+    def _record_slow(self, name, collection, criteria, seconds, documents, unfiltered, current):
+        entry = {"at": time.time(), "command": name, "collection": collection, "ms": round(seconds * 1000, 2),
+                 "documents": documents, "filter": json.dumps(criteria, default=str)[:500] if criteria else None,
+                 "unfiltered": unfiltered, "route": current["route"] if current else "(background)"}
+        with self._lock:
+            self.slow_queries.append(entry)
+            self.slow_total += 1
+        if seconds >= self.slow_query_seconds:
+            log.warning("Slow query %.1f ms: %s %s filter=%s docs=%d route=%s", seconds * 1000, name, collection, entry["filter"], documents, entry["route"])
+
+    # --- request hooks ---
+    def start_request(self, route):
+        self._local.request = {"route": route, "started": time.perf_counter(), "queries": 0, "db_seconds": 0.0, "documents": 0}
+
+    def end_request(self, method, status_code):
+        """Record the finished request; returns its stats (for a Server-Timing header) or None."""
+        current = getattr(self._local, "request", None)
+        if current is None:
+            return None
+        self._local.request = None
+        current["seconds"] = time.perf_counter() - current["started"]
+        with self._lock:
+            stats = self.routes[(method, current["route"])]
+            stats["latency"].observe(current["seconds"])
+            stats["statuses"][status_code] += 1
+            stats["queries"] += current["queries"]
+            stats["db_seconds"] += current["db_seconds"]
+            stats["documents"] += current["documents"]
+        return current
+
+    # --- exposition ---
+    def snapshot(self):
+        """JSON view: routes sorted by total time, Mongo commands by total time, recent slow queries."""
+        with self._lock:
+            routes = []
+            for (method, route), stats in self.routes.items():
+                latency, count = stats["latency"], stats["latency"].count
+                routes.append({
+                    "method": method, "route": route, "count": count,
+                    "errors": sum(n for status, n in stats["statuses"].items() if status >= 500),
+                    "avg_ms": round(latency.total / count * 1000, 2), "p50_ms": round(latency.percentile(0.5) * 1000, 2),
+                    "p95_ms": round(latency.percentile(0.95) * 1000, 2), "max_ms": round(latency.max * 1000, 2),
+                    "total_s": round(latency.total, 3), "queries_per_request": round(stats["queries"] / count, 2),
+                    "db_ms_per_request": round(stats["db_seconds"] / count * 1000, 2),
+                    "documents_per_request": round(stats["documents"] / count, 1)})
+            commands = [{"command": name, "collection": collection, **{k: round(v, 4) if isinstance(v, float) else v for k, v in stats.items()}}
+                        for (name, collection), stats in self.commands.items()]
+            slow = list(self.slow_queries)
+        routes.sort(key=lambda r: r["total_s"], reverse=True)
+        commands.sort(key=lambda c: c["seconds"], reverse=True)
+        return {"routes": routes, "mongo": commands, "slow_queries": slow[::-1], "slow_query_total": self.slow_total,
+                "slow_query_ms": self.slow_query_seconds * 1000}
+
+    def prometheus(self):
+        """Prometheus text exposition format."""
+        lines = ["# TYPE http_request_duration_seconds histogram"]
+        with self._lock:
+            routes = [(key, stats["latency"], dict(stats["statuses"]), stats["queries"], stats["db_seconds"]) for key, stats in self.routes.items()]
+            commands = [(key, dict(stats)) for key, stats in self.commands.items()]
+            slow_total = self.slow_total
+            for (method, route), latency, _statuses, _queries, _db in routes:
+                labels = f'method="{_label(method)}",route="{_label(route)}"'
+                cumulative = 0
+                for bound, n in zip(DURATION_BUCKETS, latency.buckets):
+                    cumulative += n
+                    lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {latency.count}')
+                lines.append(f"http_request_duration_seconds_sum{{{labels}}} {latency.total}")
+                lines.append(f"http_request_duration_seconds_count{{{labels}}} {latency.count}")
+        lines.append("# TYPE http_requests_total counter")
+        for (method, route), _latency, statuses, _queries, _db in routes:
+            for status, n in statuses.items():
+                lines.append(f'http_requests_total{{method="{_label(method)}",route="{_label(route)}",status="{status}"}} {n}')
+        lines.append("# TYPE mongo_queries_per_route_total counter")
+        lines.append("# TYPE mongo_seconds_per_route_total counter")
+        for (method, route), _latency, _statuses, queries, db_seconds in routes:
+            labels = f'method="{_label(method)}",route="{_label(route)}"'
+            lines.append(f"mongo_queries_per_route_total{{{labels}}} {queries}")
+            lines.append(f"mongo_seconds_per_route_total{{{labels}}} {db_seconds}")
+        for metric, field in (("mongo_commands_total", "count"), ("mongo_command_failures_total", "failures"),
+                              ("mongo_command_seconds_total", "seconds"), ("mongo_documents_returned_total", "documents")):
+            lines.append(f"# TYPE {metric} counter")
+            for (name, collection), stats in commands:
+                lines.append(f'{metric}{{command="{_label(name)}",collection="{_label(collection)}"}} {stats[field]}')
+        lines.append("# TYPE mongo_slow_queries_total counter")
+        lines.append(f"mongo_slow_queries_total {slow_total}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,94 @@
+# backend/provisioning.py
+import datetime
+import logging
+import threading
+import uuid
+from pymongo import UpdateOne
+from event_store import EMPTY_COUNTERS
+
+log = logging.getLogger("secure_exam.provisioning")
+
+PROVISIONED = "provisioned"
+
+
+def roster_for(test):
+    """Student IDs on the test's explicit ``student_ids`` roster; empty when it has none.
+
+    There is deliberately no "every student" fallback: a test without a roster
+    would otherwise pre-create a session for every student in the system.
+    """
+    return [student_id for student_id in test.get("student_ids") or [] if student_id]
+
+
+def provision_sessions(collection, test_id, student_ids, chunk_size=1000, on_chunk=None):
+    """Pre-create one ``provisioned`` session per student, in unordered bulk upserts.
+
+    The upsert filter is (student_id, test_id), so students who already have a
+    session for the test (provisioned, active or completed) are left alone and
+    re-running is harmless. ``on_chunk(processed)`` runs after each chunk.
+    Returns the number of sessions created.
+    """
+    created, processed, ops = 0, 0, []
+
+    def write():
+        nonlocal created, processed
+        created += collection.bulk_write(ops, ordered=False).upserted_count
+        processed += len(ops)
+        ops.clear()
+        if on_chunk:
+            on_chunk(processed)
+
+    for student_id in student_ids:
+        ops.append(UpdateOne({"student_id": student_id, "test_id": test_id}, {"$setOnInsert": {
+            "session_id": str(uuid.uuid4()), "student_id": student_id, "test_id": test_id, "status": PROVISIONED,
+            "provisioned_at": datetime.datetime.utcnow(), "answers": [], "counters": dict(EMPTY_COUNTERS)}}, upsert=True))
+        if len(ops) >= chunk_size:
+            write()
+    if ops:
+        write()
+    return created
+
+
+class ProvisioningScheduler:
+    """Background thread that hands scheduled tests starting within ``lead_seconds`` to ``on_due(test_id)``.
+
+    Only tests with an explicit ``student_ids`` roster are considered. Each test
+    is claimed once across all processes by stamping ``sessions_provisioned_at``
+    on it with a conditional update.
+    """
+
+    def __init__(self, tests_collection, on_due, lead_seconds=900, interval=60):
+        self.tests = tests_collection
+        self.on_due = on_due
+        self.lead_seconds = lead_seconds
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="session-provisioner", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def due(self, now=None):
+        """Claim and return the IDs of unprovisioned tests starting within the lead time."""
+        now = now or datetime.datetime.utcnow()
+        window = {"$gte": now, "$lte": now + datetime.timedelta(seconds=self.lead_seconds)}
+        claimed = []
+        for test in self.tests.find({"scheduled_datetime": window, "sessions_provisioned_at": {"$exists": False}, "student_ids.0": {"$exists": True}},
+                                   {"_id": 0, "test_id": 1}):
+            result = self.tests.update_one({"test_id": test["test_id"], "sessions_provisioned_at": {"$exists": False}},
+                                           {"$set": {"sessions_provisioned_at": now}})
+            if result.modified_count:
+                claimed.append(test["test_id"])
+        return claimed
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                for test_id in self.due():
+                    self.on_due(test_id)
+            except Exception as e:
+                log.error(f"Session provisioning check failed: {e}")
+
+    def stop(self):
+        self._stop.set()
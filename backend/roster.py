@@ -0,0 +1,164 @@
+# backend/roster.py
+import codecs
+import csv
+import datetime
+import json
+import re
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+STUDENT_ID_RE = re.compile(r"^[A-Za-z0-9._@-]{1,64}$")
+EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+HEADER_ALIASES = {"student_id": "student_id", "user_id": "student_id", "id": "student_id", "full_name": "full_name",
+                  "name": "full_name", "email": "email"}
+MAX_REPORTED_ERRORS = 1000
+
+
+class RosterError(ValueError):
+    """The roster as a whole is unusable (unknown format, missing columns)."""
+
+
+def _lines(stream, chunk_size=64 * 1024):
+    """Decode a binary stream incrementally into lines (BOM tolerant)."""
+    decoder, pending = codecs.getincrementaldecoder("utf-8-sig")(errors="replace"), ""
+    while True:
+        chunk = stream.read(chunk_size)
+        pending += decoder.decode(chunk, final=not chunk)
+        lines = pending.splitlines(keepends=True)
+        pending = lines.pop() if lines and chunk else ""  # the last line may continue in the next chunk
+        yield from lines
+        if not chunk:
+            return
+
+
+def iter_rows(stream, fmt):
+    """Yield (row_number, record dict or None, error message or None) from a CSV or JSONL stream."""
+    lines = _lines(stream)
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        columns = {HEADER_ALIASES.get((name or "").strip().lower()) for name in reader.fieldnames or []}
+        if not {"student_id", "full_name"} <= columns:
+            raise RosterError("CSV header must include student_id and full_name columns.")
+        for number, row in enumerate(reader, start=2):  # row 1 is the header
+            yield number, {HEADER_ALIASES.get((k or "").strip().lower(), k): v for k, v in row.items()}, None
+    elif fmt == "jsonl":
+        for number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield number, None, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(record, dict):
+                yield number, None, "Each line must be a JSON object."
+                continue
+            yield number, {HEADER_ALIASES.get(k.strip().lower(), k): v for k, v in record.items()}, None
+    else:
+        raise RosterError("Roster format must be csv or jsonl.")
+
+
+def validate(record):
+    """(student fields, None) or (None, error message) for one roster record."""
+    student_id = str(record.get("student_id") or "").strip()
+    full_name = str(record.get("full_name") or "").strip()
+    email = str(record.get("email") or "").strip()
+    if not student_id:
+        return None, "Missing student_id."
+    if not STUDENT_ID_RE.match(student_id):
+        return None, "student_id may only contain letters, digits, '.', '_', '@' and '-' (max 64)."
+    if not full_name:
+        return None, "Missing full_name."
+    if len(full_name) > 200:
+        return None, "full_name is longer than 200 characters."
+    if email and not EMAIL_RE.match(email):
+        return None, "Invalid email address."
+    return {"user_id": student_id, "full_name": full_name, "email": email}, None
+
+
+class RosterImport:
+    """Validate roster rows as they stream in and upsert them in unordered chunks.
+
+    Existing IDs are detected by the upsert itself (and the unique ``user_id``
+    index), not by lookups: in "skip" mode existing students are left alone, in
+    "update" mode their name and email are refreshed. An ID held by a
+    non-student account fails on the unique index and is reported for its row.
+    """
+
+    def __init__(self, collection, mode="skip", chunk_size=1000, max_rows=100000, on_written=None):
+        if mode not in ("skip", "update"):
+            raise RosterError("mode must be skip or update.")
+        self.collection = collection
+        self.mode = mode
+        self.chunk_size = chunk_size
+        self.max_rows = max_rows
+        self.on_written = on_written  # called with the user_ids of each written chunk (cache invalidation)
+        self.report = {"rows": 0, "created": 0, "existing": 0, "updated": 0, "failed": 0, "errors": [], "errors_truncated": 0}
+        self._seen = set()
+        self._chunk = []
+
+    def _error(self, row, student_id, message):
+        self.report["failed"] += 1
+        if len(self.report["errors"]) < MAX_REPORTED_ERRORS:
+            self.report["errors"].append({"row": row, "student_id": student_id, "message": message})
+        else:
+            self.report["errors_truncated"] += 1
+
+    def _operation(self, student):
+        now = datetime.datetime.utcnow()
+        if self.mode == "update":
+            return UpdateOne({"user_id": student["user_id"], "role": "student"},
+                             {"$set": {"full_name": student["full_name"], "email": student["email"], "updated_at": now},
+                              "$setOnInsert": {"user_id": student["user_id"], "role": "student", "created_at": now}}, upsert=True)
+        return UpdateOne({"user_id": student["user_id"]},
+                         {"$setOnInsert": {**student, "role": "student", "created_at": now}}, upsert=True)
+
+    def add(self, row, record, error=None):
+        self.report["rows"] += 1
+        if self.report["rows"] > self.max_rows:
+            raise RosterError(f"Roster has more than {self.max_rows} rows.")
+        student = None
+        if error is None:
+            student, error = validate(record)
+        if error:
+            self._error(row, (record or {}).get("student_id"), error)
+            return
+        if student["user_id"] in self._seen:
+            self._error(row, student["user_id"], "Duplicate student_id earlier in the file.")
+            return
+        self._seen.add(student["user_id"])
+        self._chunk.append((row, student))
+        if len(self._chunk) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        chunk, self._chunk = self._chunk, []
+        if not chunk:
+            return
+        failed = {}
+        try:
+            result = self.collection.bulk_write([self._operation(student) for _row, student in chunk], ordered=False)
+            details = result.bulk_api_result
+        except BulkWriteError as e:
+            details = e.details
+            for write_error in details.get("writeErrors", []):
+                failed[write_error["index"]] = write_error
+        upserted = {item["index"] for item in details.get("upserted", [])}
+        for index, (row, student) in enumerate(chunk):
+            if index in failed:
+                duplicate = failed[index].get("code") == 11000
+                self._error(row, student["user_id"], "student_id already belongs to another account." if duplicate else failed[index].get("errmsg", "Write failed."))
+            elif index in upserted:
+                self.report["created"] += 1
+            elif self.mode == "update":
+                self.report["updated"] += 1
+            else:
+                self.report["existing"] += 1
+        if self.on_written:
+            self.on_written([student["user_id"] for _row, student in chunk])
+
+    def run(self, rows):
+        for row, record, error in rows:
+            self.add(row, record, error)
+        self.flush()
+        return self.report
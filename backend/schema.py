@@ -0,0 +1,73 @@
+# backend/schema.py
+import logging
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+log = logging.getLogger("secure_exam.schema")
+
+# Indexes backing the hot queries in app.py. Creating an index that already
+# exists with the same spec is a no-op, so this runs safely on every start.
+INDEXES = {
+    "submissions": [
+        IndexModel([("session_id", ASCENDING)], name="session_id_unique", unique=True),
+        IndexModel([("student_id", ASCENDING), ("test_id", ASCENDING)], name="student_test"),
+        # Active-session list and keyset pagination of completed submissions.
+        IndexModel([("status", ASCENDING), ("start_time", DESCENDING), ("session_id", DESCENDING)], name="status_start_time"),
+        IndexModel([("test_id", ASCENDING), ("status", ASCENDING), ("start_time", DESCENDING)], name="test_status"),
+        # Archive runs: completed submissions by age.
+        IndexModel([("status", ASCENDING), ("end_time", ASCENDING)], name="status_end_time"),
+        # Reference checks before deleting stored selfies (purge and media cleanup jobs).
+        IndexModel([("selfie.digest", ASCENDING)], name="selfie_digest", sparse=True),
+    ],
+    "tests": [
+        IndexModel([("test_id", ASCENDING)], name="test_id_unique", unique=True),
+        IndexModel([("scheduled_datetime", ASCENDING)], name="scheduled_datetime"),
+    ],
+    "users": [
+        IndexModel([("user_id", ASCENDING)], name="user_id_unique", unique=True),
+        IndexModel([("role", ASCENDING), ("full_name", ASCENDING)], name="role_name"),
+    ],
+    "jobs": [
+        IndexModel([("created_at", DESCENDING)], name="created_at"),
+        IndexModel([("status", ASCENDING), ("updated_at", ASCENDING)], name="status_updated_at"),
+    ],
+    "archived_submissions": [
+        IndexModel([("student_id", ASCENDING)], name="student_id"),
+        IndexModel([("test_id", ASCENDING)], name="test_id"),
+        IndexModel([("selfie_digest", ASCENDING)], name="selfie_digest", sparse=True),
+    ],
+    "risk_scores": [
+        IndexModel([("test_id", ASCENDING), ("risk_score", DESCENDING)], name="test_risk"),
+        IndexModel([("risk_score", DESCENDING)], name="risk"),
+    ],
+    "proctoring_events": [
+        IndexModel([("session_id", ASCENDING), ("timestamp", ASCENDING)], name="session_time"),
+        IndexModel([("timestamp", ASCENDING)], name="timestamp"),
+    ],
+}
+
+
+def ensure_indexes(db, indexes=INDEXES):
+    """Create every declared index; returns {collection: [index names]}.
+
+    A failure on one collection (typically a unique index blocked by existing
+    duplicates) is reported and does not stop the others.
+    """
+    created = {}
+    for collection_name, models in indexes.items():
+        try:
+            created[collection_name] = db[collection_name].create_indexes(models)
+        except OperationFailure as e:
+            log.error(f"Could not create indexes on {collection_name}: {e}")
+            created[collection_name] = []
+    return created
+
+
+def drop_declared_indexes(db, indexes=INDEXES):
+    """Drop the indexes declared above (used by the benchmark for a before/after run)."""
+    for collection_name, models in indexes.items():
+        existing = db[collection_name].index_information()
+        for model in models:
+            name = model.document["name"]
+            if name in existing:
+                db[collection_name].drop_index(name)
@@ -0,0 +1,45 @@
+# tests/conftest.py
+"""Route tests run the real app against an in-memory mongomock database.
+
+Run from backend/: ``pip install -r requirements-dev.txt && python -m pytest tests``.
+"""
+import os
+import sys
+import uuid
+import pytest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ["MONGO_MOCK"] = "1"
+os.environ.setdefault("PRECOMPRESS_STATIC", "0")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("START_ADMISSION_RATE", "0")
+os.environ.setdefault("SELFIE_ADMISSION_RATE", "0")
+
+
+@pytest.fixture(scope="session")
+def app_module(tmp_path_factory):
+    os.environ.setdefault("ARCHIVE_FOLDER", str(tmp_path_factory.mktemp("archive")))
+    import app as app_module
+    app_module.app.config["TESTING"] = True
+    return app_module
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def admin_client(client):
+    with client.session_transaction() as sess:
+        sess["admin_logged_in"] = True
+    return client
+
+
+@pytest.fixture
+def active_session(app_module):
+    session_id = str(uuid.uuid4())
+    app_module.submissions_collection.insert_one({
+        "session_id": session_id, "student_id": "S-TEST", "test_id": "dummy-test-01", "status": "active", "answers": [],
+        "counters": dict(app_module.EMPTY_COUNTERS)})
+    return session_id
@@ -0,0 +1,52 @@
+# tests/test_admin_submissions.py
+import datetime
+import uuid
+
+
+def test_listing_requires_an_admin(client):
+    assert client.get("/api/admin/submissions").status_code == 401
+
+
+def test_student_filter_matches_id_prefixes(admin_client, app_module):
+    student_id = f"CS-{uuid.uuid4().hex[:6].upper()}-2025"
+    app_module.users_collection.insert_one({"user_id": student_id, "full_name": "Fragment Student", "role": "student"})
+    app_module.submissions_collection.insert_one({
+        "session_id": str(uuid.uuid4()), "student_id": student_id, "test_id": "dummy-test-01", "status": "completed",
+        "start_time": datetime.datetime.utcnow(), "end_time": datetime.datetime.utcnow(), "answers": []})
+    prefix = student_id[:9].lower()
+    submissions = admin_client.get("/api/admin/submissions", query_string={"student": prefix}).get_json()["submissions"]
+    assert [sub["student_id"] for sub in submissions] == [student_id]
+    assert admin_client.get("/api/admin/submissions", query_string={"student": student_id[3:9]}).get_json()["submissions"] == []
+    assert admin_client.get("/api/admin/submissions", query_string={"student": "no-such-student"}).get_json()["submissions"] == []
+
+
+def test_warning_count_is_read_live(admin_client, app_module):
+    student_id = f"WARN-{uuid.uuid4().hex[:6].upper()}"
+    session_id = str(uuid.uuid4())
+    app_module.users_collection.insert_one({"user_id": student_id, "full_name": "Warned Student", "role": "student"})
+    submission = {
+        "session_id": session_id, "student_id": student_id, "test_id": "dummy-test-01", "status": "completed",
+        "start_time": datetime.datetime.utcnow(), "end_time": datetime.datetime.utcnow(), "answers": [],
+        "logs": [{"type": "warning", "message": "legacy"}], "counters": {"events": 0, "warnings": 0, "violations": 0}}
+    submission["grade"] = app_module.build_grade(submission, app_module.tests_cache.get("dummy-test-01"))
+    app_module.submissions_collection.insert_one(submission)
+    # Events flushed after grading still count.
+    app_module.submissions_collection.update_one({"session_id": session_id}, {"$inc": {"counters.warnings": 2}})
+    rows = admin_client.get("/api/admin/submissions", query_string={"student": student_id}).get_json()["submissions"]
+    assert [row["warnings"] for row in rows] == [3]
+
+
+def test_rows_without_a_student_do_not_shorten_the_page(admin_client, app_module):
+    test_id = f"page-{uuid.uuid4().hex[:8]}"
+    app_module.tests_collection.insert_one({"test_id": test_id, "name": "Paged", "questions": []})
+    app_module.users_collection.insert_one({"user_id": f"{test_id}-s", "full_name": "Paged Student", "role": "student"})
+    now = datetime.datetime.utcnow()
+    app_module.submissions_collection.insert_many([
+        {"session_id": f"{test_id}-{i}", "student_id": f"{test_id}-s" if i % 2 else f"{test_id}-gone", "test_id": test_id,
+         "status": "completed", "start_time": now - datetime.timedelta(minutes=i), "end_time": now, "answers": []}
+        for i in range(6)])
+    first = admin_client.get("/api/admin/submissions", query_string={"test_id": test_id, "limit": 2}).get_json()
+    assert [row["session_id"] for row in first["submissions"]] == [f"{test_id}-1", f"{test_id}-3"]
+    second = admin_client.get("/api/admin/submissions", query_string={"test_id": test_id, "limit": 2, "cursor": first["next_cursor"]}).get_json()
+    assert [row["session_id"] for row in second["submissions"]] == [f"{test_id}-5"]
+    assert second["next_cursor"] is None
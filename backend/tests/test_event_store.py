@@ -0,0 +1,51 @@
+# tests/test_event_store.py
+import mongomock
+import pytest
+from event_buffer import BufferFull, EventBuffer
+from event_store import EventStore
+
+
+@pytest.fixture
+def store():
+    db = mongomock.MongoClient().db
+    db.submissions.insert_one({"session_id": "s1", "counters": {"events": 0, "warnings": 0, "violations": 0}})
+    return EventStore(db, db.submissions)
+
+
+def fail_once(monkeypatch, store):
+    bulk_write = store.submissions.bulk_write
+    calls = []
+    def flaky(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("counter write failed")
+        return bulk_write(*args, **kwargs)
+    monkeypatch.setattr(store.submissions, "bulk_write", flaky)
+
+
+def test_retry_after_counter_failure_counts_each_event_once(monkeypatch, store):
+    fail_once(monkeypatch, store)
+    batch = {"s1": [{"type": "warning", "message": "no seq"}, {"type": "info", "message": "seq", "seq": 1, "client_id": "c"}]}
+    with pytest.raises(RuntimeError):
+        store.record(batch)
+    assert store.record(batch) == 2
+    assert store.record(batch) == 0  # a later replay is a duplicate
+    assert store.collection.count_documents({"session_id": "s1"}) == 2
+    counters = store.submissions.find_one({"session_id": "s1"})["counters"]
+    assert counters["events"] == 2 and counters["warnings"] == 1
+
+
+def test_buffer_keeps_failed_batches_and_rejects_past_the_cap(monkeypatch, store):
+    fail_once(monkeypatch, store)
+    buffer = EventBuffer(store.record, max_events=10000, max_delay=60, max_pending=2)
+    try:
+        buffer.add("s1", [{"type": "info", "message": "a"}, {"type": "info", "message": "b"}])
+        with pytest.raises(BufferFull):
+            buffer.add("s1", [{"type": "info", "message": "c", "seq": 1}])
+        assert buffer.flush() == 0 and buffer.pending() == 2
+        assert buffer.flush() == 2
+        # The rejected seq was not remembered, so the client's retry is accepted.
+        assert buffer.add("s1", [{"type": "info", "message": "c", "seq": 1}]) == (1, 0)
+    finally:
+        buffer.close()
+    assert store.submissions.find_one({"session_id": "s1"})["counters"]["events"] == 3
@@ -0,0 +1,37 @@
+# tests/test_exam_routes.py
+import datetime
+
+
+def test_resume_reports_elapsed_time(client, app_module, active_session):
+    started = datetime.datetime.utcnow() - datetime.timedelta(minutes=5)
+    app_module.submissions_collection.update_one({"session_id": active_session}, {"$set": {"start_time": started}})
+    with client.session_transaction() as sess:
+        sess["user_id"] = "S-TEST"
+    data = client.get(f"/api/exam/answers/{active_session}").get_json()
+    assert data["session_status"] == "active"
+    assert 299 <= data["elapsed_seconds"] <= 302
+
+
+def test_submit_completes_an_active_session(client, app_module, active_session):
+    response = client.post("/api/exam/submit", json={"session_id": active_session, "answers": [{"question_index": 0, "answer": "Newton"}]})
+    assert response.status_code == 200
+    stored = app_module.submissions_collection.find_one({"session_id": active_session})
+    assert stored["status"] == "completed" and stored["end_time"] and stored["grade"]
+    assert client.post("/api/exam/submit", json={"session_id": active_session, "answers": []}).status_code == 404
+
+
+def test_submit_writes_buffered_events_first(client, app_module, active_session):
+    events = [{"seq": 1, "type": "warning", "message": "tab hidden"}, {"seq": 2, "type": "info", "message": "tab visible"}]
+    assert client.post("/api/exam/events", json={"session_id": active_session, "client_id": "c1", "events": events}).status_code == 202
+    assert client.post("/api/exam/submit", json={"session_id": active_session, "answers": []}).status_code == 200
+    counters = app_module.submissions_collection.find_one({"session_id": active_session})["counters"]
+    assert counters["events"] == 2 and counters["warnings"] == 1
+
+
+def test_start_activates_a_provisioned_session(client, app_module):
+    app_module.provision_sessions(app_module.submissions_collection, "dummy-test-01", ["S-PROV"])
+    provisioned = app_module.submissions_collection.find_one({"student_id": "S-PROV"})
+    response = client.post("/api/exam/start", json={"student_id": "S-PROV", "test_id": "dummy-test-01"})
+    assert response.status_code == 201
+    assert response.get_json()["session_id"] == provisioned["session_id"]
+    assert app_module.submissions_collection.find_one({"student_id": "S-PROV"})["status"] == "active"
@@ -0,0 +1,27 @@
+# tests/test_json_provider.py
+import datetime
+import json
+from bson import ObjectId
+from json_provider import dumps
+
+
+def test_naive_datetimes_are_utc_iso8601():
+    value = datetime.datetime(2025, 7, 7, 16, 30, 57, 123456)
+    assert json.loads(dumps({"t": value})) == {"t": "2025-07-07T16:30:57.123Z"}
+
+
+def test_aware_datetimes_are_converted_to_utc():
+    ist = datetime.timezone(datetime.timedelta(hours=5, minutes=30))
+    value = datetime.datetime(2025, 7, 7, 22, 0, tzinfo=ist)
+    assert json.loads(dumps([value])) == ["2025-07-07T16:30:00.000Z"]
+
+
+def test_dates_and_object_ids():
+    oid = ObjectId()
+    assert json.loads(dumps({"d": datetime.date(2025, 7, 7), "id": oid})) == {"d": "2025-07-07", "id": str(oid)}
+
+
+def test_jsonify_uses_the_same_format(app_module):
+    with app_module.app.app_context():
+        response = app_module.jsonify({"t": datetime.datetime(2024, 5, 1, 10, 0)})
+    assert response.get_json() == {"t": "2024-05-01T10:00:00.000Z"}
@@ -0,0 +1,19 @@
+# tests/test_live_stats.py
+
+
+def pending(app_module):
+    return app_module.live_stats.summary("dummy-test-01")["pendingAlerts"]
+
+
+def test_events_for_active_sessions_count_as_pending(app_module, active_session):
+    before = pending(app_module)
+    app_module.count_pending_alerts({active_session: 3})
+    assert pending(app_module) == before + 3
+
+
+def test_stale_cached_status_does_not_count_completed_sessions(app_module, active_session):
+    app_module.lookup_session(active_session)  # cached as active in this process
+    app_module.submissions_collection.update_one({"session_id": active_session}, {"$set": {"status": "completed"}})
+    before = pending(app_module)
+    app_module.count_pending_alerts({active_session: 3})
+    assert pending(app_module) == before
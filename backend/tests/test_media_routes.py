@@ -0,0 +1,26 @@
+# tests/test_media_routes.py
+import base64
+
+
+def test_review_links_full_size_selfie_and_thumbnail(admin_client, app_module, active_session):
+    app_module.users_collection.update_one({"user_id": "S-TEST"}, {"$set": {"full_name": "Test Student", "role": "student"}}, upsert=True)
+    app_module.submissions_collection.update_one({"session_id": active_session}, {"$set": {"selfie": {"digest": "ab" * 32, "size": 1}}})
+    data = admin_client.get(f"/api/admin/review/{active_session}").get_json()
+    assert data["selfie_url"] == f"/media/{'ab' * 32}"
+    assert data["selfie_thumb_url"] == f"/media/{'ab' * 32}/thumb"
+
+
+def test_legacy_selfie_upload_rejects_oversized_images(client, app_module, active_session, monkeypatch):
+    monkeypatch.setattr(app_module, "SELFIE_MAX_BYTES", 16)
+    selfie = "data:image/jpeg;base64," + base64.b64encode(b"x" * 64).decode("ascii")
+    response = client.post("/upload-selfie", json={"session_id": active_session, "selfie": selfie})
+    assert response.status_code == 413
+
+
+def test_legacy_selfie_upload_requires_an_active_session(client, app_module, active_session):
+    app_module.submissions_collection.update_one({"session_id": active_session}, {"$set": {"status": "completed"}})
+    app_module._session_cache.pop(active_session, None)
+    selfie = base64.b64encode(b"not stored").decode("ascii")
+    assert client.post("/upload-selfie", json={"session_id": active_session, "selfie": selfie}).status_code == 404
+    assert client.post("/upload-selfie", json={"selfie": selfie}).status_code == 404
+    assert not app_module.submissions_collection.find_one({"session_id": active_session}).get("selfie")
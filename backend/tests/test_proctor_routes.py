@@ -0,0 +1,46 @@
+# tests/test_proctor_routes.py
+import io
+from detectors.service import ServiceBusy
+
+JPEG = b"\xff\xd8\xff\xe0not-really-a-jpeg\xff\xd9"
+
+
+def test_single_frame_is_queued(client, active_session):
+    response = client.post(f"/api/proctor/frame?session_id={active_session}", data=JPEG, content_type="image/jpeg")
+    assert response.status_code == 202
+    assert response.get_json() == {"status": "queued", "frames": 1}
+
+
+def test_frame_batch_is_queued(client, active_session):
+    data = {"session_id": active_session, "frames": [(io.BytesIO(JPEG), f"{i}.jpg") for i in range(3)]}
+    response = client.post("/api/proctor/frames", data=data, content_type="multipart/form-data")
+    assert response.status_code == 202
+    assert response.get_json()["frames"] == 3
+
+
+def test_frame_for_unknown_session(client):
+    response = client.post("/api/proctor/frame?session_id=missing", data=JPEG, content_type="image/jpeg")
+    assert response.status_code == 404
+
+
+def test_busy_detection_queue_returns_retry_after(client, active_session, app_module, monkeypatch):
+    def busy(*args, **kwargs):
+        raise ServiceBusy()
+    monkeypatch.setattr(app_module.face_service, "submit", busy)
+    response = client.post(f"/api/proctor/frame?session_id={active_session}", data=JPEG, content_type="image/jpeg")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
+
+
+def test_duplicate_frames_repeat_the_previous_result(app_module, active_session, monkeypatch):
+    added = []
+    monkeypatch.setattr(app_module.event_buffer, "add", lambda session_id, events: added.append((session_id, events)))
+    app_module.record_frame_results(active_session, [
+        {"index": 0, "faces": 2, "duplicate": False},
+        {"index": 1, "faces": 2, "duplicate": True},
+        {"index": 2, "faces": None, "duplicate": False},
+    ])
+    [(session_id, events)] = added
+    assert session_id == active_session
+    assert [(e["frame_index"], e["faces"], e["type"], e.get("duplicate", False)) for e in events] == [
+        (0, 2, "warning", False), (1, 2, "warning", True)]
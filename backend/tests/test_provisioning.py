@@ -0,0 +1,27 @@
+# tests/test_provisioning.py
+import datetime
+import uuid
+from provisioning import ProvisioningScheduler, roster_for
+
+
+def test_roster_is_explicit_only():
+    assert roster_for({"test_id": "t"}) == []
+    assert roster_for({"test_id": "t", "student_ids": ["a", "b"]}) == ["a", "b"]
+
+
+def test_scheduler_skips_tests_without_a_roster(app_module):
+    soon = datetime.datetime.utcnow() + datetime.timedelta(minutes=5)
+    with_roster, without = f"prov-{uuid.uuid4().hex[:8]}", f"prov-{uuid.uuid4().hex[:8]}"
+    app_module.tests_collection.insert_many([
+        {"test_id": with_roster, "name": "Rostered", "scheduled_datetime": soon, "student_ids": ["S-1", "S-2"]},
+        {"test_id": without, "name": "Open", "scheduled_datetime": soon}])
+    claimed = ProvisioningScheduler(app_module.tests_collection, on_due=None).due()
+    assert with_roster in claimed and without not in claimed
+
+
+def test_provision_route_requires_a_roster(admin_client, app_module):
+    test_id = f"prov-{uuid.uuid4().hex[:8]}"
+    app_module.tests_collection.insert_one({"test_id": test_id, "name": "Open", "questions": []})
+    response = admin_client.post(f"/api/admin/test/{test_id}/provision")
+    assert response.status_code == 400
+    assert app_module.submissions_collection.count_documents({"test_id": test_id}) == 0
@@ -0,0 +1,51 @@
+# tests/test_roster_import.py
+import time
+import uuid
+
+
+def wait_for_job(app_module, job_id, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = app_module.job_runner.get(job_id)
+        if job["status"] in ("succeeded", "failed"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_import_runs_as_a_job_and_reports_bad_rows(admin_client, app_module):
+    prefix = uuid.uuid4().hex[:8]
+    roster = "student_id,full_name,email\n" + "".join(f"{prefix}-{i},Student {i},s{i}@example.com\n" for i in range(5)) + f"{prefix}-x,,\n"
+    response = admin_client.post("/api/admin/students/import?format=csv", data=roster, content_type="text/csv")
+    assert response.status_code == 202
+    job = wait_for_job(app_module, response.get_json()["job_id"])
+    assert job["status"] == "succeeded"
+    report = job["result"]
+    assert (report["rows"], report["created"], report["failed"]) == (6, 5, 1)
+    assert report["errors"][0]["row"] == 7
+    assert app_module.users_collection.count_documents({"user_id": {"$regex": f"^{prefix}-"}}) == 5
+    assert not app_module.os.path.exists(job["params"]["path"])
+
+
+def test_missing_columns_are_rejected_before_queueing(admin_client):
+    response = admin_client.post("/api/admin/students/import?format=csv", data="id,email\n1,a@b.co\n", content_type="text/csv")
+    assert response.status_code == 400
+    assert "full_name" in response.get_json()["message"]
+
+
+def test_pruning_keeps_spools_of_pending_imports(app_module):
+    os = app_module.os
+    stale = time.time() - (app_module.EXPORT_RETENTION_HOURS + 1) * 3600
+    pending, orphan = (os.path.join(app_module.ROSTER_FOLDER, f"{uuid.uuid4().hex}.csv") for _ in range(2))
+    for path in (pending, orphan):
+        with open(path, "w") as spool:
+            spool.write("student_id,full_name\n")
+        os.utime(path, (stale, stale))
+    job_id = uuid.uuid4().hex
+    app_module.job_runner.collection.insert_one({"_id": job_id, "kind": "import_roster", "status": "queued", "params": {"path": pending}})
+    try:
+        app_module.prune_exports(app_module.ROSTER_FOLDER, keep=app_module.roster_spools_in_use())
+        assert os.path.exists(pending) and not os.path.exists(orphan)
+    finally:
+        app_module.job_runner.collection.delete_one({"_id": job_id})
+        os.unlink(pending)
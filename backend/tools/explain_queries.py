@@ -0,0 +1,75 @@
+# tools/explain_queries.py
+"""Show which index each hot query in app.py uses, via explain().
+
+Usage (from backend/):
+    python tools/explain_queries.py            # plan summary per query
+    python tools/explain_queries.py --usage    # plus $indexStats access counts
+
+Connects with MONGO_URI; MONGO_DB_NAME selects the database, as in app.py (default secure_exam_lite).
+"""
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+from pymongo import MongoClient
+from schema import INDEXES
+
+
+def hot_queries(db):
+    """(label, collection, filter, sort) for the lookups the API runs most, filled from a sample document."""
+    sample = db.submissions.find_one({}, {"session_id": 1, "student_id": 1, "test_id": 1}) or {}
+    session_id, student_id, test_id = sample.get("session_id", ""), sample.get("student_id", ""), sample.get("test_id", "")
+    return [
+        ("submission by session_id", "submissions", {"session_id": session_id}, None),
+        ("submissions by student", "submissions", {"student_id": student_id}, None),
+        ("student attempt at test", "submissions", {"student_id": student_id, "test_id": test_id}, None),
+        ("active sessions by start", "submissions", {"status": "active"}, [("start_time", -1)]),
+        ("completed page (keyset)", "submissions", {"status": "completed"}, [("start_time", -1), ("session_id", -1)]),
+        ("completed page for test", "submissions", {"test_id": test_id, "status": "completed"}, [("start_time", -1)]),
+        ("test by test_id", "tests", {"test_id": test_id}, None),
+        ("user by user_id", "users", {"user_id": student_id}, None),
+        ("events for session", "proctoring_events", {"session_id": session_id}, [("timestamp", 1)]),
+    ]
+
+
+def summarize_plan(explain):
+    """Collapse an explain() result into stages, index name and examined/returned counts."""
+    stages, index_name = [], None
+    node = explain.get("queryPlanner", {}).get("winningPlan", {})
+    while node:
+        node = node.get("queryPlan", node)
+        stages.append(node.get("stage"))
+        index_name = index_name or node.get("indexName")
+        node = node.get("inputStage") or (node.get("inputStages") or [None])[0]
+    stats = explain.get("executionStats", {})
+    return {
+        "stages": " <- ".join(s for s in stages if s),
+        "index": index_name or "-",
+        "returned": stats.get("nReturned", "?"),
+        "keys": stats.get("totalKeysExamined", "?"),
+        "docs": stats.get("totalDocsExamined", "?"),
+        "ms": stats.get("executionTimeMillis", "?"),
+    }
+
+
+def main():
+    load_dotenv()
+    db = MongoClient(os.environ.get("MONGO_URI"))[os.environ.get("MONGO_DB_NAME", "secure_exam_lite")]
+    print(f"{'query':28} {'index':20} {'returned':>8} {'keys':>8} {'docs':>8} {'ms':>5}  plan")
+    for label, collection, query, sort in hot_queries(db):
+        cursor = db[collection].find(query).limit(50)
+        if sort:
+            cursor = cursor.sort(sort)
+        plan = summarize_plan(cursor.explain())
+        flag = "  <-- COLLSCAN" if "COLLSCAN" in plan["stages"] else ""
+        print(f"{label:28} {plan['index']:20} {plan['returned']:>8} {plan['keys']:>8} {plan['docs']:>8} {plan['ms']:>5}  {plan['stages']}{flag}")
+    if "--usage" in sys.argv:
+        print("\nIndex usage since server start ($indexStats):")
+        for collection in INDEXES:
+            for stat in db[collection].aggregate([{"$indexStats": {}}]):
+                print(f"  {collection:18} {stat['name']:22} ops={stat['accesses']['ops']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# tools/risk_report.py
+"""Rank sessions by proctoring risk from event archives and/or Mongo.
+
+Usage (from backend/):
+    python tools/risk_report.py --logs logs --csv logs/all_proctoring_logs.csv
+    python tools/risk_report.py --mongo [--test-id ID] [--top 50] [--json]
+
+--logs reads <dir>/<student>_events.jsonl files, --csv a flat event CSV
+(session_id, timestamp, type, message), --mongo the submissions' events via
+MONGO_URI/MONGO_DB_NAME. Sources are streamed in chunks, so memory stays
+bounded by the number of sessions rather than events; each session's events
+are expected in time order, as the archives are written.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics import RiskAnalyzer, iter_event_csv, iter_jsonl_dir, iter_mongo, session_meta
+
+
+def mongo_events(args, analyzer):
+    from dotenv import load_dotenv
+    from pymongo import MongoClient
+    from event_store import EventStore
+    load_dotenv()
+    db = MongoClient(os.environ.get("MONGO_URI"))[os.environ.get("MONGO_DB_NAME", "secure_exam_lite")]
+    query = {"status": {"$in": ["active", "completed"]}}
+    if args.test_id:
+        query["test_id"] = args.test_id
+    return iter_mongo(db.submissions, EventStore(db, db.submissions), query,
+                      on_session=lambda sub: analyzer.set_meta(sub["session_id"], **session_meta(sub)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logs", help="directory of <student>_events.jsonl files")
+    parser.add_argument("--csv", action="append", default=[], help="flat event CSV (repeatable)")
+    parser.add_argument("--mongo", action="store_true")
+    parser.add_argument("--test-id")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--chunk-size", type=int, default=100000)
+    parser.add_argument("--json", action="store_true", help="print JSON lines instead of a table")
+    args = parser.parse_args()
+    if not (args.logs or args.csv or args.mongo):
+        parser.error("give at least one of --logs, --csv or --mongo")
+
+    analyzer = RiskAnalyzer()
+    started = time.perf_counter()
+    if args.logs:
+        analyzer.feed(iter_jsonl_dir(args.logs), args.chunk_size)
+    for path in args.csv:
+        analyzer.feed(iter_event_csv(path), args.chunk_size)
+    if args.mongo:
+        analyzer.feed(mongo_events(args, analyzer), args.chunk_size)
+    ranked = analyzer.ranked(args.top)
+    elapsed = time.perf_counter() - started
+
+    if args.json:
+        for result in ranked:
+            print(json.dumps(result, default=str))
+        return
+    print(f"{len(analyzer.sessions)} sessions, {analyzer.events} events in {elapsed:.1f}s\n")
+    print(f"{'session':38} {'risk':>5} {'tabs/10m':>8} {'face miss s':>11} {'multi':>5} {'bursts':>6} {'lock after':>10}")
+    for result in ranked:
+        f = result["features"]
+        lock = f"{f['time_to_lock_seconds'] / 60:.1f} min" if f["locked"] else "-"
+        print(f"{str(result['session_id'])[:38]:38} {result['risk_score']:>5} {f['tab_switches_per_10min']:>8} "
+              f"{f['face_missing_seconds']:>11} {f['multi_face_events']:>5} {f['violation_bursts']:>6} {lock:>10}")
+
+
+if __name__ == "__main__":
+    main()
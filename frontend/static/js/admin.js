@@ -1,5 +1,20 @@
 // static/js/admin.js
 
+// Poll a background job (exports, cascading deletes, regrades) until it
+// finishes; resolves with the job or rejects with its error.
+async function waitForJob(jobId, onProgress, intervalMs = 1000) {
+    while (true) {
+        const response = await fetch(`/api/admin/jobs/${jobId}`);
+        const result = await response.json();
+        if (!response.ok) throw new Error(result.message || 'Could not check job status.');
+        const job = result.job;
+        if (onProgress && job.progress) onProgress(job.progress);
+        if (job.status === 'succeeded') return job;
+        if (job.status === 'failed') throw new Error(job.error || 'Job failed.');
+        await new Promise(resolve => setTimeout(resolve, intervalMs));
+    }
+}
+
 document.addEventListener('DOMContentLoaded', async () => {
     console.log('Admin Dashboard JS loaded.');
 
@@ -78,6 +93,22 @@ document.addEventListener('DOMContentLoaded', async () => {
         }
     }
 
+    function createSessionListItem(session) {
+        const listItem = document.createElement('div');
+        listItem.classList.add('list-item');
+        listItem.dataset.sessionId = session.id;
+        listItem.innerHTML = `
+            <div class="item-info">
+                <div class="item-title">${session.studentName}</div>
+                <div class="item-meta">${session.examName}</div>
+            </div>
+            <span class="status-indicator ${session.status.toLowerCase()}"></span>
+            <span class="item-meta">${session.time}</span>
+            <i class="fas fa-chevron-right action-icon" style="margin-left: 10px;"></i>
+        `;
+        return listItem;
+    }
+
     async function fetchActiveSessions(filter = '') {
         console.log(`Fetching active sessions with filter: ${filter}...`);
         if(sessionsLoadingIndicator) sessionsLoadingIndicator.style.display = 'block';
@@ -97,19 +128,7 @@ document.addEventListener('DOMContentLoaded', async () => {
                 } else {
                     if(sessionListElement) {
                         data.sessions.forEach(session => {
-                            const listItem = document.createElement('div');
-                            listItem.classList.add('list-item');
-                            listItem.dataset.sessionId = session.id;
-                            listItem.innerHTML = `
-                                <div class="item-info">
-                                    <div class="item-title">${session.studentName}</div>
-                                    <div class="item-meta">${session.examName}</div>
-                                </div>
-                                <span class="status-indicator ${session.status.toLowerCase()}"></span>
-                                <span class="item-meta">${session.time}</span>
-                                <i class="fas fa-chevron-right action-icon" style="margin-left: 10px;"></i>
-                            `;
-                            sessionListElement.appendChild(listItem);
+                            sessionListElement.appendChild(createSessionListItem(session));
                         });
                     }
                 }
@@ -218,30 +237,83 @@ document.addEventListener('DOMContentLoaded', async () => {
         }
     }
 
+    // --- Live Feed (server-sent events) ---
+    // The session list is loaded once; afterwards the server pushes changes.
+    let summaryRefreshTimer = null;
+    function scheduleSummaryRefresh() {
+        if (summaryRefreshTimer) return;
+        summaryRefreshTimer = setTimeout(() => {
+            summaryRefreshTimer = null;
+            fetchSummaryData();
+        }, 2000);
+    }
+
+    function findSessionListItem(sessionId) {
+        return sessionListElement ? sessionListElement.querySelector(`.list-item[data-session-id="${sessionId}"]`) : null;
+    }
+
+    function connectLiveFeed() {
+        if (!window.EventSource) return;
+        const feed = new EventSource('/api/admin/live');
+        feed.addEventListener('session_started', (event) => {
+            const session = JSON.parse(event.data);
+            const filter = courseFilterSelect ? courseFilterSelect.value : '';
+            if (sessionListElement && session.studentName && (!filter || filter === session.testId) && !findSessionListItem(session.id)) {
+                sessionListElement.prepend(createSessionListItem(session));
+                if(noSessionsMessage) noSessionsMessage.style.display = 'none';
+            }
+            scheduleSummaryRefresh();
+        });
+        feed.addEventListener('session_submitted', (event) => {
+            const { id } = JSON.parse(event.data);
+            const listItem = findSessionListItem(id);
+            if (listItem && !listItem.classList.contains('selected')) listItem.remove();
+            scheduleSummaryRefresh();
+        });
+        feed.addEventListener('session_locked', (event) => {
+            const { id } = JSON.parse(event.data);
+            const indicator = findSessionListItem(id)?.querySelector('.status-indicator');
+            if (indicator) indicator.className = 'status-indicator locked';
+            scheduleSummaryRefresh();
+        });
+        feed.addEventListener('alerts', () => scheduleSummaryRefresh());
+        feed.addEventListener('resync', () => {
+            fetchActiveSessions(courseFilterSelect ? courseFilterSelect.value : '');
+            scheduleSummaryRefresh();
+        });
+    }
+
     async function exportAllLogs() {
+        // The export is written by a background job; poll it, then let the
+        // browser download the finished file directly.
         console.log('Exporting all logs...');
+        const label = exportLogsBtn ? exportLogsBtn.textContent : '';
+        if (exportLogsBtn) exportLogsBtn.disabled = true;
         try {
-            const response = await fetch('/api/admin/export-all-logs-csv');
-            if (response.ok) {
-                const blob = await response.blob();
-                const url = window.URL.createObjectURL(blob);
-                const a = document.createElement('a');
-                a.style.display = 'none';
-                a.href = url;
-                a.download = 'all_proctoring_logs.csv';
-                document.body.appendChild(a);
-                a.click();
-                window.URL.revokeObjectURL(url);
-                alert('All logs exported successfully!');
-                console.log('All logs exported.');
-            } else {
-                const errorData = await response.json();
-                alert('Failed to export logs: ' + (errorData.message || 'Unknown error.'));
-                console.error('Failed to export logs:', errorData);
-            }
+            const response = await fetch('/api/admin/exports', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ gzip: true })
+            });
+            const result = await response.json();
+            if (!response.ok) throw new Error(result.message);
+            const job = await waitForJob(result.job_id, (progress) => {
+                if (exportLogsBtn && progress.total) exportLogsBtn.textContent = `Exporting ${progress.done}/${progress.total}...`;
+            });
+            const a = document.createElement('a');
+            a.style.display = 'none';
+            a.href = job.download_url;
+            document.body.appendChild(a);
+            a.click();
+            a.remove();
         } catch (error) {
-            alert('Error exporting logs. Please check your network connection.');
-            console.error('Error exporting logs:', error);
+            alert(`Export failed: ${error.message}`);
+            console.error('Export failed:', error);
+        } finally {
+            if (exportLogsBtn) {
+                exportLogsBtn.disabled = false;
+                exportLogsBtn.textContent = label;
+            }
         }
     }
 
@@ -276,6 +348,7 @@ document.addEventListener('DOMContentLoaded', async () => {
     fetchSummaryData();
     fetchExamOptions();
     fetchActiveSessions();
+    connectLiveFeed();
 
     // Event delegation for session list items
     if (sessionListElement) {
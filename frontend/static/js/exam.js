@@ -29,6 +29,17 @@ document.addEventListener('DOMContentLoaded', () => {
     let questions = [];
     let studentAnswers = {};
     let currentQuestionIndex = 0;
+    // Autosave: every edit bumps the question's version; changed questions are sent as deltas
+    const AUTOSAVE_INTERVAL_MS = 5000;
+    const sessionStorageKey = `examSession:${testId}`;
+    let answerVersions = {};
+    let dirtyAnswers = new Set();
+    let autosaveTimer = null;
+    let restoredAnswers = null;
+    let resumedElapsedSeconds = 0;
+    // Admission control: at a scheduled start the server paces starts and selfie uploads
+    // with 429 + Retry-After; wait as told (plus jitter so retries don't realign) and try again.
+    const ADMISSION_MAX_RETRIES = 20;
 
     // --- Core Exam Logic ---
     function renderQuestion(index) {
@@ -47,15 +58,68 @@ document.addEventListener('DOMContentLoaded', () => {
         nextQuestionBtn.textContent = (index === questions.length - 1) ? 'Finish' : 'Next';
     }
 
+    function recordAnswer(index, value) {
+        if (studentAnswers[index] === value) return;
+        studentAnswers[index] = value;
+        answerVersions[index] = (answerVersions[index] || 0) + 1;
+        dirtyAnswers.add(index);
+    }
+
     function saveCurrentAnswer() {
         if (!questions[currentQuestionIndex]) return;
         const question = questions[currentQuestionIndex];
         if (question.type === 'mcq') {
             const selectedOption = answerAreaEl.querySelector(`input[name="question_${currentQuestionIndex}"]:checked`);
-            if (selectedOption) studentAnswers[currentQuestionIndex] = selectedOption.value;
+            if (selectedOption) recordAnswer(currentQuestionIndex, selectedOption.value);
         } else if (question.type === 'subjective') {
             const textArea = answerAreaEl.querySelector('textarea');
-            if (textArea) studentAnswers[currentQuestionIndex] = textArea.value;
+            if (textArea) recordAnswer(currentQuestionIndex, textArea.value);
+        }
+    }
+    answerAreaEl.addEventListener('input', saveCurrentAnswer);
+    answerAreaEl.addEventListener('change', saveCurrentAnswer);
+
+    function answerDeltas(indices) {
+        return indices.map(index => ({ index, answer: studentAnswers[index], version: answerVersions[index] }));
+    }
+
+    async function flushAutosave(useBeacon = false) {
+        if (!currentSessionId || dirtyAnswers.size === 0) return;
+        const indices = [...dirtyAnswers];
+        dirtyAnswers.clear();
+        const body = JSON.stringify({ session_id: currentSessionId, deltas: answerDeltas(indices) });
+        if (useBeacon && navigator.sendBeacon) {
+            if (navigator.sendBeacon('/api/exam/autosave', new Blob([body], { type: 'application/json' }))) return;
+        }
+        try {
+            const response = await fetch('/api/exam/autosave', { method: 'POST', headers: { 'Content-Type': 'application/json' }, body, keepalive: useBeacon });
+            if (!response.ok && response.status !== 409) throw new Error(`Autosave failed with ${response.status}`);
+        } catch (error) {
+            // Newer edits bump the version, so re-sending these indices later is always safe.
+            indices.forEach(index => dirtyAnswers.add(index));
+            console.error('Error autosaving answers:', error);
+        }
+    }
+    window.addEventListener('pagehide', () => {
+        saveCurrentAnswer();
+        flushAutosave(true);
+    });
+
+    async function resumeSavedSession() {
+        const savedSessionId = localStorage.getItem(sessionStorageKey);
+        if (!savedSessionId) return false;
+        try {
+            const response = await fetch(`/api/exam/answers/${encodeURIComponent(savedSessionId)}`);
+            const data = await response.json();
+            if (!response.ok || data.session_status !== 'active' || data.test_id !== testId) throw new Error('Session not resumable');
+            currentSessionId = savedSessionId;
+            restoredAnswers = data.answers;
+            resumedElapsedSeconds = data.elapsed_seconds || 0;
+            logActivity('Resumed exam session with saved answers.');
+            return true;
+        } catch (error) {
+            localStorage.removeItem(sessionStorageKey);
+            return false;
         }
     }
 
@@ -87,18 +151,21 @@ document.addEventListener('DOMContentLoaded', () => {
     });
     confirmSubmitBtn.addEventListener('click', async () => {
         logActivity('Student confirmed exam submission.');
-        const formattedAnswers = questions.map((q, index) => ({
-            question_text: q.text,
-            answer: studentAnswers[index] || null
-        }));
+        if (window.flushEvents) await window.flushEvents();
+        // The server finalizes from its saved copy; sending every answered question with
+        // its version covers edits that were not autosaved yet.
+        const answered = Object.keys(answerVersions).map(Number).filter(index => studentAnswers[index] !== null);
         try {
             const response = await fetch('/api/exam/submit', {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ session_id: currentSessionId, answers: formattedAnswers })
+                body: JSON.stringify({ session_id: currentSessionId, deltas: answerDeltas(answered) })
             });
             const result = await response.json();
             if (!response.ok) throw new Error(result.message);
+            dirtyAnswers.clear();
+            clearInterval(autosaveTimer);
+            localStorage.removeItem(sessionStorageKey);
             stopTimer();
             stopProctoringCamera();
             window.location.href = `submission_success.html?session_id=${currentSessionId}`;
@@ -124,6 +191,17 @@ document.addEventListener('DOMContentLoaded', () => {
         await startCamera(selfieVideo);
     }
 
+    async function fetchWithAdmission(url, options) {
+        for (let attempt = 0; ; attempt++) {
+            const response = await fetch(url, options);
+            if ((response.status !== 429 && response.status !== 503) || attempt >= ADMISSION_MAX_RETRIES) return response;
+            const waitSeconds = parseFloat(response.headers.get('Retry-After')) || 1;
+            captureSelfieBtn.textContent = `Waiting for a slot (${Math.ceil(waitSeconds)}s)...`;
+            await new Promise(resolve => setTimeout(resolve, (waitSeconds + Math.random()) * 1000));
+            captureSelfieBtn.textContent = 'Processing...';
+        }
+    }
+
     captureSelfieBtn.addEventListener('click', async () => {
         captureSelfieBtn.disabled = true;
         captureSelfieBtn.textContent = 'Processing...';
@@ -132,22 +210,25 @@ document.addEventListener('DOMContentLoaded', () => {
         canvas.width = selfieVideo.videoWidth;
         canvas.height = selfieVideo.videoHeight;
         canvas.getContext('2d').drawImage(selfieVideo, 0, 0, canvas.width, canvas.height);
-        const selfieData = canvas.toDataURL('image/jpeg');
+        const selfieBlob = await new Promise(resolve => canvas.toBlob(resolve, 'image/jpeg', 0.9));
         stopCamera();
         try {
-            const sessionResponse = await fetch('/api/exam/start', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ student_id: currentStudentId, test_id: testId })
-            });
-            const sessionData = await sessionResponse.json();
-            if (!sessionResponse.ok) throw new Error(sessionData.message);
-            currentSessionId = sessionData.session_id;
+            if (!(await resumeSavedSession())) {
+                const sessionResponse = await fetchWithAdmission('/api/exam/start', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({ student_id: currentStudentId, test_id: testId })
+                });
+                const sessionData = await sessionResponse.json();
+                if (!sessionResponse.ok) throw new Error(sessionData.message);
+                currentSessionId = sessionData.session_id;
+                localStorage.setItem(sessionStorageKey, currentSessionId);
+            }
             window.currentSessionId = currentSessionId; // Make it globally available for logger.js
-            const selfieResponse = await fetch('/upload-selfie', {
+            const selfieResponse = await fetchWithAdmission(`/api/exam/selfie?session_id=${encodeURIComponent(currentSessionId)}`, {
                 method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ selfie: selfieData, session_id: currentSessionId })
+                headers: { 'Content-Type': 'image/jpeg' },
+                body: selfieBlob
             });
             if (!selfieResponse.ok) throw new Error('Failed to upload selfie.');
             setTimeout(() => { selfieModal.style.display = 'none'; startExam(); }, 500);
@@ -170,13 +251,47 @@ document.addEventListener('DOMContentLoaded', () => {
             stopProctoringCamera();
         }
     });
+    // Periodic low-resolution frames for server-side face verification,
+    // captured every few seconds and uploaded in small batches
+    const FRAME_CAPTURE_INTERVAL_MS = 10000;
+    const FRAME_BATCH_SIZE = 3;
+    const FRAME_UPLOAD_WIDTH = 320;
+    let frameUploadTimer = null;
+    let pendingFrames = [];
+    function uploadFrameBatch() {
+        if (!currentSessionId || pendingFrames.length === 0) return;
+        const formData = new FormData();
+        formData.append('session_id', currentSessionId);
+        pendingFrames.forEach((blob, index) => formData.append('frames', blob, `frame_${index}.jpg`));
+        pendingFrames = [];
+        fetch('/api/proctor/frames', { method: 'POST', body: formData })
+            .catch(error => console.error('Error uploading proctoring frames:', error));
+    }
+    function captureProctorFrame() {
+        if (!currentSessionId || !webcamVideo.videoWidth) return;
+        const canvas = document.createElement('canvas');
+        canvas.width = FRAME_UPLOAD_WIDTH;
+        canvas.height = Math.round(webcamVideo.videoHeight * FRAME_UPLOAD_WIDTH / webcamVideo.videoWidth);
+        canvas.getContext('2d').drawImage(webcamVideo, 0, 0, canvas.width, canvas.height);
+        canvas.toBlob((blob) => {
+            if (!blob) return;
+            pendingFrames.push(blob);
+            if (pendingFrames.length >= FRAME_BATCH_SIZE) uploadFrameBatch();
+        }, 'image/jpeg', 0.7);
+    }
     async function startProctoringCamera() {
        const started = await startCamera(webcamVideo);
-       if (started) initFaceDetector(webcamVideo, overlayCanvas, handleViolation, currentSessionId);
+       if (started) {
+           initFaceDetector(webcamVideo, overlayCanvas, handleViolation, currentSessionId);
+           if (!frameUploadTimer) frameUploadTimer = setInterval(captureProctorFrame, FRAME_CAPTURE_INTERVAL_MS);
+       }
     }
     function stopProctoringCamera() {
         stopCamera();
         stopFaceDetector();
+        clearInterval(frameUploadTimer);
+        frameUploadTimer = null;
+        uploadFrameBatch();
     }
     function handleViolation(message) {
         logActivity(`Violation: ${message}`, 'warning');
@@ -197,7 +312,14 @@ document.addEventListener('DOMContentLoaded', () => {
             examCodeEl.textContent = data.details.code;
             questions = data.details.questions;
             questions.forEach((q, i) => studentAnswers[i] = null);
-            startTimer(data.details.duration_seconds);
+            (restoredAnswers || []).forEach(saved => {
+                if (saved.index < questions.length) {
+                    studentAnswers[saved.index] = saved.answer;
+                    answerVersions[saved.index] = saved.version;
+                }
+            });
+            autosaveTimer = setInterval(flushAutosave, AUTOSAVE_INTERVAL_MS);
+            startTimer(Math.max(0, data.details.duration_seconds - resumedElapsedSeconds));
             renderQuestion(currentQuestionIndex);
             await startProctoringCamera();
         } catch (error) {
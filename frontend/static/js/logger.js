@@ -6,6 +6,16 @@ let maxTabSwitches = 1; // Allow 1 tab switch before locking
 let examLocked = false;
 let multiFaceDetected = false;
 
+// Batched event upload to /api/exam/events
+const EVENT_FLUSH_INTERVAL_MS = 3000;
+const EVENT_FLUSH_SIZE = 20;
+// A fresh client id per page load: eventSeq restarts at 0 on every load, and
+// (session, client, seq) is the dedupe key, so a resumed session must not reuse an old id.
+const eventClientId = `${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 10)}`;
+let eventSeq = 0;
+let eventQueue = [];
+let eventFlushInFlight = false;
+
 /**
  * Logs an activity message to the console and the UI activity log.
  * @param {string} message The message to log.
@@ -34,6 +44,8 @@ function logActivity(message, type = 'info') {
         logList.removeChild(logList.lastChild);
     }
     
+    queueServerEvent(type, message);
+
     if (type === 'error') {
         console.error(`[${timestamp}] ${message}`);
     } else if (type === 'warning') {
@@ -43,6 +55,55 @@ function logActivity(message, type = 'info') {
     }
 }
 
+/**
+ * Queue an event for the next batched upload. Events are only sent once an
+ * exam session exists; anything logged earlier stays local.
+ */
+function queueServerEvent(type, message) {
+    if (!window.currentSessionId) return;
+    eventSeq++;
+    eventQueue.push({ seq: eventSeq, type: type, message: message, timestamp: new Date().toISOString() });
+    if (eventQueue.length >= EVENT_FLUSH_SIZE) flushEvents();
+}
+
+/**
+ * Send queued events. Events stay queued until the server acknowledges them,
+ * so a failed request is retried with the same sequence numbers.
+ */
+async function flushEvents() {
+    if (eventFlushInFlight || eventQueue.length === 0 || !window.currentSessionId) return;
+    eventFlushInFlight = true;
+    const batch = eventQueue.slice(0, EVENT_FLUSH_SIZE * 5);
+    try {
+        const response = await fetch('/api/exam/events', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ session_id: window.currentSessionId, client_id: eventClientId, events: batch })
+        });
+        if (response.ok) {
+            eventQueue = eventQueue.slice(batch.length);
+        }
+    } catch (error) {
+        console.error('Error sending events:', error);
+    } finally {
+        eventFlushInFlight = false;
+    }
+}
+
+/**
+ * Hand any remaining events to the browser when the page is being unloaded.
+ */
+function flushEventsOnUnload() {
+    if (eventQueue.length === 0 || !window.currentSessionId || !navigator.sendBeacon) return;
+    const payload = JSON.stringify({ session_id: window.currentSessionId, client_id: eventClientId, events: eventQueue });
+    if (navigator.sendBeacon('/api/exam/events', new Blob([payload], { type: 'application/json' }))) {
+        eventQueue = [];
+    }
+}
+
+setInterval(flushEvents, EVENT_FLUSH_INTERVAL_MS);
+window.addEventListener('pagehide', flushEventsOnUnload);
+
 /**
  * Handle tab switching with two-strike system
  */
@@ -102,7 +163,8 @@ function lockExam(reason) {
         multiFaceDetected: multiFaceDetected
     };
     
-    // Send violation to backend
+    // Send violation to backend, along with any events still queued
+    flushEvents();
     fetch('/api/exam/violation', {
         method: 'POST',
         headers: {
@@ -205,3 +267,4 @@ window.handleTabSwitch = handleTabSwitch;
 window.handleMultiFaceDetection = handleMultiFaceDetection;
 window.lockExam = lockExam;
 window.resetSecurityCounters = resetSecurityCounters;
+window.flushEvents = flushEvents;
@@ -12,7 +12,13 @@ document.addEventListener('DOMContentLoaded', () => {
     const submissionList = document.getElementById('submissionList');
 
     let allSubmissions = [];
-    let filteredSubmissions = [];
+    let nextCursor = null;
+
+    const loadMoreBtn = document.createElement('button');
+    loadMoreBtn.className = 'btn btn-secondary';
+    loadMoreBtn.textContent = 'Load more';
+    loadMoreBtn.style.display = 'none';
+    if (submissionList) submissionList.after(loadMoreBtn);
 
     // Initialize the page
     async function initializePage() {
@@ -41,15 +47,23 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     }
 
-    // Fetch all submissions
-    async function fetchSubmissions() {
-        showLoading(true);
+    // Fetch one page of submissions; filters are applied server-side
+    async function fetchSubmissions(append = false) {
+        if (!append) {
+            allSubmissions = [];
+            nextCursor = null;
+            showLoading(true);
+        }
+        const params = new URLSearchParams();
+        if (filterExamSelect && filterExamSelect.value) params.set('test_id', filterExamSelect.value);
+        if (filterStudentInput && filterStudentInput.value.trim()) params.set('student', filterStudentInput.value.trim());
+        if (append && nextCursor) params.set('cursor', nextCursor);
         try {
-            const response = await fetch('/api/admin/submissions');
+            const response = await fetch(`/api/admin/submissions?${params.toString()}`);
             const data = await response.json();
             if (response.ok) {
-                allSubmissions = data.submissions || [];
-                filteredSubmissions = [...allSubmissions];
+                allSubmissions = allSubmissions.concat(data.submissions || []);
+                nextCursor = data.next_cursor || null;
                 renderSubmissions();
             } else {
                 console.error('Failed to fetch submissions:', data.message);
@@ -60,18 +74,21 @@ document.addEventListener('DOMContentLoaded', () => {
             showNoSubmissions('Network error loading submissions.');
         } finally {
             showLoading(false);
+            loadMoreBtn.style.display = nextCursor ? 'inline-block' : 'none';
         }
     }
 
     // Render submissions list
     function renderSubmissions() {
-        if (filteredSubmissions.length === 0) {
+        if (allSubmissions.length === 0) {
             showNoSubmissions('No submissions found matching criteria.');
             return;
         }
 
+        if (noSubmissionsMessage) noSubmissionsMessage.style.display = 'none';
+        submissionList.style.display = 'block';
         submissionList.innerHTML = '';
-        filteredSubmissions.forEach(submission => {
+        allSubmissions.forEach(submission => {
             const submissionCard = createSubmissionCard(submission);
             submissionList.appendChild(submissionCard);
         });
@@ -83,7 +100,7 @@ document.addEventListener('DOMContentLoaded', () => {
         card.className = 'submission-card';
         
         const startTime = new Date(submission.start_time).toLocaleString();
-        const warningCount = submission.logs.filter(log => log.type === 'warning').length;
+        const warningCount = submission.warnings;
         
         card.innerHTML = `
             <div class="submission-header">
@@ -106,7 +123,7 @@ document.addEventListener('DOMContentLoaded', () => {
                 </div>
                 <div class="detail-item">
                     <i class="fas fa-question-circle"></i>
-                    <span>${submission.answers.length} questions</span>
+                    <span>${submission.answer_count} questions</span>
                 </div>
             </div>
             <div class="submission-actions">
@@ -121,19 +138,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
     // Apply filters
     function applyFilters() {
-        const selectedExam = filterExamSelect.value;
-        const studentFilter = filterStudentInput.value.toLowerCase();
-
-        filteredSubmissions = allSubmissions.filter(submission => {
-            const examMatch = !selectedExam || submission.test_id === selectedExam;
-            const studentMatch = !studentFilter || 
-                submission.student_name.toLowerCase().includes(studentFilter) ||
-                submission.student_id.toLowerCase().includes(studentFilter);
-            
-            return examMatch && studentMatch;
-        });
-
-        renderSubmissions();
+        fetchSubmissions();
     }
 
     // Show/hide loading indicator
@@ -174,6 +179,8 @@ document.addEventListener('DOMContentLoaded', () => {
         filterExamSelect.addEventListener('change', applyFilters);
     }
 
+    loadMoreBtn.addEventListener('click', () => fetchSubmissions(true));
+
     // Initialize the page
     initializePage();
 }); 
\ No newline at end of file